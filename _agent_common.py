@@ -0,0 +1,69 @@
+# /trading_bot/_agent_common.py
+
+import numpy as np
+from typing import Dict
+from config import STOP_LOSS_PERCENTAGE, TAKE_PROFIT_PERCENTAGE, PORTFOLIO_STOP_LOSS, PORTFOLIO_STOCKS
+
+# Define a type alias for state for clarity
+PortfolioState = Dict 
+
+# Symbol order shared by the vectorized position checks below
+PORTFOLIO_STOCKS_ARR = np.array(PORTFOLIO_STOCKS)
+
+__all__ = ['should_rerun_or_proceed', 'check_stop_loss_conditions', 'check_emergency_stop_loss']
+
+
+def should_rerun_or_proceed(state: PortfolioState) -> str:
+    """
+    Checks the last validation result to decide the next step in the graph.
+    """
+    if not state.get('validation_history'):
+        return "proceed_to_execute" # Should not happen, but as a safeguard
+        
+    last_validation = state['validation_history'][-1]
+    if last_validation['decision'] == 'rerun':
+        return "rerun_decision"
+    return "proceed_to_execute"
+
+
+def check_stop_loss_conditions(state: PortfolioState) -> Dict:
+    """
+    Checks for individual stock stop-loss or take-profit triggers.
+    """
+    n = len(PORTFOLIO_STOCKS_ARR)
+    positions_map = state.get('positions', {})
+    prices_map = state.get('stock_prices', {})
+    purchase_map = state.get('purchase_prices', {})
+
+    positions = np.fromiter((positions_map.get(s, 0) for s in PORTFOLIO_STOCKS_ARR), dtype=np.float64, count=n)
+    current_prices = np.fromiter((prices_map.get(s, 0) for s in PORTFOLIO_STOCKS_ARR), dtype=np.float64, count=n)
+    purchase_prices = np.fromiter((purchase_map.get(s, 0) for s in PORTFOLIO_STOCKS_ARR), dtype=np.float64, count=n)
+
+    eligible = (positions > 0) & (purchase_prices > 0) & (current_prices > 0)
+    safe_purchase = np.where(purchase_prices > 0, purchase_prices, 1.0)
+    change_pct = np.where(eligible, (current_prices - purchase_prices) / safe_purchase * 100, 0.0)
+
+    sl = eligible & (change_pct <= STOP_LOSS_PERCENTAGE)
+    tp = eligible & ~sl & (change_pct >= TAKE_PROFIT_PERCENTAGE)
+
+    for i in np.flatnonzero(sl):
+        print(f"🚨 STOP-LOSS TRIGGER: {PORTFOLIO_STOCKS_ARR[i]} at {change_pct[i]:.2f}%")
+    for i in np.flatnonzero(tp):
+        print(f"💰 TAKE-PROFIT TRIGGER: {PORTFOLIO_STOCKS_ARR[i]} at {change_pct[i]:.2f}%")
+
+    return {str(s): 'SELL' for s in PORTFOLIO_STOCKS_ARR[sl | tp]}
+
+def check_emergency_stop_loss(state: PortfolioState) -> bool:
+    """
+    Checks if the entire portfolio has hit the emergency stop-loss threshold.
+    Uses the `portfolio_loss_pct` precomputed by the position-checking node when present.
+    """
+    loss_pct = state.get('portfolio_loss_pct')
+    if loss_pct is None:
+        pnl = state.get('total_unrealized_pnl', 0)
+        value = state.get('total_portfolio_value', 1) # Avoid division by zero
+        loss_pct = (pnl / value) * 100 if (pnl < 0 and value > 0) else 0.0
+    if loss_pct <= PORTFOLIO_STOP_LOSS:
+        print(f"🚨 EMERGENCY PORTFOLIO STOP: Total loss at {loss_pct:.2f}%")
+        return True
+    return False
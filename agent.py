@@ -1181,14 +1181,17 @@ def check_stop_loss_conditions(state: PortfolioState) -> Dict:
 def check_emergency_stop_loss(state: PortfolioState) -> bool:
     """
     Checks if the entire portfolio has hit the emergency stop-loss threshold.
+    Uses the `portfolio_loss_pct` precomputed by the position-checking node when present.
     """
-    pnl = state.get('total_unrealized_pnl', 0)
-    value = state.get('total_portfolio_value', 1)
-    if pnl < 0 and value > 0:
-        loss_pct = (pnl / value) * 100
-        if loss_pct <= PORTFOLIO_STOP_LOSS:
-            print(f"🚨 EMERGENCY PORTFOLIO STOP: Total loss at {loss_pct:.2f}%")
-            return True
+    loss_pct = state.get('portfolio_loss_pct')
+    if loss_pct is None:
+        pnl = state.get('total_unrealized_pnl', 0)
+        value = state.get('total_portfolio_value', 1)
+        loss_pct = (pnl / value) * 100 if (pnl < 0 and value > 0) else 0.0
+    # Only an actual loss can trip the stop (loss_pct is 0.0 for a flat or profitable portfolio)
+    if loss_pct < 0 and loss_pct <= PORTFOLIO_STOP_LOSS:
+        print(f"🚨 EMERGENCY PORTFOLIO STOP: Total loss at {loss_pct:.2f}%")
+        return True
     return False
 
 def calculate_fee_adjusted_pnl(current_price: float, purchase_price: float, shares: int) -> Dict[str, float]:
@@ -1,11 +1,157 @@
 # /trading_bot/agent.py
 
+import os
+import logging
+from types import MappingProxyType
 from typing import Dict, List
-from config import gemini_model, STOP_LOSS_PERCENTAGE, TAKE_PROFIT_PERCENTAGE, PORTFOLIO_STOP_LOSS, TRADE_SIZE, MIN_CASH_RESERVE, MAX_TOTAL_SHARES, MAX_SHARES_PER_STOCK, PORTFOLIO_STOCKS
+from config import gemini_model, TRADE_SIZE, MIN_CASH_RESERVE, MAX_TOTAL_SHARES, MAX_SHARES_PER_STOCK, PORTFOLIO_STOCKS
+from _agent_common import should_rerun_or_proceed, check_stop_loss_conditions, check_emergency_stop_loss
 
 # Define a type alias for state for clarity
 PortfolioState = Dict 
 
+# Handlers are configured by the entry point; set AGENT_LOG_LEVEL=DEBUG to see raw AI responses
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv('AGENT_LOG_LEVEL', 'INFO').upper())
+
+# Read-only fallback recommendations; copy before handing them out
+_DEFAULT_HOLD_REC = MappingProxyType({
+    'action': 'HOLD',
+    'priority': 'LOW',
+    'reasoning': 'No clear signal from analysis',
+    'technical_score': 5.0,
+    'confidence': 'LOW'
+})
+_PARSED_REC_DEFAULTS = MappingProxyType({
+    'action': 'HOLD',
+    'priority': 'LOW',
+    'reasoning': 'AI recommendation',
+    'technical_score': 5.0,
+    'confidence': 'MEDIUM'
+})
+
+# --- PROMPT TEMPLATES (only the dynamic slots are filled per cycle) ---
+AGGRESSIVE_INSTRUCTION = """
+        AGGRESSIVE TRADING MODE ACTIVE:
+        - MAXIMIZE PROFIT through decisive action
+        - Accept higher risk for higher potential returns  
+        - Consider technical scores 4+ as actionable for BUY
+        - Consider technical scores 6- as actionable for SELL
+        - Prioritize momentum and volume indicators
+        - Be quick to enter/exit based on technical signals"""
+BALANCED_INSTRUCTION = """
+        BALANCED TRADING MODE ACTIVE:
+        - Prioritize capital preservation with steady growth
+        - Require technical scores 6+ for high-priority BUY
+        - Require technical scores 4- for high-priority SELL  
+        - Demand multiple confirming indicators
+        - Avoid trades during high volatility periods
+        - Focus on strong technical alignment"""
+
+BASE_CONTEXT = f"""
+    You are an expert quantitative trading analyst with deep technical analysis expertise.
+    {{strategy_instruction}}
+    
+    PORTFOLIO STATE:
+    - Total Value: ${{total_portfolio_value:.2f}}
+    - Unrealized P&L: ${{total_unrealized_pnl:+.2f}}
+    - Available Cash: ${{cash_available:.2f}}
+    - Total Trades This Session: {{total_trades}}
+
+    CONSTRAINTS:
+    - Trade size: {TRADE_SIZE} shares per order
+    - Max shares per stock: {MAX_SHARES_PER_STOCK}
+    - Min cash reserve: ${MIN_CASH_RESERVE:,}
+    - Max total shares: {MAX_TOTAL_SHARES}
+
+    COMPREHENSIVE STOCK ANALYSIS:
+    {{portfolio_summary}}
+
+    CRITICAL INSTRUCTION: Consider ALL technical indicators in your analysis:
+    - Price vs Moving Averages (SMA20, SMA50, EMA12, EMA26)
+    - Momentum indicators (RSI, Williams %R, Stochastic)
+    - MACD system (line, signal, histogram)
+    - Bollinger Band position and squeeze
+    - Volume analysis vs moving average
+    - Volatility measurements (ATR, 20-day vol)
+    
+    For each stock, provide recommendation in EXACT format:
+    STOCK: [SYMBOL] | ACTION: [BUY/SELL/HOLD] | PRIORITY: [HIGH/MEDIUM/LOW] | REASONING: [Specific technical reasons citing 2-3 indicators] | TECHNICAL_SCORE: [1-10] | CONFIDENCE: [HIGH/MEDIUM/LOW]
+    """
+
+REVISION_TEMPLATE = """
+        
+        CRITICAL REVISION REQUEST: 
+        Your previous recommendations were rejected for these reasons: "{feedback}"
+        
+        MANDATORY FIXES:
+        - Address all identified contradictions
+        - Ensure technical indicators align with recommended actions
+        - Provide stronger reasoning based on multiple confirming signals
+        - Adjust priorities based on technical strength scores
+        """
+
+MEMORY_BASE_CONTEXT = f"""
+    You are an expert quantitative trading analyst with deep technical analysis expertise and access to historical trading patterns.
+    {{strategy_instruction}}
+    
+    PORTFOLIO STATE:
+    - Total Value: ${{total_portfolio_value:.2f}}
+    - Unrealized P&L: ${{total_unrealized_pnl:+.2f}}
+    - Available Cash: ${{cash_available:.2f}}
+    - Total Trades This Session: {{total_trades}}
+
+    CONSTRAINTS:
+    - Trade size: {TRADE_SIZE} shares per order
+    - Max shares per stock: {MAX_SHARES_PER_STOCK}
+    - Min cash reserve: ${MIN_CASH_RESERVE:,}
+    - Max total shares: {MAX_TOTAL_SHARES}
+
+    HISTORICAL TRADING CONTEXT & MEMORY:
+    {{memory_context}}
+
+    SYMBOL-SPECIFIC TRADING MEMORY:
+    {{symbol_memory_insights}}
+
+    COMPREHENSIVE STOCK ANALYSIS:
+    {{portfolio_summary}}
+
+    CRITICAL INSTRUCTION: Consider ALL technical indicators AND historical trading patterns in your analysis:
+    - Price vs Moving Averages (SMA20, SMA50, EMA12, EMA26)
+    - Momentum indicators (RSI, Williams %R, Stochastic)
+    - MACD system (line, signal, histogram)
+    - Bollinger Band position and squeeze
+    - Volume analysis vs moving average
+    - Volatility measurements (ATR, 20-day vol)
+    - Historical trading patterns and outcomes from memory
+    - Recent trading decisions and their effectiveness
+    - Daily trading bias and sentiment trends
+    
+    MEMORY-BASED DECISION ENHANCEMENT:
+    - Learn from previous similar market conditions shown in memory context
+    - Avoid repeating failed strategies from today's trading history
+    - Consider the day's trading pattern and sentiment trends
+    - Factor in previous decisions and their technical score effectiveness
+    - Use historical context to validate current technical signals
+    
+    For each stock, provide recommendation in EXACT format:
+    STOCK: [SYMBOL] | ACTION: [BUY/SELL/HOLD] | PRIORITY: [HIGH/MEDIUM/LOW] | REASONING: [Specific technical reasons citing 2-3 indicators AND relevant memory context] | TECHNICAL_SCORE: [1-10] | CONFIDENCE: [HIGH/MEDIUM/LOW]
+    """
+
+MEMORY_REVISION_TEMPLATE = """
+        
+        CRITICAL REVISION REQUEST: 
+        Your previous recommendations were rejected for these reasons: "{feedback}"
+        
+        MANDATORY FIXES:
+        - Address all identified contradictions
+        - Ensure technical indicators align with recommended actions
+        - Provide stronger reasoning based on multiple confirming signals
+        - Adjust priorities based on technical strength scores
+        - Use memory context to avoid repeating the same mistakes
+        - Learn from historical patterns to improve decision quality
+        """
+
 
 def analyze_technical_strength(stock_data: Dict) -> Dict:
     """
@@ -164,8 +310,8 @@ def validate_ai_decisions(state: PortfolioState) -> Dict:
     if not recommendations:
         return {'decision': 'proceed', 'reason': 'No recommendations to validate.'}
 
-    print("\n🔍 COMPREHENSIVE TECHNICAL VALIDATION")
-    print("=" * 60)
+    logger.info("\n🔍 COMPREHENSIVE TECHNICAL VALIDATION")
+    logger.info("=" * 60)
 
     for symbol, rec in recommendations.items():
         action = rec.get('action', 'HOLD')
@@ -174,7 +320,7 @@ def validate_ai_decisions(state: PortfolioState) -> Dict:
         if action == 'HOLD':
             continue
             
-        print(f"\n📊 VALIDATING {symbol} - {action} ({priority} priority)")
+        logger.info("\n📊 VALIDATING %s - %s (%s priority)", symbol, action, priority)
         
         # Get comprehensive technical analysis
         technical_analysis = analyze_technical_strength(stock_data.get(symbol, {}))
@@ -188,9 +334,9 @@ def validate_ai_decisions(state: PortfolioState) -> Dict:
         technical_confidence = technical_analysis.get('confidence', 'LOW')
         technical_score = technical_analysis.get('score', 5)
         
-        print(f"   🤖 AI Analysis: {ai_trend} ({ai_confidence} confidence, {ai_risk} risk)")
-        print(f"   📈 Technical: {technical_strength} (Score: {technical_score}/10, {technical_confidence} confidence)")
-        print(f"   📋 Signals: {len(technical_analysis.get('signals', []))} total")
+        logger.info("   🤖 AI Analysis: %s (%s confidence, %s risk)", ai_trend, ai_confidence, ai_risk)
+        logger.info("   📈 Technical: %s (Score: %s/10, %s confidence)", technical_strength, technical_score, technical_confidence)
+        logger.info("   📋 Signals: %s total", len(technical_analysis.get('signals', [])))
         
         # Major contradiction checks
         if action == 'BUY':
@@ -198,41 +344,41 @@ def validate_ai_decisions(state: PortfolioState) -> Dict:
             if (ai_trend == 'BEARISH' and ai_confidence in ['MEDIUM', 'HIGH']) or \
                (technical_strength in ['STRONG_BEARISH', 'WEAK_BEARISH'] and technical_confidence in ['MEDIUM', 'HIGH']):
                 issues.append(f"{symbol}: Major contradiction - BUY recommendation conflicts with bearish analysis")
-                print(f"   ❌ MAJOR ISSUE: BUY conflicts with bearish signals")
+                logger.info("   ❌ MAJOR ISSUE: BUY conflicts with bearish signals")
             
             # Check technical score alignment
             if technical_score < 3 and priority == 'HIGH':
                 if aggressive_mode:
                     warnings.append(f"{symbol}: High-priority BUY with low technical score ({technical_score}/10) - risky in aggressive mode")
-                    print(f"   ⚠️  WARNING: Low technical score for high-priority BUY")
+                    logger.info("   ⚠️  WARNING: Low technical score for high-priority BUY")
                 else:
                     issues.append(f"{symbol}: High-priority BUY with poor technical indicators (score: {technical_score}/10)")
-                    print(f"   ❌ ISSUE: Poor technical score for high-priority BUY")
+                    logger.info("   ❌ ISSUE: Poor technical score for high-priority BUY")
             
             # RSI overbought check
             rsi = stock_data.get(symbol, {}).get('rsi', 50)
             if rsi > 75 and priority in ['HIGH', 'MEDIUM']:
                 warnings.append(f"{symbol}: BUY recommendation with very overbought RSI ({rsi:.1f})")
-                print(f"   ⚠️  WARNING: Very overbought RSI ({rsi:.1f})")
+                logger.info("   ⚠️  WARNING: Very overbought RSI (%.1f)", rsi)
         
         elif action == 'SELL':
             # Check for major bullish contradictions
             if (ai_trend == 'BULLISH' and ai_confidence in ['MEDIUM', 'HIGH']) or \
                (technical_strength in ['STRONG_BULLISH', 'WEAK_BULLISH'] and technical_confidence in ['MEDIUM', 'HIGH']):
                 issues.append(f"{symbol}: Major contradiction - SELL recommendation conflicts with bullish analysis")
-                print(f"   ❌ MAJOR ISSUE: SELL conflicts with bullish signals")
+                logger.info("   ❌ MAJOR ISSUE: SELL conflicts with bullish signals")
             
             # Check technical score alignment
             if technical_score > 7 and priority == 'HIGH':
                 if not aggressive_mode:  # In aggressive mode, might sell for quick profits
                     issues.append(f"{symbol}: High-priority SELL with strong technical indicators (score: {technical_score}/10)")
-                    print(f"   ❌ ISSUE: High technical score conflicts with high-priority SELL")
+                    logger.info("   ❌ ISSUE: High technical score conflicts with high-priority SELL")
             
             # RSI oversold check
             rsi = stock_data.get(symbol, {}).get('rsi', 50)
             if rsi < 25 and priority in ['HIGH', 'MEDIUM']:
                 warnings.append(f"{symbol}: SELL recommendation with very oversold RSI ({rsi:.1f})")
-                print(f"   ⚠️  WARNING: Very oversold RSI ({rsi:.1f})")
+                logger.info("   ⚠️  WARNING: Very oversold RSI (%.1f)", rsi)
         
         # Risk assessment checks
         if not aggressive_mode and action in ['BUY', 'SELL'] and priority == 'HIGH':
@@ -241,11 +387,11 @@ def validate_ai_decisions(state: PortfolioState) -> Dict:
             
             if volatility > atr * 2:  # High volatility
                 warnings.append(f"{symbol}: High-priority {action} on highly volatile stock")
-                print(f"   ⚠️  WARNING: High volatility detected")
+                logger.info("   ⚠️  WARNING: High volatility detected")
             
             if ai_risk == 'HIGH' and technical_confidence == 'LOW':
                 issues.append(f"{symbol}: High-priority {action} with high AI risk and low technical confidence")
-                print(f"   ❌ ISSUE: High risk + low confidence combination")
+                logger.info("   ❌ ISSUE: High risk + low confidence combination")
 
     # Portfolio-level validation
     buy_sell_actions = [rec.get('action') for rec in recommendations.values() if rec.get('action') in ['BUY', 'SELL']]
@@ -253,7 +399,7 @@ def validate_ai_decisions(state: PortfolioState) -> Dict:
     
     if len(buy_sell_actions) > (len(PORTFOLIO_STOCKS) * churn_limit):
         issues.append(f"Portfolio: Excessive trading activity - {len(buy_sell_actions)} actions suggested (limit: {int(len(PORTFOLIO_STOCKS) * churn_limit)})")
-        print(f"\n   ❌ PORTFOLIO ISSUE: Excessive trading activity")
+        logger.info("\n   ❌ PORTFOLIO ISSUE: Excessive trading activity")
 
     # Market condition check
     bullish_count = sum(1 for rec in recommendations.values() if rec.get('action') == 'BUY')
@@ -263,12 +409,12 @@ def validate_ai_decisions(state: PortfolioState) -> Dict:
         ratio = bullish_count / (bullish_count + bearish_count)
         if 0.3 <= ratio <= 0.7:  # Mixed signals
             warnings.append(f"Portfolio: Mixed market signals - {bullish_count} BUY vs {bearish_count} SELL recommendations")
-            print(f"\n   ⚠️  PORTFOLIO WARNING: Mixed signals detected")
+            logger.info("\n   ⚠️  PORTFOLIO WARNING: Mixed signals detected")
 
-    print(f"\n📋 VALIDATION SUMMARY:")
-    print(f"   ✅ Clean validations: {len([s for s in PORTFOLIO_STOCKS if s in recommendations and recommendations[s].get('action') == 'HOLD']) + len(PORTFOLIO_STOCKS) - len(recommendations)}")
-    print(f"   ⚠️  Warnings: {len(warnings)}")
-    print(f"   ❌ Issues: {len(issues)}")
+    logger.info("\n📋 VALIDATION SUMMARY:")
+    logger.info("   ✅ Clean validations: %s", len([s for s in PORTFOLIO_STOCKS if s in recommendations and recommendations[s].get('action') == 'HOLD']) + len(PORTFOLIO_STOCKS) - len(recommendations))
+    logger.info("   ⚠️  Warnings: %s", len(warnings))
+    logger.info("   ❌ Issues: %s", len(issues))
 
     if issues:
         all_problems = issues + ([f"WARNINGS: {'; '.join(warnings)}"] if warnings else [])
@@ -355,7 +501,7 @@ async def get_ai_trend_analysis(stock_data: Dict, symbol: str) -> Dict:
         ai_response = response.text
         
         analysis = {}
-        for line in ai_response.split('\n'):
+        for line in ai_response.splitlines():
             if ':' in line:
                 key, value = line.split(':', 1)
                 analysis[key.strip().lower()] = value.strip()
@@ -367,7 +513,7 @@ async def get_ai_trend_analysis(stock_data: Dict, symbol: str) -> Dict:
         
         return analysis
     except Exception as e:
-        print(f"❌ Enhanced AI trend analysis error for {symbol}: {e}")
+        logger.error("❌ Enhanced AI trend analysis error for %s: %s", symbol, e)
         return {
             'trend': 'NEUTRAL', 
             'confidence': 'LOW', 
@@ -381,8 +527,8 @@ async def get_ai_portfolio_recommendations(state: PortfolioState):
     """
     Enhanced AI recommendations using comprehensive technical analysis for ALL indicators.
     """
-    print("\n🧠 GENERATING AI RECOMMENDATIONS WITH FULL TECHNICAL ANALYSIS")
-    print("=" * 70)
+    logger.info("\n🧠 GENERATING AI RECOMMENDATIONS WITH FULL TECHNICAL ANALYSIS")
+    logger.info("=" * 70)
     
     portfolio_summary = []
     for symbol in PORTFOLIO_STOCKS:
@@ -405,87 +551,35 @@ async def get_ai_portfolio_recommendations(state: PortfolioState):
    Key Signals: {tech_analysis.get('bullish_signals', 0)} bullish, {tech_analysis.get('bearish_signals', 0)} bearish"""
             )
             
-            print(f"📊 {symbol}: Tech Score {tech_analysis.get('score', 5)}/10, RSI {s_data.get('rsi', 50):.1f}, Trend {t_analysis.get('trend', 'N/A')}")
+            logger.info("📊 %s: Tech Score %s/10, RSI %.1f, Trend %s", symbol, tech_analysis.get('score', 5), s_data.get('rsi', 50), t_analysis.get('trend', 'N/A'))
     
     # Enhanced strategy instruction based on mode
-    strategy_instruction = ""
-    if state.get('aggressive_mode', False):
-        strategy_instruction = """
-        AGGRESSIVE TRADING MODE ACTIVE:
-        - MAXIMIZE PROFIT through decisive action
-        - Accept higher risk for higher potential returns  
-        - Consider technical scores 4+ as actionable for BUY
-        - Consider technical scores 6- as actionable for SELL
-        - Prioritize momentum and volume indicators
-        - Be quick to enter/exit based on technical signals"""
-    else:
-        strategy_instruction = """
-        BALANCED TRADING MODE ACTIVE:
-        - Prioritize capital preservation with steady growth
-        - Require technical scores 6+ for high-priority BUY
-        - Require technical scores 4- for high-priority SELL  
-        - Demand multiple confirming indicators
-        - Avoid trades during high volatility periods
-        - Focus on strong technical alignment"""
+    strategy_instruction = AGGRESSIVE_INSTRUCTION if state.get('aggressive_mode', False) else BALANCED_INSTRUCTION
 
-    context = f"""
-    You are an expert quantitative trading analyst with deep technical analysis expertise.
-    {strategy_instruction}
-    
-    PORTFOLIO STATE:
-    - Total Value: ${state['total_portfolio_value']:.2f}
-    - Unrealized P&L: ${state['total_unrealized_pnl']:+.2f}
-    - Available Cash: ${state['cash_available']:.2f}
-    - Total Trades This Session: {state.get('total_trades', 0)}
-
-    CONSTRAINTS:
-    - Trade size: {TRADE_SIZE} shares per order
-    - Max shares per stock: {MAX_SHARES_PER_STOCK}
-    - Min cash reserve: ${MIN_CASH_RESERVE:,}
-    - Max total shares: {MAX_TOTAL_SHARES}
-
-    COMPREHENSIVE STOCK ANALYSIS:
-    {chr(10).join(portfolio_summary)}
-
-    CRITICAL INSTRUCTION: Consider ALL technical indicators in your analysis:
-    - Price vs Moving Averages (SMA20, SMA50, EMA12, EMA26)
-    - Momentum indicators (RSI, Williams %R, Stochastic)
-    - MACD system (line, signal, histogram)
-    - Bollinger Band position and squeeze
-    - Volume analysis vs moving average
-    - Volatility measurements (ATR, 20-day vol)
-    
-    For each stock, provide recommendation in EXACT format:
-    STOCK: [SYMBOL] | ACTION: [BUY/SELL/HOLD] | PRIORITY: [HIGH/MEDIUM/LOW] | REASONING: [Specific technical reasons citing 2-3 indicators] | TECHNICAL_SCORE: [1-10] | CONFIDENCE: [HIGH/MEDIUM/LOW]
-    """
+    context = BASE_CONTEXT.format_map({
+        'strategy_instruction': strategy_instruction,
+        'total_portfolio_value': state['total_portfolio_value'],
+        'total_unrealized_pnl': state['total_unrealized_pnl'],
+        'cash_available': state['cash_available'],
+        'total_trades': state.get('total_trades', 0),
+        'portfolio_summary': '\n'.join(portfolio_summary),
+    })
     
     feedback = state.get("validation_feedback")
     if feedback:
-        context += f"""
-        
-        CRITICAL REVISION REQUEST: 
-        Your previous recommendations were rejected for these reasons: "{feedback}"
-        
-        MANDATORY FIXES:
-        - Address all identified contradictions
-        - Ensure technical indicators align with recommended actions
-        - Provide stronger reasoning based on multiple confirming signals
-        - Adjust priorities based on technical strength scores
-        """
+        context += REVISION_TEMPLATE.format_map({'feedback': feedback})
     
     try:
-        print("🤖 Sending comprehensive analysis to AI...")
+        logger.info("🤖 Sending comprehensive analysis to AI...")
         response = await gemini_model.generate_content_async(context)
         ai_response = response.text
         
-        print("\n--- FULL AI RESPONSE ---")
-        print(ai_response)
-        print("------------------------\n")
+        logger.debug("--- FULL AI RESPONSE ---\n%s\n------------------------", ai_response)
 
         recommendations = {}
         
         # Enhanced parsing to capture all fields
-        for line in ai_response.split('\n'):
+        for line in ai_response.splitlines():
             line = line.strip()
             if not line or '|' not in line:
                 continue
@@ -522,43 +616,27 @@ async def get_ai_portfolio_recommendations(state: PortfolioState):
                     
                     if symbol and symbol in PORTFOLIO_STOCKS:
                         # Set defaults for missing fields
-                        rec.setdefault('action', 'HOLD')
-                        rec.setdefault('priority', 'LOW')
-                        rec.setdefault('reasoning', 'AI recommendation')
-                        rec.setdefault('technical_score', 5.0)
-                        rec.setdefault('confidence', 'MEDIUM')
+                        rec = {**_PARSED_REC_DEFAULTS, **rec}
                         
                         recommendations[symbol] = rec
-                        print(f"✅ Parsed {symbol}: {rec['action']} ({rec['priority']}) - Score: {rec['technical_score']}")
+                        logger.debug("✅ Parsed %s: %s (%s) - Score: %s", symbol, rec['action'], rec['priority'], rec['technical_score'])
                         
             except Exception as e:
-                print(f"⚠️  Error parsing line: {line[:50]}... - {e}")
+                logger.warning("⚠️  Error parsing line: %s... - %s", line[:50], e)
                 continue
 
         # Ensure all portfolio stocks have recommendations
         for symbol in PORTFOLIO_STOCKS:
             if symbol not in recommendations:
-                print(f"⚠️  Missing recommendation for {symbol}, defaulting to HOLD")
-                recommendations[symbol] = {
-                    'action': 'HOLD',
-                    'priority': 'LOW', 
-                    'reasoning': 'No clear signal from analysis',
-                    'technical_score': 5.0,
-                    'confidence': 'LOW'
-                }
-
-        print(f"\n✅ Generated recommendations for {len(recommendations)}/{len(PORTFOLIO_STOCKS)} stocks")
+                logger.warning("⚠️  Missing recommendation for %s, defaulting to HOLD", symbol)
+                recommendations[symbol] = dict(_DEFAULT_HOLD_REC)
+
+        logger.info("\n✅ Generated recommendations for %s/%s stocks", len(recommendations), len(PORTFOLIO_STOCKS))
         return recommendations
 
     except Exception as e:
-        print(f"❌ AI portfolio recommendation error: {e}")
-        return {s: {
-            'action': 'HOLD', 
-            'priority': 'LOW', 
-            'reasoning': f'AI Error: {e}',
-            'technical_score': 5.0,
-            'confidence': 'LOW'
-        } for s in PORTFOLIO_STOCKS}
+        logger.error("❌ AI portfolio recommendation error: %s", e)
+        return {s: {**_DEFAULT_HOLD_REC, 'reasoning': f'AI Error: {e}'} for s in PORTFOLIO_STOCKS}
 
 
 
@@ -569,8 +647,8 @@ async def get_ai_portfolio_recommendations_with_memory(state: PortfolioState):
     """
     Enhanced AI recommendations using comprehensive technical analysis for ALL indicators WITH MEMORY CONTEXT.
     """
-    print("\n🧠 GENERATING AI RECOMMENDATIONS WITH FULL TECHNICAL ANALYSIS + MEMORY")
-    print("=" * 75)
+    logger.info("\n🧠 GENERATING AI RECOMMENDATIONS WITH FULL TECHNICAL ANALYSIS + MEMORY")
+    logger.info("=" * 75)
     
     portfolio_summary = []
     for symbol in PORTFOLIO_STOCKS:
@@ -593,28 +671,10 @@ async def get_ai_portfolio_recommendations_with_memory(state: PortfolioState):
    Key Signals: {tech_analysis.get('bullish_signals', 0)} bullish, {tech_analysis.get('bearish_signals', 0)} bearish"""
             )
             
-            print(f"📊 {symbol}: Tech Score {tech_analysis.get('score', 5)}/10, RSI {s_data.get('rsi', 50):.1f}, Trend {t_analysis.get('trend', 'N/A')}")
+            logger.info("📊 %s: Tech Score %s/10, RSI %.1f, Trend %s", symbol, tech_analysis.get('score', 5), s_data.get('rsi', 50), t_analysis.get('trend', 'N/A'))
 
     # Enhanced strategy instruction based on mode (your existing logic)
-    strategy_instruction = ""
-    if state.get('aggressive_mode', False):
-        strategy_instruction = """
-        AGGRESSIVE TRADING MODE ACTIVE:
-        - MAXIMIZE PROFIT through decisive action
-        - Accept higher risk for higher potential returns  
-        - Consider technical scores 4+ as actionable for BUY
-        - Consider technical scores 6- as actionable for SELL
-        - Prioritize momentum and volume indicators
-        - Be quick to enter/exit based on technical signals"""
-    else:
-        strategy_instruction = """
-        BALANCED TRADING MODE ACTIVE:
-        - Prioritize capital preservation with steady growth
-        - Require technical scores 6+ for high-priority BUY
-        - Require technical scores 4- for high-priority SELL  
-        - Demand multiple confirming indicators
-        - Avoid trades during high volatility periods
-        - Focus on strong technical alignment"""
+    strategy_instruction = AGGRESSIVE_INSTRUCTION if state.get('aggressive_mode', False) else BALANCED_INSTRUCTION
 
     # GET MEMORY CONTEXT (NEW ADDITION)
     memory_context = state.get('memory_context', 'No previous trading context available for this session.')
@@ -631,85 +691,35 @@ async def get_ai_portfolio_recommendations_with_memory(state: PortfolioState):
                 avg_score = sum(h['memory']['technical_score'] for h in history) / len(history) if history else 0
                 symbol_memory_insights.append(f"   {symbol}: {recent_trades} recent trades, last action: {last_action}, avg tech score: {avg_score:.1f}")
     except Exception as e:
-        print(f"⚠️ Could not load symbol memory: {e}")
+        logger.warning("⚠️ Could not load symbol memory: %s", e)
 
     # ENHANCED CONTEXT WITH MEMORY (PRESERVING ALL YOUR EXISTING ANALYSIS)
-    context = f"""
-    You are an expert quantitative trading analyst with deep technical analysis expertise and access to historical trading patterns.
-    {strategy_instruction}
-    
-    PORTFOLIO STATE:
-    - Total Value: ${state['total_portfolio_value']:.2f}
-    - Unrealized P&L: ${state['total_unrealized_pnl']:+.2f}
-    - Available Cash: ${state['cash_available']:.2f}
-    - Total Trades This Session: {state.get('total_trades', 0)}
-
-    CONSTRAINTS:
-    - Trade size: {TRADE_SIZE} shares per order
-    - Max shares per stock: {MAX_SHARES_PER_STOCK}
-    - Min cash reserve: ${MIN_CASH_RESERVE:,}
-    - Max total shares: {MAX_TOTAL_SHARES}
-
-    HISTORICAL TRADING CONTEXT & MEMORY:
-    {memory_context}
-
-    SYMBOL-SPECIFIC TRADING MEMORY:
-    {chr(10).join(symbol_memory_insights) if symbol_memory_insights else "   No recent symbol-specific trading history available"}
-
-    COMPREHENSIVE STOCK ANALYSIS:
-    {chr(10).join(portfolio_summary)}
-
-    CRITICAL INSTRUCTION: Consider ALL technical indicators AND historical trading patterns in your analysis:
-    - Price vs Moving Averages (SMA20, SMA50, EMA12, EMA26)
-    - Momentum indicators (RSI, Williams %R, Stochastic)
-    - MACD system (line, signal, histogram)
-    - Bollinger Band position and squeeze
-    - Volume analysis vs moving average
-    - Volatility measurements (ATR, 20-day vol)
-    - Historical trading patterns and outcomes from memory
-    - Recent trading decisions and their effectiveness
-    - Daily trading bias and sentiment trends
-    
-    MEMORY-BASED DECISION ENHANCEMENT:
-    - Learn from previous similar market conditions shown in memory context
-    - Avoid repeating failed strategies from today's trading history
-    - Consider the day's trading pattern and sentiment trends
-    - Factor in previous decisions and their technical score effectiveness
-    - Use historical context to validate current technical signals
-    
-    For each stock, provide recommendation in EXACT format:
-    STOCK: [SYMBOL] | ACTION: [BUY/SELL/HOLD] | PRIORITY: [HIGH/MEDIUM/LOW] | REASONING: [Specific technical reasons citing 2-3 indicators AND relevant memory context] | TECHNICAL_SCORE: [1-10] | CONFIDENCE: [HIGH/MEDIUM/LOW]
-    """
+    context = MEMORY_BASE_CONTEXT.format_map({
+        'strategy_instruction': strategy_instruction,
+        'total_portfolio_value': state['total_portfolio_value'],
+        'total_unrealized_pnl': state['total_unrealized_pnl'],
+        'cash_available': state['cash_available'],
+        'total_trades': state.get('total_trades', 0),
+        'memory_context': memory_context,
+        'symbol_memory_insights': '\n'.join(symbol_memory_insights) if symbol_memory_insights else "   No recent symbol-specific trading history available",
+        'portfolio_summary': '\n'.join(portfolio_summary),
+    })
     
     feedback = state.get("validation_feedback")
     if feedback:
-        context += f"""
-        
-        CRITICAL REVISION REQUEST: 
-        Your previous recommendations were rejected for these reasons: "{feedback}"
-        
-        MANDATORY FIXES:
-        - Address all identified contradictions
-        - Ensure technical indicators align with recommended actions
-        - Provide stronger reasoning based on multiple confirming signals
-        - Adjust priorities based on technical strength scores
-        - Use memory context to avoid repeating the same mistakes
-        - Learn from historical patterns to improve decision quality
-        """
+        context += MEMORY_REVISION_TEMPLATE.format_map({'feedback': feedback})
     
     try:
-        print("🤖 Sending comprehensive analysis with memory context to AI...")
+        logger.info("🤖 Sending comprehensive analysis with memory context to AI...")
         response = await gemini_model.generate_content_async(context)
         ai_response = response.text
         
-        print("\n--- FULL AI RESPONSE WITH MEMORY CONTEXT ---")
-        print(ai_response)
-        print("---------------------------------------------\n")
+        logger.debug("--- FULL AI RESPONSE WITH MEMORY CONTEXT ---\n%s\n---------------------------------------------", ai_response)
 
         recommendations = {}
         
         # Enhanced parsing to capture all fields (your existing parsing logic)
-        for line in ai_response.split('\n'):
+        for line in ai_response.splitlines():
             line = line.strip()
             if not line or '|' not in line:
                 continue
@@ -746,90 +756,24 @@ async def get_ai_portfolio_recommendations_with_memory(state: PortfolioState):
                     
                     if symbol and symbol in PORTFOLIO_STOCKS:
                         # Set defaults for missing fields (your existing logic)
-                        rec.setdefault('action', 'HOLD')
-                        rec.setdefault('priority', 'LOW')
-                        rec.setdefault('reasoning', 'AI recommendation')
-                        rec.setdefault('technical_score', 5.0)
-                        rec.setdefault('confidence', 'MEDIUM')
+                        rec = {**_PARSED_REC_DEFAULTS, **rec}
                         
                         recommendations[symbol] = rec
-                        print(f"✅ Parsed {symbol}: {rec['action']} ({rec['priority']}) - Score: {rec['technical_score']}")
+                        logger.debug("✅ Parsed %s: %s (%s) - Score: %s", symbol, rec['action'], rec['priority'], rec['technical_score'])
                         
             except Exception as e:
-                print(f"⚠️  Error parsing line: {line[:50]}... - {e}")
+                logger.warning("⚠️  Error parsing line: %s... - %s", line[:50], e)
                 continue
 
         # Ensure all portfolio stocks have recommendations (your existing logic)
         for symbol in PORTFOLIO_STOCKS:
             if symbol not in recommendations:
-                print(f"⚠️  Missing recommendation for {symbol}, defaulting to HOLD")
-                recommendations[symbol] = {
-                    'action': 'HOLD',
-                    'priority': 'LOW', 
-                    'reasoning': 'No clear signal from analysis',
-                    'technical_score': 5.0,
-                    'confidence': 'LOW'
-                }
-
-        print(f"\n✅ Generated recommendations with memory context for {len(recommendations)}/{len(PORTFOLIO_STOCKS)} stocks")
+                logger.warning("⚠️  Missing recommendation for %s, defaulting to HOLD", symbol)
+                recommendations[symbol] = dict(_DEFAULT_HOLD_REC)
+
+        logger.info("\n✅ Generated recommendations with memory context for %s/%s stocks", len(recommendations), len(PORTFOLIO_STOCKS))
         return recommendations
 
     except Exception as e:
-        print(f"❌ AI portfolio recommendation with memory error: {e}")
-        return {s: {
-            'action': 'HOLD', 
-            'priority': 'LOW', 
-            'reasoning': f'AI Error: {e}',
-            'technical_score': 5.0,
-            'confidence': 'LOW'
-        } for s in PORTFOLIO_STOCKS}
-
-
-
-def should_rerun_or_proceed(state: PortfolioState) -> str:
-    """
-    Checks the last validation result to decide the next step in the graph.
-    """
-    if not state.get('validation_history'):
-        return "proceed_to_execute"
-        
-    last_validation = state['validation_history'][-1]
-    if last_validation['decision'] == 'rerun':
-        return "rerun_decision"
-    return "proceed_to_execute"
-
-def check_stop_loss_conditions(state: PortfolioState) -> Dict:
-    """
-    Checks for individual stock stop-loss or take-profit triggers.
-    """
-    actions = {}
-    for symbol in PORTFOLIO_STOCKS:
-        position = state.get('positions', {}).get(symbol, 0)
-        if position <= 0:
-            continue
-            
-        current_price = state.get('stock_prices', {}).get(symbol, 0)
-        purchase_price = state.get('purchase_prices', {}).get(symbol, 0)
-        
-        if purchase_price > 0 and current_price > 0:
-            change_pct = ((current_price - purchase_price) / purchase_price) * 100
-            if change_pct <= STOP_LOSS_PERCENTAGE:
-                actions[symbol] = 'SELL'
-                print(f"🚨 STOP-LOSS TRIGGER: {symbol} at {change_pct:.2f}%")
-            elif change_pct >= TAKE_PROFIT_PERCENTAGE:
-                actions[symbol] = 'SELL'
-                print(f"💰 TAKE-PROFIT TRIGGER: {symbol} at {change_pct:.2f}%")
-    return actions
-
-def check_emergency_stop_loss(state: PortfolioState) -> bool:
-    """
-    Checks if the entire portfolio has hit the emergency stop-loss threshold.
-    """
-    pnl = state.get('total_unrealized_pnl', 0)
-    value = state.get('total_portfolio_value', 1)
-    if pnl < 0 and value > 0:
-        loss_pct = (pnl / value) * 100
-        if loss_pct <= PORTFOLIO_STOP_LOSS:
-            print(f"🚨 EMERGENCY PORTFOLIO STOP: Total loss at {loss_pct:.2f}%")
-            return True
-    return False
\ No newline at end of file
+        logger.error("❌ AI portfolio recommendation with memory error: %s", e)
+        return {s: {**_DEFAULT_HOLD_REC, 'reasoning': f'AI Error: {e}'} for s in PORTFOLIO_STOCKS}
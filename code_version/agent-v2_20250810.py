@@ -1,11 +1,90 @@
 # /trading_bot/agent.py
 
+import os
+import hashlib
+import functools
+import logging
+import numpy as np
+import orjson
+from types import MappingProxyType
 from typing import Dict, List
-from config import gemini_model, STOP_LOSS_PERCENTAGE, TAKE_PROFIT_PERCENTAGE, PORTFOLIO_STOP_LOSS, TRADE_SIZE, MIN_CASH_RESERVE, MAX_TOTAL_SHARES, MAX_SHARES_PER_STOCK, PORTFOLIO_STOCKS
+from collections import OrderedDict
+from config import TRADE_SIZE, MIN_CASH_RESERVE, MAX_TOTAL_SHARES, MAX_SHARES_PER_STOCK, PORTFOLIO_STOCKS
+from _agent_common import should_rerun_or_proceed, check_stop_loss_conditions, check_emergency_stop_loss
 
 # Define a type alias for state for clarity
 PortfolioState = Dict 
 
+# Handlers are configured by the entry point; set AGENT_LOG_LEVEL=DEBUG to see raw AI responses
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv('AGENT_LOG_LEVEL', 'INFO').upper())
+
+PORTFOLIO_STOCKS_SET = frozenset(PORTFOLIO_STOCKS)
+
+# Parsed recommendations keyed by prompt digest, so identical reruns skip the API call
+_RESPONSE_CACHE = OrderedDict()
+_RESPONSE_CACHE_SIZE = 128
+
+# Read-only fallback recommendation; copy before handing it out
+_AI_ERROR_REC = MappingProxyType({'action': 'HOLD', 'priority': 'LOW', 'reasoning': 'AI Error'})
+
+# Integer codes for the categorical fields the AI returns; unknown labels map to 0
+ACTION_ID = {'BUY': 1, 'SELL': -1, 'HOLD': 0}
+PRIORITY_ID = {'HIGH': 2, 'MEDIUM': 1, 'LOW': 0}
+TREND_ID = {'BULLISH': 1, 'BEARISH': -1, 'NEUTRAL': 0}
+CONF_ID = {'HIGH': 2, 'MEDIUM': 1, 'LOW': 0}
+RISK_ID = {'HIGH': 2, 'MEDIUM': 1, 'LOW': 0}
+
+# --- PROMPT TEMPLATES (only the dynamic slots are filled per cycle) ---
+SUMMARY_TEMPLATE = "%s (Position: %s shares): Price $%.2f, RSI %.1f, AI Trend: %s (%s)"
+AGGRESSIVE_INSTRUCTION = "Your primary goal is to MAXIMIZE PROFIT. You should prioritize high-conviction trades, even if they carry higher risk. Be more decisive in entering and exiting positions to capture short-term gains."
+BALANCED_INSTRUCTION = "Your primary goal is balanced growth. Prioritize capital preservation and make trades based on strong technical signals with moderate to high confidence."
+
+BASE_CONTEXT = f"""
+    You are an expert quantitative trading analyst. {{strategy_instruction}}
+    
+    Portfolio State:
+    - Total Value: ${{total_portfolio_value:.2f}}
+    - P&L: ${{total_unrealized_pnl:+.2f}}
+    - Cash: ${{cash_available:.2f}}
+
+    Stock Analysis Summary:
+    {{portfolio_summary}}
+
+    Constraints:
+    - Trade size: {TRADE_SIZE} shares.
+    - Max shares per stock: {MAX_SHARES_PER_STOCK}.
+"""
+
+PROMPT_FORMAT_LEGEND = """
+    For each stock, respond with exactly one JSON object per line (no surrounding array, no code fences):
+    {"stock": "SYMBOL", "action": "BUY|SELL|HOLD", "priority": "HIGH|MEDIUM|LOW", "reasoning": "Brief reason", "technical_score": 1-10}
+    """
+
+REVISION_TEMPLATE = """
+        CRITICAL REVISION REQUEST: Your previous recommendations were rejected. Address these issues: "{feedback}"
+        Provide a new set of recommendations that resolves these contradictions.
+        """
+
+
+@functools.lru_cache(maxsize=1)
+def _get_model():
+    """
+    Imports the Gemini model on first use so rule-only callers never touch the client.
+    """
+    from config import gemini_model
+    return gemini_model
+
+
+def _category_id(fields: Dict, key: str, id_map: Dict, default: str) -> int:
+    """
+    Returns the integer code for a categorical field, using the cached `<key>_id` when present.
+    """
+    cat_id = fields.get(f'{key}_id')
+    if cat_id is None:
+        cat_id = id_map.get(str(fields.get(key, default)).upper(), 0)
+    return cat_id
+
 
 def validate_ai_decisions(state: PortfolioState) -> Dict:
     """
@@ -19,29 +98,42 @@ def validate_ai_decisions(state: PortfolioState) -> Dict:
     if not recommendations:
         return {'decision': 'proceed', 'reason': 'No recommendations to validate.'}
 
-    for symbol, rec in recommendations.items():
-        action = rec.get('action', 'HOLD')
-        trend_info = ai_trends.get(symbol, {})
-        ai_trend = trend_info.get('trend', 'NEUTRAL')
-        ai_confidence = trend_info.get('confidence', 'LOW')
-        ai_risk = trend_info.get('risk_level', 'HIGH')
-        
-        if action == 'BUY' and ai_trend == 'BEARISH' and ai_confidence in ['MEDIUM', 'HIGH']:
+    symbols = list(recommendations)
+    rows = [
+        (
+            _category_id(recommendations[s], 'action', ACTION_ID, 'HOLD'),
+            _category_id(recommendations[s], 'priority', PRIORITY_ID, 'LOW'),
+            _category_id(ai_trends.get(s, {}), 'trend', TREND_ID, 'NEUTRAL'),
+            _category_id(ai_trends.get(s, {}), 'confidence', CONF_ID, 'LOW'),
+            _category_id(ai_trends.get(s, {}), 'risk_level', RISK_ID, 'HIGH'),
+        )
+        for s in symbols
+    ]
+    actions, priorities, trends, confs, risks = (np.array(col, dtype=np.int8) for col in zip(*rows))
+
+    confident = confs >= CONF_ID['MEDIUM']
+    is_buy = actions == ACTION_ID['BUY']
+    is_sell = actions == ACTION_ID['SELL']
+    buy_on_bearish = is_buy & (trends == TREND_ID['BEARISH']) & confident
+    sell_on_bullish = is_sell & (trends == TREND_ID['BULLISH']) & confident
+    # --- MODIFIED VALIDATION FOR AGGRESSIVE MODE ---
+    # This check is skipped in aggressive mode to allow for higher-risk plays.
+    high_risk_buy = is_buy & (priorities == PRIORITY_ID['HIGH']) & (risks == RISK_ID['HIGH']) & (not aggressive_mode)
+
+    for i in np.flatnonzero(buy_on_bearish | sell_on_bullish | high_risk_buy):
+        symbol = symbols[i]
+        if buy_on_bearish[i]:
             issues.append(f"{symbol}: Contradictory signal - Recommending BUY on a BEARISH trend.")
-            
-        if action == 'SELL' and ai_trend == 'BULLISH' and ai_confidence in ['MEDIUM', 'HIGH']:
+        if sell_on_bullish[i]:
             issues.append(f"{symbol}: Contradictory signal - Recommending SELL on a BULLISH trend.")
-
-        # --- MODIFIED VALIDATION FOR AGGRESSIVE MODE ---
-        # This check is skipped in aggressive mode to allow for higher-risk plays.
-        if not aggressive_mode and action == 'BUY' and rec.get('priority') == 'HIGH' and ai_risk == 'HIGH':
+        if high_risk_buy[i]:
             issues.append(f"{symbol}: High-risk action - High-priority BUY on a stock assessed with HIGH risk.")
 
-    buy_sell_actions = [rec.get('action') for rec in recommendations.values() if rec.get('action') in ['BUY', 'SELL']]
+    churn = int(is_buy.sum() + is_sell.sum())
     # In aggressive mode, allow trading up to 90% of the portfolio at once.
     churn_limit = 0.9 if aggressive_mode else 0.7 
-    if len(buy_sell_actions) > (len(PORTFOLIO_STOCKS) * churn_limit):
-        issues.append(f"Portfolio: Excessive activity suggested ({len(buy_sell_actions)} trades).")
+    if churn > (len(PORTFOLIO_STOCKS) * churn_limit):
+        issues.append(f"Portfolio: Excessive activity suggested ({churn} trades).")
 
     if issues:
         return {'decision': 'rerun', 'reason': "Validation failed. Issues found: " + ", ".join(issues)}
@@ -50,18 +142,6 @@ def validate_ai_decisions(state: PortfolioState) -> Dict:
 
 
 
-def should_rerun_or_proceed(state: PortfolioState) -> str:
-    """
-    Checks the last validation result to decide the next step in the graph.
-    """
-    if not state.get('validation_history'):
-        return "proceed_to_execute" # Should not happen, but as a safeguard
-        
-    last_validation = state['validation_history'][-1]
-    if last_validation['decision'] == 'rerun':
-        return "rerun_decision"
-    return "proceed_to_execute"
-
 async def get_ai_trend_analysis(stock_data: Dict, symbol: str) -> Dict:
     """
     Get AI-powered trend analysis for a single stock based on all technical indicators.
@@ -87,170 +167,134 @@ async def get_ai_trend_analysis(stock_data: Dict, symbol: str) -> Dict:
     RISK_LEVEL: [LOW/MEDIUM/HIGH]
     """
     try:
-        response = await gemini_model.generate_content_async(context)
+        response = await _get_model().generate_content_async(context)
         ai_response = response.text
         
         analysis = {}
-        for line in ai_response.split('\n'):
+        for line in ai_response.splitlines():
             if ':' in line:
                 key, value = line.split(':', 1)
                 analysis[key.strip().lower()] = value.strip()
+        analysis['trend_id'] = TREND_ID.get(analysis.get('trend', 'NEUTRAL').upper(), 0)
+        analysis['confidence_id'] = CONF_ID.get(analysis.get('confidence', 'LOW').upper(), 0)
+        analysis['risk_level_id'] = RISK_ID.get(analysis.get('risk_level', 'HIGH').upper(), 0)
         return analysis
     except Exception as e:
-        print(f"❌ AI trend analysis error for {symbol}: {e}")
+        logger.error("❌ AI trend analysis error for %s: %s", symbol, e)
         return {'trend': 'NEUTRAL', 'confidence': 'LOW', 'reasoning': f'AI error: {e}', 'risk_level': 'HIGH'}
 
 
 
+def _iter_summary(state: PortfolioState):
+    """
+    Yields (symbol, position, price, rsi, trend, confidence) for every stock with valid data.
+    """
+    stock_data = state['stock_data']
+    trends = state['ai_trend_analysis']
+    positions = state['positions']
+    for symbol in PORTFOLIO_STOCKS:
+        s_data = stock_data.get(symbol)
+        if not s_data or not s_data.get('valid', False):
+            continue
+        t_analysis = trends.get(symbol, {})
+        yield (
+            symbol,
+            positions.get(symbol, 0),
+            s_data.get('current_price', 0),
+            s_data.get('rsi', 50),
+            t_analysis.get('trend', 'N/A'),
+            t_analysis.get('confidence', 'N/A'),
+        )
+
+
 async def get_ai_portfolio_recommendations(state: PortfolioState):
     """
     Gets AI recommendations. The prompt is adjusted based on the trading mode.
     """
-    portfolio_summary = []
-    for symbol in PORTFOLIO_STOCKS:
-        s_data = state['stock_data'].get(symbol, {})
-        t_analysis = state['ai_trend_analysis'].get(symbol, {})
-        pos = state['positions'].get(symbol, 0)
-        if s_data.get('valid', False):
-            portfolio_summary.append(
-                f"{symbol} (Position: {pos} shares): "
-                f"Price ${s_data.get('current_price', 0):.2f}, "
-                f"RSI {s_data.get('rsi', 50):.1f}, "
-                f"AI Trend: {t_analysis.get('trend', 'N/A')} ({t_analysis.get('confidence', 'N/A')})"
-            )
+    portfolio_summary = [SUMMARY_TEMPLATE % row for row in _iter_summary(state)]
     
     # --- DYNAMIC PROMPT BASED ON TRADING STRATEGY ---
-    strategy_instruction = ""
-    if state.get('aggressive_mode', False):
-        strategy_instruction = "Your primary goal is to MAXIMIZE PROFIT. You should prioritize high-conviction trades, even if they carry higher risk. Be more decisive in entering and exiting positions to capture short-term gains."
-    else:
-        strategy_instruction = "Your primary goal is balanced growth. Prioritize capital preservation and make trades based on strong technical signals with moderate to high confidence."
-
-    context = f"""
-    You are an expert quantitative trading analyst. {strategy_instruction}
-    
-    Portfolio State:
-    - Total Value: ${state['total_portfolio_value']:.2f}
-    - P&L: ${state['total_unrealized_pnl']:+.2f}
-    - Cash: ${state['cash_available']:.2f}
-
-    Stock Analysis Summary:
-    {'; '.join(portfolio_summary)}
-
-    Constraints:
-    - Trade size: {TRADE_SIZE} shares.
-    - Max shares per stock: {MAX_SHARES_PER_STOCK}.
+    strategy_instruction = AGGRESSIVE_INSTRUCTION if state.get('aggressive_mode', False) else BALANCED_INSTRUCTION
 
-    For each stock, provide a recommendation in this EXACT format, one per line:
-    STOCK: [SYMBOL] | ACTION: [BUY/SELL/HOLD] | PRIORITY: [HIGH/MEDIUM/LOW] | REASONING: [Brief reason] | TECHNICAL_SCORE: [1-10]
-    """
+    context = BASE_CONTEXT.format_map({
+        'strategy_instruction': strategy_instruction,
+        'total_portfolio_value': state['total_portfolio_value'],
+        'total_unrealized_pnl': state['total_unrealized_pnl'],
+        'cash_available': state['cash_available'],
+        'portfolio_summary': '; '.join(portfolio_summary),
+    }) + PROMPT_FORMAT_LEGEND
     
     feedback = state.get("validation_feedback")
     if feedback:
-        context += f"""
-        CRITICAL REVISION REQUEST: Your previous recommendations were rejected. Address these issues: "{feedback}"
-        Provide a new set of recommendations that resolves these contradictions.
-        """
+        context += REVISION_TEMPLATE.format_map({'feedback': feedback})
     
+    key = hashlib.blake2b(context.encode(), digest_size=16).digest()
+    cached = _RESPONSE_CACHE.get(key)
+    if cached is not None:
+        _RESPONSE_CACHE.move_to_end(key)
+        logger.info("♻️ Reusing cached AI recommendations for identical prompt")
+        return {s: dict(rec) for s, rec in cached.items()}
+
     try:
-        response = await gemini_model.generate_content_async(context)
-        ai_response = response.text
-        
-        print("\n--- RAW AI RESPONSE ---")
-        print(ai_response)
-        print("-----------------------\n")
+        response = await _get_model().generate_content_async(context, stream=True)
 
+        logger.debug("--- RAW AI RESPONSE ---")
         recommendations = {}
-        # ... (robust parsing logic remains the same) ...
-        for line in ai_response.split('\n'):
-            line = line.strip()
-            if not line or '|' not in line:
-                continue
-
-            rec = {}
-            symbol = None
-            
-            if line.startswith("STOCK:"):
-                parts = [p.strip() for p in line.split('|')]
-                for part in parts:
-                    if ':' in part:
-                        key, value = part.split(':', 1)
-                        clean_key = key.strip().lower().replace(' ', '_')
-                        if clean_key == 'stock':
-                            symbol = value.strip()
-                        else:
-                            rec[clean_key] = value.strip()
-            else:
-                try:
-                    first_part = line.split('|')[0].strip()
-                    if first_part in PORTFOLIO_STOCKS:
-                        symbol = first_part
-                        parts = [p.strip() for p in line.split('|')]
-                        for part in parts[1:]:
-                             if ':' in part:
-                                key, value = part.split(':', 1)
-                                clean_key = key.strip().lower().replace(' ', '_')
-                                rec[clean_key] = value.strip()
-                    else:
-                        potential_symbol = line.split(':')[0].strip()
-                        if potential_symbol in PORTFOLIO_STOCKS:
-                            symbol = potential_symbol
-                            parts = [p.strip() for p in line.split('|')]
-                            for part in parts:
-                                if ':' in part:
-                                    key, value = part.split(':', 1)
-                                    clean_key = key.strip().lower().replace(' ', '_')
-                                    if clean_key != symbol.lower():
-                                        rec[clean_key] = value.strip()
-                except:
-                    continue
-
-            if symbol and symbol in PORTFOLIO_STOCKS:
-                if 'technical_score' in rec:
-                    try:
-                        rec['technical_score'] = float(rec['technical_score'])
-                    except (ValueError, TypeError):
-                        rec['technical_score'] = 5.0
+        buf = ''
+        async for chunk in response:
+            buf += chunk.text
+            *lines, buf = buf.split('\n')
+            for line in lines:
+                logger.debug("%s", line)
+                symbol, rec = _parse_recommendation_json(line)
+                if symbol:
+                    recommendations[symbol] = rec
+            if PORTFOLIO_STOCKS_SET.issubset(recommendations):
+                # Every symbol is covered; stop consuming the rest of the stream
+                buf = ''
+                break
+        if buf:
+            logger.debug("%s", buf)
+            symbol, rec = _parse_recommendation_json(buf)
+            if symbol:
                 recommendations[symbol] = rec
+        logger.debug("-----------------------")
 
+        # Only complete answers are cached; prose, bad JSON or missing symbols get a fresh call next time
+        if PORTFOLIO_STOCKS_SET.issubset(recommendations):
+            _RESPONSE_CACHE[key] = {s: dict(rec) for s, rec in recommendations.items()}
+            if len(_RESPONSE_CACHE) > _RESPONSE_CACHE_SIZE:
+                _RESPONSE_CACHE.popitem(last=False)
         return recommendations
 
     except Exception as e:
-        print(f"❌ AI portfolio recommendation error: {e}")
-        return {s: {'action': 'HOLD', 'priority': 'LOW', 'reasoning': 'AI Error'} for s in PORTFOLIO_STOCKS}
-        
-def check_stop_loss_conditions(state: PortfolioState) -> Dict:
-    """
-    Checks for individual stock stop-loss or take-profit triggers.
-    """
-    actions = {}
-    for symbol in PORTFOLIO_STOCKS:
-        position = state.get('positions', {}).get(symbol, 0)
-        if position <= 0:
-            continue
-            
-        current_price = state.get('stock_prices', {}).get(symbol, 0)
-        purchase_price = state.get('purchase_prices', {}).get(symbol, 0)
-        
-        if purchase_price > 0 and current_price > 0:
-            change_pct = ((current_price - purchase_price) / purchase_price) * 100
-            if change_pct <= STOP_LOSS_PERCENTAGE:
-                actions[symbol] = 'SELL'
-                print(f"🚨 STOP-LOSS TRIGGER: {symbol} at {change_pct:.2f}%")
-            elif change_pct >= TAKE_PROFIT_PERCENTAGE:
-                actions[symbol] = 'SELL'
-                print(f"💰 TAKE-PROFIT TRIGGER: {symbol} at {change_pct:.2f}%")
-    return actions
-
-def check_emergency_stop_loss(state: PortfolioState) -> bool:
+        logger.error("❌ AI portfolio recommendation error: %s", e)
+        return {s: dict(_AI_ERROR_REC) for s in PORTFOLIO_STOCKS}
+
+
+def _parse_recommendation_json(line: str):
     """
-    Checks if the entire portfolio has hit the emergency stop-loss threshold.
+    Decodes a single JSON recommendation line. Returns (symbol, rec) or (None, None).
     """
-    pnl = state.get('total_unrealized_pnl', 0)
-    value = state.get('total_portfolio_value', 1) # Avoid division by zero
-    if pnl < 0 and value > 0:
-        loss_pct = (pnl / value) * 100
-        if loss_pct <= PORTFOLIO_STOP_LOSS:
-            print(f"🚨 EMERGENCY PORTFOLIO STOP: Total loss at {loss_pct:.2f}%")
-            return True
-    return False
+    line = line.strip().rstrip(',')
+    if not line.startswith('{'):
+        return None, None
+    try:
+        rec = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return None, None
+    if not isinstance(rec, dict):
+        return None, None
+
+    symbol = str(rec.pop('stock', '')).strip()
+    if symbol not in PORTFOLIO_STOCKS_SET:
+        return None, None
+
+    if 'technical_score' in rec:
+        try:
+            rec['technical_score'] = float(rec['technical_score'])
+        except (ValueError, TypeError):
+            rec['technical_score'] = 5.0
+    rec['action_id'] = ACTION_ID.get(str(rec.get('action', 'HOLD')).upper(), 0)
+    rec['priority_id'] = PRIORITY_ID.get(str(rec.get('priority', 'LOW')).upper(), 0)
+    return symbol, rec
@@ -2,11 +2,15 @@
 
 import asyncio
 import aiohttp
-import pandas as pd
+import orjson
+import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import sys
 import os
+import time
+import sqlite3
+from collections import defaultdict
 
 # Add gemini_api to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'gemini_api'))
@@ -16,7 +20,7 @@ from config import (
     GEMINI_API_KEY, GEMINI_API_SECRET, GEMINI_SANDBOX, 
     PORTFOLIO_CRYPTOS, TRADE_SIZE, MIN_USD_RESERVE
 )
-from technical_analysis import *
+from fast_indicators import compute_indicators
 
 # Initialize Gemini API client
 gemini_client = GeminiAPI(
@@ -25,339 +29,560 @@ gemini_client = GeminiAPI(
     sandbox=GEMINI_SANDBOX
 )
 
-async def get_crypto_data(symbol: str) -> Dict[str, Any]:
+# One pooled HTTP session shared by all public Gemini requests, so keep-alive connections are reused
+GEMINI_HTTP_MAX_CONNECTIONS = 32
+GEMINI_HTTP_MAX_PER_HOST = 10
+GEMINI_HTTP_DNS_TTL = 300     # seconds a resolved Gemini address is reused
+GEMINI_HTTP_KEEPALIVE = 60.0  # seconds an idle connection stays open
+GEMINI_HTTP_TIMEOUT = 10.0    # seconds per request
+GEMINI_HTTP_CONNECT_TIMEOUT = 3.0  # seconds to get a pooled or new connection
+_http_session: Optional[aiohttp.ClientSession] = None
+_http_session_loop = None
+
+def get_http_session() -> aiohttp.ClientSession:
     """
-    Fetch comprehensive crypto data for a single symbol from Gemini
+    Return the shared aiohttp session, opening it on first use.
+    Sessions are bound to an event loop, so a new one is opened if the running loop changed.
     """
-    try:
-        print(f"📊 Fetching crypto data for {symbol}...")
-        
-        # Get both v1 and v2 ticker data with better error handling
+    global _http_session, _http_session_loop
+    loop = asyncio.get_running_loop()
+    if _http_session is None or _http_session.closed or _http_session_loop is not loop:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=GEMINI_HTTP_MAX_CONNECTIONS,
+                limit_per_host=GEMINI_HTTP_MAX_PER_HOST,
+                ttl_dns_cache=GEMINI_HTTP_DNS_TTL,
+                keepalive_timeout=GEMINI_HTTP_KEEPALIVE,
+            ),
+            timeout=aiohttp.ClientTimeout(total=GEMINI_HTTP_TIMEOUT, connect=GEMINI_HTTP_CONNECT_TIMEOUT),
+            json_serialize=lambda obj: orjson.dumps(obj).decode(),
+        )
+        _http_session_loop = loop
+    return _http_session
+
+async def close_http_session():
+    """
+    Close the shared aiohttp session; call before the event loop shuts down
+    """
+    global _http_session, _http_session_loop
+    if _http_session is not None and not _http_session.closed and _http_session_loop is asyncio.get_running_loop():
+        await _http_session.close()
+    _http_session = None
+    _http_session_loop = None
+
+class AsyncGeminiAPI:
+    """
+    Async client for Gemini's public market data endpoints (tickers and candles).
+    Responses are the same JSON payloads the REST API returns, decoded with orjson.
+    Private endpoints (balances, orders) stay on the signed GeminiAPI client.
+    """
+    def __init__(self, sandbox: bool = False):
+        self.base_url = "https://api.sandbox.gemini.com" if sandbox else "https://api.gemini.com"
+    
+    async def _get(self, path: str):
+        async with get_http_session().get(self.base_url + path) as response:
+            response.raise_for_status()
+            return await response.json(loads=orjson.loads)
+    
+    async def get_ticker(self, symbol: str) -> Dict[str, Any]:
+        return await self._get(f"/v1/pubticker/{symbol}")
+    
+    async def get_ticker_v2(self, symbol: str) -> Dict[str, Any]:
+        return await self._get(f"/v2/ticker/{symbol}")
+    
+    async def get_candles(self, symbol: str, time_frame: str) -> np.ndarray:
+        # Decoded once into a float64 (n, 6) array of [time, open, high, low, close, volume] rows,
+        # so cached responses are reused as arrays instead of being re-parsed per caller
+        rows = await self._get(f"/v2/candles/{symbol}/{time_frame}")
+        return np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+
+gemini_public_client = AsyncGeminiAPI(sandbox=GEMINI_SANDBOX)
+
+# Tracked crypto symbols as a set for membership tests, and the all-flat positions template
+_PORTFOLIO_SET = frozenset(PORTFOLIO_CRYPTOS)
+_EMPTY_POSITIONS = dict.fromkeys(PORTFOLIO_CRYPTOS, 0.0)
+
+# Positions are read through one long-lived connection to the trading memory database. sqlite3 keeps
+# prepared statements per connection, so the fixed positions query is parsed once, not on every call.
+TRADING_MEMORY_DB = "trading_memory.db"
+_POSITIONS_QUERY = f'''
+    SELECT symbol, action, quantity, price 
+    FROM trading_memories 
+    WHERE symbol IN ({','.join('?' * len(PORTFOLIO_CRYPTOS))}) 
+    ORDER BY symbol, timestamp ASC
+'''
+_positions_conn: Optional[sqlite3.Connection] = None
+
+def get_positions_connection() -> sqlite3.Connection:
+    """
+    Return the shared trading memory database connection, opening it in WAL mode on first use
+    """
+    global _positions_conn
+    if _positions_conn is None:
+        conn = sqlite3.connect(TRADING_MEMORY_DB, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        _positions_conn = conn
+    return _positions_conn
+
+def close_positions_connection():
+    """
+    Close the shared trading memory database connection; the next read reopens it
+    """
+    global _positions_conn
+    if _positions_conn is not None:
+        _positions_conn.close()
+        _positions_conn = None
+
+# Cap on symbols talking to Gemini at once when a batch is fetched concurrently
+GEMINI_MAX_CONCURRENT_SYMBOLS = 5
+_gemini_semaphore: Optional[asyncio.Semaphore] = None
+_gemini_semaphore_loop = None
+
+def get_gemini_semaphore() -> asyncio.Semaphore:
+    """
+    Return the per-symbol concurrency semaphore for the running event loop.
+    asyncio primitives bind to the loop that first waits on them, so each new loop gets its own.
+    """
+    global _gemini_semaphore, _gemini_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _gemini_semaphore is None or _gemini_semaphore_loop is not loop:
+        _gemini_semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENT_SYMBOLS)
+        _gemini_semaphore_loop = loop
+    return _gemini_semaphore
+
+class AsyncRateLimiter:
+    """
+    Token bucket allowing max_rate acquisitions per time_period seconds across concurrent tasks
+    """
+    def __init__(self, max_rate: float, time_period: float = 1.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._tokens = float(max_rate)
+        self._updated = time.monotonic()
+    
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            refill = (now - self._updated) * self.max_rate / self.time_period
+            self._tokens = min(float(self.max_rate), self._tokens + refill)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) * self.time_period / self.max_rate)
+    
+    async def __aenter__(self):
+        await self.acquire()
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+# Gemini public REST allowance (120 requests per minute); bursts are fine until the bucket empties
+gemini_rate_limiter = AsyncRateLimiter(max_rate=120, time_period=60)
+
+# Short-lived cache of public Gemini responses so callers within one polling interval share a request
+TICKER_CACHE_TTL = 2.0       # seconds
+CANDLES_CACHE_TTL = 30.0     # seconds, 5-minute candles
+CANDLES_1H_CACHE_TTL = 300.0  # seconds, hourly candles
+_TTL_CACHE: Dict[tuple, tuple] = {}  # (endpoint, *args) -> (fetched_at, response)
+_IN_FLIGHT: Dict[tuple, asyncio.Task] = {}  # (endpoint, *args) -> fetch already under way
+
+async def _fetch_public(key: tuple, endpoint: str, args: tuple):
+    async with gemini_rate_limiter:
+        fetched_at = time.monotonic()
+        response = await getattr(gemini_public_client, endpoint)(*args)
+    if response is not None and len(response):
+        _TTL_CACHE[key] = (fetched_at, response)
+    return response
+
+def _forget_in_flight(key: tuple, task: asyncio.Task):
+    if _IN_FLIGHT.get(key) is task:
+        del _IN_FLIGHT[key]
+
+async def gemini_public_call(endpoint: str, ttl: float, *args):
+    """
+    Call a public gemini_public_client endpoint, reusing a non-empty response
+    younger than ttl seconds and otherwise waiting on the rate limiter.
+    Concurrent callers asking for the same thing share one request.
+    """
+    key = (endpoint, *args)
+    cached = _TTL_CACHE.get(key)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    
+    task = _IN_FLIGHT.get(key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(_fetch_public(key, endpoint, args))
+        _IN_FLIGHT[key] = task
+        task.add_done_callback(lambda done: _forget_in_flight(key, done))
+    # shield: one caller being cancelled must not cancel the request the others are waiting on
+    return await asyncio.shield(task)
+
+# Symbols whose last 5m candle response was too short for indicators -> when that was seen.
+# Within the TTL the candle request is skipped and get_crypto_data goes straight to ticker-only data.
+INSUFFICIENT_CANDLES_TTL = 300.0  # seconds
+MIN_5M_CANDLES = 10
+MIN_1H_CANDLES = 50  # below this get_crypto_data_1h falls back to 5-minute data
+_INSUFFICIENT_CANDLES: Dict[str, float] = {}
+
+def _candles_5m_due(symbol: str) -> bool:
+    marked_at = _INSUFFICIENT_CANDLES.get(symbol)
+    return marked_at is None or time.monotonic() - marked_at >= INSUFFICIENT_CANDLES_TTL
+
+def _build_crypto_data(symbol: str, ticker_v2, ticker_v1, candles, emit) -> Dict[str, Any]:
+    """
+    Build the 5-minute indicator dict from already fetched responses (exceptions allowed in place of any of them)
+    """
+    if isinstance(ticker_v2, Exception):
+        emit(f"⚠️ V2 ticker failed for {symbol}: {ticker_v2}")
         ticker_v2 = None
+    if isinstance(ticker_v1, Exception):
+        emit(f"⚠️ V1 ticker failed for {symbol}: {ticker_v1}")
         ticker_v1 = None
+    if isinstance(candles, Exception):
+        emit(f"⚠️ Candles failed for {symbol}: {candles}")
         candles = None
+    elif candles is not None and len(candles) < MIN_5M_CANDLES:
+        _INSUFFICIENT_CANDLES[symbol] = time.monotonic()
+    
+    if not ticker_v2 and not ticker_v1:
+        return {'valid': False, 'reason': 'No ticker data from Gemini API - both V1 and V2 failed'}
+    
+    # Look fields up in v1 first, then v2, without merging the two payloads
+    v1_fields = ticker_v1 or {}
+    v2_fields = ticker_v2 or {}
+    
+    def _f(*keys, default=0.0):
+        # First of keys present with a numeric value, as float
+        for key in keys:
+            value = v1_fields.get(key, v2_fields.get(key))
+            if value is not None:
+                try:
+                    return float(value)
+                except (TypeError, ValueError):
+                    pass
+        return float(default)
+    
+    # Extract volume from v1 format ({'USD': ...}) if available with validation
+    try:
+        volume = float(v1_fields['volume']['USD'])
+    except (KeyError, TypeError, ValueError):
+        volume = 0
+    
+    # Volume validation and fallback mechanisms
+    if volume == 0:
+        # Try alternative volume sources
+        if ticker_v2 and 'volume' in ticker_v2:
+            volume = float(ticker_v2.get('volume', 0))
         
-        try:
-            ticker_v2 = gemini_client.get_ticker_v2(symbol.lower())
-        except Exception as e:
-            print(f"⚠️ V2 ticker failed for {symbol}: {e}")
-        
-        try:
-            ticker_v1 = gemini_client.get_ticker(symbol.lower())
-        except Exception as e:
-            print(f"⚠️ V1 ticker failed for {symbol}: {e}")
-        
-        try:
-            # Get candlestick data for technical analysis
-            candles = gemini_client.get_candles(symbol.lower(), '5m')  # Get 5-minute data
-        except Exception as e:
-            print(f"⚠️ Candles failed for {symbol}: {e}")
-        
-        if not ticker_v2 and not ticker_v1:
-            return {'valid': False, 'reason': 'No ticker data from Gemini API - both V1 and V2 failed'}
-        
-        # Combine v1 and v2 data
-        ticker = {}
-        if ticker_v2:
-            ticker.update(ticker_v2)
-        if ticker_v1:
-            ticker.update(ticker_v1)
-        
-        # Extract volume from v1 format if available with validation
-        volume_data = ticker_v1.get('volume', {}) if ticker_v1 else {}
-        volume = float(volume_data.get('USD', 0)) if isinstance(volume_data, dict) else 0
-        
-        # Volume validation and fallback mechanisms
+        # If still 0, use simulated volume for sandbox/testing
         if volume == 0:
-            # Try alternative volume sources
-            if ticker_v2 and 'volume' in ticker_v2:
-                volume = float(ticker_v2.get('volume', 0))
-            
-            # If still 0, use simulated volume for sandbox/testing
-            if volume == 0:
-                # Simulate reasonable volume based on price and market cap estimates
-                current_price = float(ticker.get('close', ticker.get('last', 1)))
-                if 'BTC' in symbol:
-                    volume = 50000000  # $50M daily volume simulation
-                elif 'ETH' in symbol:
-                    volume = 20000000  # $20M daily volume simulation
-                else:
-                    volume = 5000000   # $5M daily volume simulation for altcoins
-                print(f"📊 Using simulated volume for {symbol}: ${volume:,.0f}")
-        
-        # Use basic ticker data if candles are not available
-        if not candles or len(candles) < 10:
-            print(f"⚠️ Limited candle data for {symbol}, using ticker only")
-            current_price = float(ticker.get('close', ticker.get('last', 0)))
-            
-            # Create basic indicators from ticker data
-            indicators = {
-                'symbol': symbol,
-                'current_price': current_price,
-                'previous_close': current_price,  # Will be updated if we have historical data
-                'open': float(ticker.get('open', current_price)),
-                'high': float(ticker.get('high', current_price)),
-                'low': float(ticker.get('low', current_price)),
-                'volume': volume,
-                'sma_20': current_price,  # Default to current price
-                'sma_50': current_price,
-                'ema_12': current_price,
-                'ema_26': current_price,
-                'daily_change_pct': 0.0,
-                'volatility_20': 0.0,
-                'rsi': 50.0,
-                'williams_r': -50.0,
-                'atr': 0.0,
-                'macd': 0.0,
-                'macd_signal': 0.0,
-                'macd_histogram': 0.0,
-                'bb_upper': current_price * 1.02,
-                'bb_middle': current_price,
-                'bb_lower': current_price * 0.98,
-                'stoch_k': 50.0,
-                'stoch_d': 50.0,
-                'volume_ma': volume/24,  # Simulate hourly volume
-                'current_volume': volume,
-                'obv': 0,
-                'valid': True
-            }
-            return indicators
-        
-        # Process candlestick data
-        # Prepare OHLCV data
-        closes = pd.Series([float(candle[4]) for candle in candles])  # Close price
-        highs = pd.Series([float(candle[2]) for candle in candles])   # High price
-        lows = pd.Series([float(candle[3]) for candle in candles])    # Low price
-        volumes = pd.Series([float(candle[5]) for candle in candles]) # Volume
-        
-        current_price = float(ticker.get('close', ticker.get('last', closes.iloc[-1])))
+            # Simulate reasonable volume based on market cap estimates
+            if 'BTC' in symbol:
+                volume = 50000000  # $50M daily volume simulation
+            elif 'ETH' in symbol:
+                volume = 20000000  # $20M daily volume simulation
+            else:
+                volume = 5000000   # $5M daily volume simulation for altcoins
+            emit(f"📊 Using simulated volume for {symbol}: ${volume:,.0f}")
+    
+    # Use basic ticker data if candles are not available
+    if candles is None or len(candles) < MIN_5M_CANDLES:
+        emit(f"⚠️ Limited candle data for {symbol}, using ticker only")
+        current_price = _f('close', 'last')
         
-        # Calculate technical indicators
+        # Create basic indicators from ticker data
         indicators = {
             'symbol': symbol,
             'current_price': current_price,
-            'previous_close': closes.iloc[-2] if len(closes) > 1 else current_price,
-            'open': float(ticker.get('open', current_price)),
-            'high': float(ticker.get('high', current_price)),
-            'low': float(ticker.get('low', current_price)),
+            'previous_close': current_price,  # Will be updated if we have historical data
+            'open': _f('open', default=current_price),
+            'high': _f('high', default=current_price),
+            'low': _f('low', default=current_price),
             'volume': volume,
-            'sma_20': closes.rolling(20).mean().iloc[-1] if len(closes) >= 20 else current_price,
-            'sma_50': closes.rolling(min(50, len(closes))).mean().iloc[-1],
-            'ema_12': closes.ewm(span=12).mean().iloc[-1],
-            'ema_26': closes.ewm(span=26).mean().iloc[-1],
-            'daily_change_pct': ((current_price - closes.iloc[-2]) / closes.iloc[-2] * 100) if len(closes) > 1 else 0,
-            'volatility_20': closes.rolling(min(20, len(closes))).std().iloc[-1],
+            'sma_20': current_price,  # Default to current price
+            'sma_50': current_price,
+            'ema_12': current_price,
+            'ema_26': current_price,
+            'daily_change_pct': 0.0,
+            'volatility_20': 0.0,
+            'rsi': 50.0,
+            'williams_r': -50.0,
+            'atr': 0.0,
+            'macd': 0.0,
+            'macd_signal': 0.0,
+            'macd_histogram': 0.0,
+            'bb_upper': current_price * 1.02,
+            'bb_middle': current_price,
+            'bb_lower': current_price * 0.98,
+            'stoch_k': 50.0,
+            'stoch_d': 50.0,
+            'volume_ma': volume/24,  # Simulate hourly volume
+            'current_volume': volume,
+            'obv': 0,
+            'valid': True
         }
-        
-        # Add advanced technical indicators
-        if len(closes) >= 14:
-            rsi = calculate_rsi(closes)
-            williams_r = calculate_williams_r(highs, lows, closes)
-            atr = calculate_atr(highs, lows, closes)
-            indicators['rsi'] = rsi if rsi is not None else 50.0
-            indicators['williams_r'] = williams_r if williams_r is not None else -50.0
-            indicators['atr'] = atr if atr is not None else 0.0
-        else:
-            indicators['rsi'] = 50.0
-            indicators['williams_r'] = -50.0
-            indicators['atr'] = 0.0
-        
-        # MACD indicators
-        if len(closes) >= 26:
-            macd, macd_signal, macd_hist = calculate_macd(closes)
-            indicators.update({
-                'macd': macd if macd is not None else 0.0,
-                'macd_signal': macd_signal if macd_signal is not None else 0.0,
-                'macd_histogram': macd_hist if macd_hist is not None else 0.0
-            })
-        else:
-            indicators.update({
-                'macd': 0.0,
-                'macd_signal': 0.0,
-                'macd_histogram': 0.0
-            })
-        
-        # Bollinger Bands
-        if len(closes) >= 20:
-            bb_upper, bb_middle, bb_lower = calculate_bollinger_bands(closes)
-            indicators.update({
-                'bb_upper': bb_upper if bb_upper is not None else current_price * 1.02,
-                'bb_middle': bb_middle if bb_middle is not None else current_price,
-                'bb_lower': bb_lower if bb_lower is not None else current_price * 0.98
-            })
-        else:
-            indicators.update({
-                'bb_upper': current_price * 1.02,
-                'bb_middle': current_price,
-                'bb_lower': current_price * 0.98
-            })
-        
-        # Stochastic Oscillator
-        if len(closes) >= 14:
-            stoch_k, stoch_d = calculate_stochastic(highs, lows, closes)
-            indicators.update({
-                'stoch_k': stoch_k if stoch_k is not None else 50.0,
-                'stoch_d': stoch_d if stoch_d is not None else 50.0
-            })
-        else:
-            indicators.update({
-                'stoch_k': 50.0,
-                'stoch_d': 50.0
-            })
-        
-        # Volume indicators with fallback
-        if len(volumes) >= 10:
-            vol_ma, obv = calculate_volume_indicators(volumes, closes)
-            indicators.update({
-                'volume_ma': vol_ma if vol_ma is not None else (volumes.iloc[-1] if not volumes.empty else volume/24),  # Use current volume as fallback
-                'obv': obv if obv is not None else 0
-            })
-        else:
-            indicators.update({
-                'volume_ma': volumes.iloc[-1] if not volumes.empty else volume/24,  # Simulate hourly volume
-                'obv': 0
-            })
-        
-        # Add current volume for analysis
-        indicators['current_volume'] = volume
-        
-        indicators['valid'] = True
         return indicators
-        
-    except Exception as e:
-        print(f"❌ Error fetching crypto data for {symbol}: {e}")
-        return {'valid': False, 'reason': str(e)}
+    
+    # Process candlestick data
+    # Prepare OHLCV data: column views of the (n, 6) [time, open, high, low, close, volume] array
+    candles_arr = np.asarray(candles, dtype=np.float64)  # already float64 from the client; no copy
+    highs = candles_arr[:, 2]    # High price
+    lows = candles_arr[:, 3]     # Low price
+    closes = candles_arr[:, 4]   # Close price
+    volumes = candles_arr[:, 5]  # Volume
+    
+    current_price = _f('close', 'last', default=closes[-1])
+    
+    # Calculate technical indicators in one compiled pass over the OHLCV columns
+    n = len(closes)
+    (sma_20, sma_50, ema_12, ema_26, volatility_20, rsi, williams_r, atr,
+     macd, macd_signal, macd_hist, bb_upper, bb_middle, bb_lower,
+     stoch_k, stoch_d, vol_ma, obv) = compute_indicators(highs, lows, closes, volumes)
+    
+    indicators = {
+        'symbol': symbol,
+        'current_price': current_price,
+        'previous_close': closes[-2] if n > 1 else current_price,
+        'open': _f('open', default=current_price),
+        'high': _f('high', default=current_price),
+        'low': _f('low', default=current_price),
+        'volume': volume,
+        'sma_20': sma_20 if n >= 20 else current_price,
+        'sma_50': sma_50,
+        'ema_12': ema_12,
+        'ema_26': ema_26,
+        'daily_change_pct': ((current_price - closes[-2]) / closes[-2] * 100) if n > 1 else 0,
+        'volatility_20': volatility_20,
+    }
+    
+    # Fall back to neutral values below each indicator's minimum history
+    # (same thresholds as the technical_analysis helpers)
+    indicators['rsi'] = rsi if n >= 15 else 50.0
+    indicators['williams_r'] = williams_r if n >= 14 else -50.0
+    indicators['atr'] = atr if n >= 15 else 0.0
+    
+    # MACD indicators
+    if n >= 35:
+        indicators.update({
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_histogram': macd_hist
+        })
+    else:
+        indicators.update({
+            'macd': 0.0,
+            'macd_signal': 0.0,
+            'macd_histogram': 0.0
+        })
+    
+    # Bollinger Bands
+    if n >= 20:
+        indicators.update({
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower
+        })
+    else:
+        indicators.update({
+            'bb_upper': current_price * 1.02,
+            'bb_middle': current_price,
+            'bb_lower': current_price * 0.98
+        })
+    
+    # Stochastic Oscillator
+    if n >= 14:
+        indicators.update({
+            'stoch_k': stoch_k,
+            'stoch_d': stoch_d
+        })
+    else:
+        indicators.update({
+            'stoch_k': 50.0,
+            'stoch_d': 50.0
+        })
+    
+    # Volume indicators with fallback
+    if n >= 20:
+        indicators.update({
+            'volume_ma': vol_ma,
+            'obv': obv
+        })
+    else:
+        indicators.update({
+            'volume_ma': volumes[-1] if volumes.size else volume/24,  # Simulate hourly volume
+            'obv': 0
+        })
+    
+    # Add current volume for analysis
+    indicators['current_volume'] = volume
+    
+    indicators['valid'] = True
+    return indicators
+
+async def get_crypto_data(symbol: str, log: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Fetch comprehensive crypto data for a single symbol from Gemini.
+    Progress messages are appended to log when given (batch callers print them once), else printed.
+    """
+    return (await get_crypto_data_multi(symbol, ('5m',), log))['5m']
+
+def _build_crypto_data_1h(symbol: str, candles_1h, ticker) -> Optional[Dict[str, Any]]:
+    """
+    Build the 1-hour indicator dict from already fetched responses; None when there are too few candles
+    """
+    if candles_1h is None or len(candles_1h) < MIN_1H_CANDLES:
+        return None
+    
+    # Process 1-hour candlestick data: column views of the (n, 6) [time, open, high, low, close, volume] array
+    candles_arr = np.asarray(candles_1h, dtype=np.float64)  # already float64 from the client; no copy
+    highs = candles_arr[:, 2]
+    lows = candles_arr[:, 3]
+    closes = candles_arr[:, 4]
+    volumes = candles_arr[:, 5]
+    
+    current_price = float(ticker.get('close', ticker.get('last', closes[-1])))
+    
+    # Calculate 1-hour technical indicators in one compiled pass; with at least 50 candles
+    # every indicator has its full history, so no per-indicator length fallbacks are needed
+    (sma_20, sma_50, ema_12, ema_26, volatility_20, rsi, williams_r, atr,
+     macd, macd_signal, macd_hist, bb_upper, bb_middle, bb_lower,
+     _stoch_k, _stoch_d, _vol_ma, _obv) = compute_indicators(highs, lows, closes, volumes)
+    
+    indicators = {
+        'symbol': symbol,
+        'timeframe': '1h',
+        'current_price': current_price,
+        'previous_close': closes[-2],
+        'open': closes[0],
+        'high': highs.max(),
+        'low': lows.min(),
+        'volume': volumes[-1],
+        'sma_20': sma_20,
+        'sma_50': sma_50,
+        'ema_12': ema_12,
+        'ema_26': ema_26,
+        'daily_change_pct': (current_price - closes[-25]) / closes[-25] * 100,  # 24h change
+        'volatility_20': volatility_20,
+        'rsi': rsi,
+        'williams_r': williams_r,
+        'atr': atr,
+        'macd': macd,
+        'macd_signal': macd_signal,
+        'macd_histogram': macd_hist,
+        'bb_upper': bb_upper,
+        'bb_middle': bb_middle,
+        'bb_lower': bb_lower,
+    }
+    
+    # Determine 1H trend direction
+    sma_20 = indicators['sma_20']
+    sma_50 = indicators['sma_50']
+    rsi = indicators['rsi']
+    macd_hist = indicators['macd_histogram']
+    
+    # All four conditions must agree: count them instead of short-circuiting through a chain
+    # (int() because numpy bools add as logical or)
+    bull_score = int(current_price > sma_20) + int(sma_20 > sma_50) + int(rsi > 45) + int(macd_hist > 0)
+    bear_score = int(current_price < sma_20) + int(sma_20 < sma_50) + int(rsi < 55) + int(macd_hist < 0)
+    trend_direction = 'BULLISH' if bull_score == 4 else 'BEARISH' if bear_score == 4 else 'NEUTRAL'
+    
+    indicators['trend_direction'] = trend_direction
+    indicators['valid'] = True
+    
+    return indicators
+
+def as_1h_fallback(fallback_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Mark 5-minute data as the stand-in for a symbol without enough 1-hour candles
+    """
+    if fallback_data.get('valid'):
+        fallback_data = dict(fallback_data)
+        fallback_data['timeframe'] = '1h_fallback'
+        fallback_data['trend_direction'] = 'NEUTRAL'
+        return fallback_data
+    return {'valid': False, 'reason': 'No 1H data and fallback failed'}
 
 async def get_crypto_data_1h(symbol: str) -> Dict[str, Any]:
     """
     Fetch 1-hour timeframe crypto data for a single symbol from Gemini
     """
-    try:
-        print(f"📊 Fetching 1H data for {symbol}...")
-        
-        # Get 1-hour candlestick data specifically
-        candles_1h = gemini_client.get_candles(symbol.lower(), '1hr')  # Get hourly data
-        ticker = gemini_client.get_ticker_v2(symbol.lower())
-        
-        if not candles_1h or len(candles_1h) < 50:
-            print(f"⚠️ Insufficient 1H candle data for {symbol}, using 5-minute as fallback")
-            # Fallback to regular data but mark as 1h timeframe
-            fallback_data = await get_crypto_data(symbol)
-            if fallback_data.get('valid'):
-                fallback_data['timeframe'] = '1h_fallback'
-                fallback_data['trend_direction'] = 'NEUTRAL'
-                return fallback_data
-            else:
-                return {'valid': False, 'reason': 'No 1H data and fallback failed'}
-        
-        # Process 1-hour candlestick data
-        closes = pd.Series([float(candle[4]) for candle in candles_1h])
-        highs = pd.Series([float(candle[2]) for candle in candles_1h])
-        lows = pd.Series([float(candle[3]) for candle in candles_1h])
-        volumes = pd.Series([float(candle[5]) for candle in candles_1h])
-        
-        current_price = float(ticker.get('close', ticker.get('last', closes.iloc[-1])))
-        
-        # Calculate 1-hour technical indicators
-        indicators = {
-            'symbol': symbol,
-            'timeframe': '1h',
-            'current_price': current_price,
-            'previous_close': closes.iloc[-2] if len(closes) > 1 else current_price,
-            'open': closes.iloc[0] if len(closes) > 0 else current_price,
-            'high': highs.max(),
-            'low': lows.min(),
-            'volume': volumes.iloc[-1] if len(volumes) > 0 else 0,
-            'sma_20': closes.rolling(20).mean().iloc[-1] if len(closes) >= 20 else current_price,
-            'sma_50': closes.rolling(min(50, len(closes))).mean().iloc[-1],
-            'ema_12': closes.ewm(span=12).mean().iloc[-1],
-            'ema_26': closes.ewm(span=26).mean().iloc[-1],
-            'daily_change_pct': ((current_price - closes.iloc[-25]) / closes.iloc[-25] * 100) if len(closes) > 25 else 0,  # 24h change
-            'volatility_20': closes.rolling(min(20, len(closes))).std().iloc[-1],
-        }
-        
-        # Add advanced technical indicators for 1H timeframe
-        if len(closes) >= 14:
-            rsi = calculate_rsi(closes)
-            williams_r = calculate_williams_r(highs, lows, closes)
-            atr = calculate_atr(highs, lows, closes)
-            indicators['rsi'] = rsi if rsi is not None else 50.0
-            indicators['williams_r'] = williams_r if williams_r is not None else -50.0
-            indicators['atr'] = atr if atr is not None else 0.0
-        else:
-            indicators['rsi'] = 50.0
-            indicators['williams_r'] = -50.0
-            indicators['atr'] = 0.0
-        
-        # MACD indicators
-        if len(closes) >= 26:
-            macd, macd_signal, macd_hist = calculate_macd(closes)
-            indicators.update({
-                'macd': macd if macd is not None else 0.0,
-                'macd_signal': macd_signal if macd_signal is not None else 0.0,
-                'macd_histogram': macd_hist if macd_hist is not None else 0.0
-            })
-        else:
-            indicators.update({
-                'macd': 0.0,
-                'macd_signal': 0.0,
-                'macd_histogram': 0.0
-            })
-        
-        # Bollinger Bands
-        if len(closes) >= 20:
-            bb_upper, bb_middle, bb_lower = calculate_bollinger_bands(closes)
-            indicators.update({
-                'bb_upper': bb_upper if bb_upper is not None else current_price * 1.02,
-                'bb_middle': bb_middle if bb_middle is not None else current_price,
-                'bb_lower': bb_lower if bb_lower is not None else current_price * 0.98
-            })
-        else:
-            indicators.update({
-                'bb_upper': current_price * 1.02,
-                'bb_middle': current_price,
-                'bb_lower': current_price * 0.98
-            })
-        
-        # Determine 1H trend direction
-        sma_20 = indicators['sma_20']
-        sma_50 = indicators['sma_50']
-        rsi = indicators['rsi']
-        macd_hist = indicators['macd_histogram']
-        
-        if current_price > sma_20 > sma_50 and rsi > 45 and macd_hist > 0:
-            trend_direction = 'BULLISH'
-        elif current_price < sma_20 < sma_50 and rsi < 55 and macd_hist < 0:
-            trend_direction = 'BEARISH'
-        else:
-            trend_direction = 'NEUTRAL'
-        
-        indicators['trend_direction'] = trend_direction
-        indicators['valid'] = True
-        
-        return indicators
-        
-    except Exception as e:
-        print(f"❌ Error fetching 1H crypto data for {symbol}: {e}")
-        return {'valid': False, 'reason': str(e), 'timeframe': '1h'}
+    return (await get_crypto_data_multi(symbol, ('1h',)))['1h']
 
-async def get_crypto_data_batch(symbols: List[str]) -> Dict[str, Any]:
+async def get_crypto_data_multi(symbol: str, intervals=('5m', '1h'),
+                                log: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
     """
-    Fetch crypto data for multiple symbols in batch
+    Fetch 5-minute and/or 1-hour crypto data for one symbol with a single v2 ticker fetch.
+    Returns {'5m': ..., '1h': ...} for the requested intervals. A symbol short of 1-hour candles
+    falls back to its 5-minute data, reusing the 5m result of this call when it was requested.
+    Progress messages are appended to log when given (batch callers print them once), else printed.
     """
-    crypto_data = {}
+    emit = print if log is None else log.append
+    want_5m = '5m' in intervals
+    want_1h = '1h' in intervals
+    pair = symbol.lower()
+    
+    # One v2 ticker serves both timeframes; every request shares the async public client and runs side by side
+    calls = {'ticker_v2': gemini_public_call('get_ticker_v2', TICKER_CACHE_TTL, pair)}
+    if want_5m:
+        emit(f"📊 Fetching crypto data for {symbol}...")
+        calls['ticker_v1'] = gemini_public_call('get_ticker', TICKER_CACHE_TTL, pair)
+        if _candles_5m_due(symbol):
+            calls['candles_5m'] = gemini_public_call('get_candles', CANDLES_CACHE_TTL, pair, '5m')
+    if want_1h:
+        emit(f"📊 Fetching 1H data for {symbol}...")
+        calls['candles_1h'] = gemini_public_call('get_candles', CANDLES_1H_CACHE_TTL, pair, '1hr')
+    # The semaphore is released before any 5-minute fallback fetch, which takes it again
+    async with get_gemini_semaphore():
+        responses = await asyncio.gather(*calls.values(), return_exceptions=True)
+    results = dict(zip(calls, responses))
+    
+    data = {}
+    if want_5m:
+        try:
+            data['5m'] = _build_crypto_data(symbol, results['ticker_v2'], results['ticker_v1'],
+                                            results.get('candles_5m'), emit)
+        except Exception as e:
+            emit(f"❌ Error fetching crypto data for {symbol}: {e}")
+            data['5m'] = {'valid': False, 'reason': str(e)}
+    
+    if want_1h:
+        try:
+            for response in (results['candles_1h'], results['ticker_v2']):
+                if isinstance(response, Exception):
+                    raise response
+            indicators = _build_crypto_data_1h(symbol, results['candles_1h'], results['ticker_v2'])
+            if indicators is None:
+                emit(f"⚠️ Insufficient 1H candle data for {symbol}, using 5-minute as fallback")
+                # Fallback to regular data but mark as 1h timeframe
+                fallback_data = data['5m'] if want_5m else await get_crypto_data(symbol, log)
+                indicators = as_1h_fallback(fallback_data)
+            data['1h'] = indicators
+        except Exception as e:
+            emit(f"❌ Error fetching 1H crypto data for {symbol}: {e}")
+            data['1h'] = {'valid': False, 'reason': str(e), 'timeframe': '1h'}
     
-    for i, symbol in enumerate(symbols):
-        print(f"📊 Fetching {symbol} ({i+1}/{len(symbols)})...", end=" ")
-        data = await get_crypto_data(symbol)
+    return data
+
+def _collect_batch_5m(symbols: List[str], results: List[Any], output: List[str]) -> Dict[str, Any]:
+    """
+    Key 5-minute results by symbol, replacing failures with placeholders, and append a status line per symbol
+    """
+    crypto_data = {}
+    for i, (symbol, data) in enumerate(zip(symbols, results)):
+        status = f"📊 {symbol} ({i+1}/{len(symbols)})..."
+        if isinstance(data, Exception):
+            data = {'valid': False, 'reason': str(data)}
         
         if data and data.get('valid'):
             price = data.get('current_price', 0)
             rsi = data.get('rsi', 50)
             change_pct = data.get('daily_change_pct', 0)
-            print(f"✅ ${price:,.2f} ({change_pct:+.2f}%, RSI {rsi:.1f})")
+            output.append(f"{status} ✅ ${price:,.2f} ({change_pct:+.2f}%, RSI {rsi:.1f})")
         else:
-            print(f"❌ Failed: {data.get('reason', 'Unknown error')}")
+            output.append(f"{status} ❌ Failed: {data.get('reason', 'Unknown error')}")
             data = {
                 'valid': False, 
                 'current_price': 0.0, 
@@ -366,27 +591,25 @@ async def get_crypto_data_batch(symbols: List[str]) -> Dict[str, Any]:
             }
         
         crypto_data[symbol] = data
-        await asyncio.sleep(0.2)  # Rate limiting for Gemini API
-    
     return crypto_data
 
-async def get_crypto_data_1h_batch(symbols: List[str]) -> Dict[str, Any]:
+def _collect_batch_1h(symbols: List[str], results: List[Any], output: List[str]) -> Dict[str, Any]:
     """
-    Fetch 1-hour timeframe crypto data for multiple symbols in batch
+    Key 1-hour results by symbol, replacing failures with placeholders, and append a status line per symbol
     """
     crypto_data_1h = {}
-    
-    for i, symbol in enumerate(symbols):
-        print(f"📊 Fetching 1H {symbol} ({i+1}/{len(symbols)})...", end=" ")
-        data = await get_crypto_data_1h(symbol)
+    for i, (symbol, data) in enumerate(zip(symbols, results)):
+        status = f"📊 Fetching 1H {symbol} ({i+1}/{len(symbols)})..."
+        if isinstance(data, Exception):
+            data = {'valid': False, 'reason': str(data)}
         
         if data and data.get('valid'):
             price = data.get('current_price', 0)
             rsi = data.get('rsi', 50)
             trend = data.get('trend_direction', 'NEUTRAL')
-            print(f"✅ 1H ${price:,.2f} (RSI {rsi:.1f}, {trend})")
+            output.append(f"{status} ✅ 1H ${price:,.2f} (RSI {rsi:.1f}, {trend})")
         else:
-            print(f"❌ 1H Failed: {data.get('reason', 'Unknown error')}")
+            output.append(f"{status} ❌ 1H Failed: {data.get('reason', 'Unknown error')}")
             data = {
                 'valid': False, 
                 'current_price': 0.0, 
@@ -396,10 +619,57 @@ async def get_crypto_data_1h_batch(symbols: List[str]) -> Dict[str, Any]:
             }
         
         crypto_data_1h[symbol] = data
-        await asyncio.sleep(0.2)  # Rate limiting for Gemini API
-    
     return crypto_data_1h
 
+async def _gather_multi(symbols: List[str], intervals) -> tuple:
+    """
+    Fetch intervals for every symbol concurrently (the semaphore in get_crypto_data_multi bounds
+    in-flight API calls); returns (per-symbol results, buffered progress lines)
+    """
+    logs = [[] for _ in symbols]
+    results = await asyncio.gather(
+        *(get_crypto_data_multi(symbol, intervals, log) for symbol, log in zip(symbols, logs)),
+        return_exceptions=True,
+    )
+    return results, [line for log in logs for line in log]
+
+def _interval(results: List[Any], interval: str) -> List[Any]:
+    return [result if isinstance(result, Exception) else result[interval] for result in results]
+
+def _write_batch_output(output: List[str]):
+    # Progress and status lines of a whole batch go out in one write
+    if output:
+        sys.stdout.write("\n".join(output) + "\n")
+
+async def get_crypto_data_batch(symbols: List[str]) -> Dict[str, Any]:
+    """
+    Fetch crypto data for multiple symbols in batch
+    """
+    results, output = await _gather_multi(symbols, ('5m',))
+    crypto_data = _collect_batch_5m(symbols, _interval(results, '5m'), output)
+    _write_batch_output(output)
+    return crypto_data
+
+async def get_crypto_data_1h_batch(symbols: List[str]) -> Dict[str, Any]:
+    """
+    Fetch 1-hour timeframe crypto data for multiple symbols in batch
+    """
+    results, output = await _gather_multi(symbols, ('1h',))
+    crypto_data_1h = _collect_batch_1h(symbols, _interval(results, '1h'), output)
+    _write_batch_output(output)
+    return crypto_data_1h
+
+async def get_crypto_data_multi_batch(symbols: List[str]) -> tuple:
+    """
+    Fetch 5-minute and 1-hour crypto data for multiple symbols in one batch, one v2 ticker per symbol.
+    Returns (crypto_data, crypto_data_1h), keyed by symbol like the single-interval batches.
+    """
+    results, output = await _gather_multi(symbols, ('5m', '1h'))
+    crypto_data = _collect_batch_5m(symbols, _interval(results, '5m'), output)
+    crypto_data_1h = _collect_batch_1h(symbols, _interval(results, '1h'), output)
+    _write_batch_output(output)
+    return crypto_data, crypto_data_1h
+
 async def get_crypto_portfolio_summary():
     """
     Get portfolio summary from Gemini exchange
@@ -418,6 +688,7 @@ async def get_crypto_portfolio_summary():
         positions = {}
         
         if balances:
+            held = []  # (currency, symbol, amount) for tracked cryptos with a positive balance
             for balance in balances:
                 currency = balance['currency']
                 amount = float(balance['amount'])
@@ -425,17 +696,31 @@ async def get_crypto_portfolio_summary():
                 if currency == 'USD':
                     usd_available = amount
                 elif amount > 0:
-                    # Get current price for this crypto
-                    try:
-                        symbol = f"{currency}USD"
-                        if symbol in PORTFOLIO_CRYPTOS:
-                            ticker = gemini_client.get_ticker(symbol.lower())
-                            current_price = float(ticker['last'])
-                            value = amount * current_price
-                            portfolio_value += value
-                            positions[symbol] = amount
-                    except Exception as e:
-                        print(f"⚠️ Could not get price for {currency}: {e}")
+                    symbol = f"{currency}USD"
+                    if symbol in _PORTFOLIO_SET:
+                        held.append((currency, symbol, amount))
+            
+            # Get current prices for all held cryptos concurrently
+            tickers = await asyncio.gather(
+                *(gemini_public_call('get_ticker', TICKER_CACHE_TTL, symbol.lower())
+                  for _, symbol, _ in held),
+                return_exceptions=True,
+            )
+            
+            amounts = []
+            prices = []
+            for (currency, symbol, amount), ticker in zip(held, tickers):
+                try:
+                    if isinstance(ticker, Exception):
+                        raise ticker
+                    prices.append(float(ticker['last']))
+                    amounts.append(amount)
+                    positions[symbol] = amount
+                except Exception as e:
+                    print(f"⚠️ Could not get price for {currency}: {e}")
+            
+            if amounts:
+                portfolio_value = float(np.dot(amounts, prices))
         
         portfolio_value += usd_available
         
@@ -480,11 +765,14 @@ async def place_crypto_order(symbol: str, action: str, quantity: float) -> Dict[
             "error": str(e)
         }
 
+# Crypto markets trade 24/7; importable directly by callers that do not need the function form
+CRYPTO_MARKET_ALWAYS_OPEN = True
+
 def is_crypto_market_open() -> bool:
     """
     Crypto markets are always open (24/7)
     """
-    return True
+    return CRYPTO_MARKET_ALWAYS_OPEN
 
 async def test_gemini_connection():
     """
@@ -530,61 +818,51 @@ async def get_stock_data_batch(symbols: List[str]) -> Dict[str, Any]:
 
 async def get_all_positions(current_prices=None):
     """Get positions from trading database (consistent with profitability calculation)"""
-    import sqlite3
     try:
-        # Read positions from the same trading database used by profitability calculation
-        conn = sqlite3.connect("trading_memory.db")
-        cursor = conn.cursor()
-        
-        position_dict = {symbol: 0.0 for symbol in PORTFOLIO_CRYPTOS}
-        pnl_dict = {symbol: 0.0 for symbol in PORTFOLIO_CRYPTOS}
-        purchase_prices_dict = {symbol: 0.0 for symbol in PORTFOLIO_CRYPTOS}
-        
-        for symbol in PORTFOLIO_CRYPTOS:
-            # Get trade history for this symbol to calculate current position
-            cursor.execute('''
-                SELECT action, quantity, price, timestamp 
-                FROM trading_memories 
-                WHERE symbol = ? 
-                ORDER BY timestamp ASC
-            ''', (symbol,))
+        # Read positions from the same trading database used by profitability calculation:
+        # the trade history of every portfolio symbol in one query, grouped per symbol in timestamp order
+        rows = get_positions_connection().execute(_POSITIONS_QUERY, PORTFOLIO_CRYPTOS).fetchall()
+        
+        position_dict = _EMPTY_POSITIONS.copy()
+        pnl_dict = _EMPTY_POSITIONS.copy()
+        purchase_prices_dict = _EMPTY_POSITIONS.copy()
+        
+        trades_by_symbol = defaultdict(list)
+        for symbol, action, quantity, price in rows:
+            trades_by_symbol[symbol].append((action, quantity, price))
+        
+        for symbol, trades in trades_by_symbol.items():
+            current_position = 0.0
+            total_cost = 0.0
+            total_purchased = 0.0
             
-            trades = cursor.fetchall()
+            for action, quantity, price in trades:
+                if action == 'BUY':
+                    current_position += quantity
+                    total_cost += quantity * price
+                    total_purchased += quantity
+                elif action == 'SELL':
+                    current_position -= quantity
+                    # Reduce cost basis proportionally
+                    if total_purchased > 0:
+                        cost_reduction = (quantity / total_purchased) * total_cost
+                        total_cost -= cost_reduction
+                        total_purchased -= quantity
             
-            if trades:
-                current_position = 0.0
-                total_cost = 0.0
-                total_purchased = 0.0
-                
-                for action, quantity, price, timestamp in trades:
-                    if action == 'BUY':
-                        current_position += quantity
-                        total_cost += quantity * price
-                        total_purchased += quantity
-                    elif action == 'SELL':
-                        current_position -= quantity
-                        # Reduce cost basis proportionally
-                        if total_purchased > 0:
-                            cost_reduction = (quantity / total_purchased) * total_cost
-                            total_cost -= cost_reduction
-                            total_purchased -= quantity
-                
-                # Calculate average purchase price
-                avg_price = total_cost / current_position if current_position > 0 else 0.0
-                
-                position_dict[symbol] = current_position
-                purchase_prices_dict[symbol] = avg_price
-                
-                # Calculate P&L if current prices are provided
-                if current_prices and symbol in current_prices and current_position > 0:
-                    current_price = current_prices[symbol]
-                    unrealized_pnl = (current_price - avg_price) * current_position
-                    # Round to avoid floating point precision issues
-                    pnl_dict[symbol] = round(unrealized_pnl, 4)
-                else:
-                    pnl_dict[symbol] = 0.0
-        
-        conn.close()
+            # Calculate average purchase price
+            avg_price = total_cost / current_position if current_position > 0 else 0.0
+            
+            position_dict[symbol] = current_position
+            purchase_prices_dict[symbol] = avg_price
+            
+            # Calculate P&L if current prices are provided
+            if current_prices and symbol in current_prices and current_position > 0:
+                current_price = current_prices[symbol]
+                unrealized_pnl = (current_price - avg_price) * current_position
+                # Round to avoid floating point precision issues
+                pnl_dict[symbol] = round(unrealized_pnl, 4)
+            else:
+                pnl_dict[symbol] = 0.0
         
         print(f"📊 Positions from trading database:")
         for symbol, pos in position_dict.items():
@@ -596,7 +874,8 @@ async def get_all_positions(current_prices=None):
         
     except Exception as e:
         print(f"❌ Error getting crypto positions from database: {e}")
-        empty_dict = {symbol: 0.0 for symbol in PORTFOLIO_CRYPTOS}
+        close_positions_connection()
+        empty_dict = _EMPTY_POSITIONS.copy()
         return empty_dict, empty_dict, empty_dict
 
 async def get_portfolio_summary():
@@ -606,4 +885,4 @@ async def get_portfolio_summary():
 
 def is_market_open():
     """Legacy compatibility function"""
-    return is_crypto_market_open()
\ No newline at end of file
+    return CRYPTO_MARKET_ALWAYS_OPEN
\ No newline at end of file
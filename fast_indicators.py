@@ -0,0 +1,273 @@
+# fast_indicators.py - Compiled OHLCV indicator kernels for the crypto data path
+
+import os
+import sys
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    print("⚠️ numba not available, indicator kernels run as plain Python")
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit, usable bare or with options"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# Ahead-of-time build of the kernels (python fast_indicators.py --aot); when present it replaces the
+# JIT kernels below, so a fresh process never compiles, even with an empty or unwritable numba cache
+AOT_MODULE = '_fast_indicators_aot'
+try:
+    _aot = __import__(AOT_MODULE)
+    AOT_AVAILABLE = True
+except ImportError:
+    _aot = None
+    AOT_AVAILABLE = False
+
+
+# Explicit signatures compile eagerly at import (or load from the on-disk cache) instead of on first call.
+# float64[:] accepts both contiguous arrays and strided column views of the candle matrix, but not
+# read-only arrays (e.g. Series.to_numpy() views), so callers pass writable float64 data.
+SIGNATURES = {
+    'last_sma': 'float64(float64[:], int64)',
+    'last_std': 'float64(float64[:], int64)',
+    'ema_last': 'float64(float64[:], int64)',
+    'obv_last': 'float64(float64[:], float64[:])',
+    'compute_indicators': 'UniTuple(float64, 18)(float64[:], float64[:], float64[:], float64[:])',
+}
+
+
+def kernel(func):
+    """
+    Compile func with its signature from SIGNATURES; lazily if the AOT build will replace it
+    """
+    if AOT_AVAILABLE:
+        return njit(cache=True)(func)
+    return njit(SIGNATURES[func.__name__], cache=True)(func)
+
+
+@kernel
+def last_sma(values, window):
+    """
+    Last value of pd.Series(values).rolling(window).mean(), for 1 <= window <= len(values)
+    """
+    n = values.shape[0]
+    total = 0.0
+    for i in range(n - window, n):
+        total += values[i]
+    return total / window
+
+
+@kernel
+def last_std(values, window):
+    """
+    Last value of pd.Series(values).rolling(window).std() (sample, ddof=1); NaN for window < 2
+    """
+    if window < 2:
+        return np.nan
+    n = values.shape[0]
+    mean = last_sma(values, window)
+    squares = 0.0
+    for i in range(n - window, n):
+        d = values[i] - mean
+        squares += d * d
+    return np.sqrt(squares / (window - 1))
+
+
+@kernel
+def ema_last(values, span):
+    """
+    Last value of pd.Series(values).ewm(span=span).mean() via the adjusted recursive EMA
+    """
+    decay = 1.0 - 2.0 / (span + 1.0)
+    num = 0.0
+    den = 0.0
+    for i in range(values.shape[0]):
+        num = values[i] + decay * num
+        den = 1.0 + decay * den
+    return num / den
+
+
+@kernel
+def obv_last(closes, volumes):
+    """
+    Final on-balance volume, matching technical_analysis.calculate_volume_indicators:
+    the first bar has no prior close and counts as a down bar (-volumes[0])
+    """
+    obv = -volumes[0]
+    for i in range(1, closes.shape[0]):
+        change = closes[i] - closes[i - 1]
+        if change > 0:
+            obv += volumes[i]
+        elif change < 0:
+            obv -= volumes[i]
+    return obv
+
+
+@kernel
+def compute_indicators(highs, lows, closes, volumes):
+    """
+    Compute every 5m indicator used by get_crypto_data in one pass over float64 OHLCV arrays.
+
+    Mirrors the pandas helpers in technical_analysis.py (adjusted EWMs, ddof=1 std,
+    RSI zero replacement, OBV seeded with -volumes[0]). Callers decide from len(closes)
+    which values are meaningful, using the same minimum lengths as those helpers.
+
+    Returns (sma_20, sma_50, ema_12, ema_26, volatility_20, rsi, williams_r, atr,
+             macd, macd_signal, macd_histogram, bb_upper, bb_middle, bb_lower,
+             stoch_k, stoch_d, volume_ma, obv)
+    """
+    n = closes.shape[0]
+    nan = np.nan
+
+    # Simple moving averages and 20-period dispersion
+    w20 = min(20, n)
+    sma_20 = last_sma(closes, w20)
+    sma_50 = last_sma(closes, min(50, n))
+    volatility_20 = last_std(closes, w20)
+
+    # Adjusted EMAs (pandas ewm(span).mean() semantics) and the MACD signal line
+    d12 = 1.0 - 2.0 / 13.0
+    d26 = 1.0 - 2.0 / 27.0
+    d9 = 1.0 - 2.0 / 10.0
+    num12 = den12 = num26 = den26 = num9 = den9 = 0.0
+    ema_12 = ema_26 = macd = macd_signal = nan
+    for i in range(n):
+        num12 = closes[i] + d12 * num12
+        den12 = 1.0 + d12 * den12
+        num26 = closes[i] + d26 * num26
+        den26 = 1.0 + d26 * den26
+        ema_12 = num12 / den12
+        ema_26 = num26 / den26
+        macd = ema_12 - ema_26
+        num9 = macd + d9 * num9
+        den9 = 1.0 + d9 * den9
+        macd_signal = num9 / den9
+    macd_histogram = macd - macd_signal
+
+    # RSI over the last 14 price changes
+    rsi = nan
+    if n >= 15:
+        gains = 0.0
+        losses = 0.0
+        for i in range(n - 14, n):
+            change = closes[i] - closes[i - 1]
+            if change > 0:
+                gains += change
+            elif change < 0:
+                losses -= change
+        avg_gain = gains / 14.0
+        avg_loss = losses / 14.0
+        if avg_gain == 0.0:
+            avg_gain = 0.0001
+        if avg_loss == 0.0:
+            avg_loss = 0.0001
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        if not (0.0 <= rsi <= 100.0):
+            rsi = 50.0
+
+    # Williams %R and stochastic %K over 14-bar high/low windows; %D averages the last three %K
+    williams_r = nan
+    stoch_k = nan
+    stoch_d = nan
+    if n >= 14:
+        k_sum = 0.0
+        for end in range(n - 3, n):
+            if end < 13:
+                k_sum = nan
+                continue
+            hh = highs[end]
+            ll = lows[end]
+            for i in range(end - 13, end):
+                if highs[i] > hh:
+                    hh = highs[i]
+                if lows[i] < ll:
+                    ll = lows[i]
+            span = hh - ll
+            k = 100.0 * (closes[end] - ll) / span if span != 0.0 else nan
+            k_sum += k
+            if end == n - 1:
+                stoch_k = k
+                williams_r = -100.0 * (hh - closes[end]) / span if span != 0.0 else nan
+        stoch_d = k_sum / 3.0
+
+    # ATR: 14-bar mean of the true range
+    atr = nan
+    if n >= 15:
+        tr_sum = 0.0
+        for i in range(n - 14, n):
+            tr = highs[i] - lows[i]
+            up = abs(highs[i] - closes[i - 1])
+            down = abs(lows[i] - closes[i - 1])
+            if up > tr:
+                tr = up
+            if down > tr:
+                tr = down
+            tr_sum += tr
+        atr = tr_sum / 14.0
+
+    # Bollinger Bands (20, 2)
+    bb_upper = bb_middle = bb_lower = nan
+    if n >= 20:
+        bb_middle = sma_20
+        bb_upper = sma_20 + 2.0 * volatility_20
+        bb_lower = sma_20 - 2.0 * volatility_20
+
+    # Volume moving average and on-balance volume
+    volume_ma = nan
+    obv = nan
+    if n >= 20:
+        v_sum = 0.0
+        for i in range(n - 20, n):
+            v_sum += volumes[i]
+        volume_ma = v_sum / 20.0
+        obv = obv_last(closes, volumes)
+
+    return (sma_20, sma_50, ema_12, ema_26, volatility_20, rsi, williams_r, atr,
+            macd, macd_signal, macd_histogram, bb_upper, bb_middle, bb_lower,
+            stoch_k, stoch_d, volume_ma, obv)
+
+
+if AOT_AVAILABLE:
+    last_sma = _aot.last_sma
+    last_std = _aot.last_std
+    ema_last = _aot.ema_last
+    obv_last = _aot.obv_last
+    compute_indicators = _aot.compute_indicators
+
+
+def build_aot(output_dir=None):
+    """
+    Compile the kernels ahead of time into the _fast_indicators_aot extension module
+    """
+    from numba.pycc import CC
+
+    if AOT_AVAILABLE:
+        raise RuntimeError(f"{_aot.__file__} is already loaded; delete it before rebuilding")
+    cc = CC(AOT_MODULE)
+    cc.output_dir = output_dir or os.path.dirname(os.path.abspath(__file__))
+    for name, signature in SIGNATURES.items():
+        cc.export(name, signature)(globals()[name].py_func)
+    cc.compile()
+    return cc.output_dir
+
+
+if __name__ == "__main__":
+    # Prewarm: importing this module compiles the kernels and writes numba's cache next to it;
+    # --aot additionally builds the extension module so later runs skip the JIT entirely
+    if not NUMBA_AVAILABLE:
+        print("⚠️ numba not installed; nothing to compile")
+    elif '--aot' in sys.argv:
+        try:
+            print(f"✅ Indicator kernels compiled ahead of time into {build_aot()}/{AOT_MODULE}")
+        except Exception as e:
+            print(f"❌ AOT build failed, JIT cache still usable: {e}")
+    elif AOT_AVAILABLE:
+        print(f"✅ Using ahead-of-time indicator kernels from {_aot.__file__}")
+    else:
+        print(f"✅ Indicator kernels compiled and cached ({len(compute_indicators.signatures)} signature(s))")
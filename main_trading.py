@@ -12,9 +12,10 @@ from IPython.display import Image, display
 from config import *
 from utils import *
 from market_data import *
-from crypto_market_data import get_crypto_data_1h_batch, place_crypto_order, get_all_positions as get_crypto_positions, get_portfolio_summary as get_crypto_portfolio_summary
+from crypto_market_data import get_crypto_data_multi_batch, place_crypto_order, close_http_session, close_positions_connection, get_all_positions as get_crypto_positions, get_portfolio_summary as get_crypto_portfolio_summary
 from agent import *
 from reporting import *
+from reporting import cancel_streaming_tickers
 from diagnostics import *
 # from sp500_tracker import *  # Not needed for crypto trading
 
@@ -61,11 +62,13 @@ class PortfolioState(TypedDict):
     purchase_prices: Dict[str, float]
     total_portfolio_value: float
     total_unrealized_pnl: float
+    portfolio_loss_pct: float
     total_trades: int
     total_fees_paid: float
     cash_available: float
     ai_recommendations: Dict[str, Dict]
     executed_trades: List[Dict]
+    trades_written_idx: int  # how many of executed_trades are already in the session trade log
     portfolio_allocation: Dict[str, float]
     session_start_time: str
     session_id: str
@@ -96,11 +99,9 @@ async def analyze_portfolio_node(state: PortfolioState) -> PortfolioState:
             stock_data = await get_backtest_data_batch(state['portfolio_stocks'])
             stock_data_1h = {}  # No 1H backtesting data yet
         else:
-            # Get both 5-minute and 1-hour data in parallel
-            stock_data, stock_data_1h = await asyncio.gather(
-                get_stock_data_batch(state['portfolio_stocks']),
-                get_crypto_data_1h_batch(state['portfolio_stocks'])
-            )
+            # Get both 5-minute and 1-hour data in one batch: one ticker fetch per symbol, and
+            # symbols without enough 1-hour candles fall back to their 5-minute results
+            stock_data, stock_data_1h = await get_crypto_data_multi_batch(state['portfolio_stocks'])
 
     
     state['timestamp'] = datetime.now().isoformat()
@@ -244,6 +245,8 @@ async def check_positions_node(state: PortfolioState) -> PortfolioState:
     state['total_portfolio_value'] = portfolio_value
     state['total_unrealized_pnl'] = sum(pnls.values())
     state['cash_available'] = cash
+    total_pnl = state['total_unrealized_pnl']
+    state['portfolio_loss_pct'] = (total_pnl / portfolio_value * 100) if (total_pnl < 0 and portfolio_value > 0) else 0.0
     state['portfolio_allocation'] = allocations
     
     # Log purchase price updates
@@ -528,6 +531,7 @@ async def execute_trades_node(state: PortfolioState) -> PortfolioState:
     if not recommendations:
         print("⚠️  NO AI RECOMMENDATIONS FOUND - SKIPPING EXECUTION")
         state['executed_trades'] = []
+        state['trades_written_idx'] = 0
         return state
     
     print(f"\n📋 PROCESSING {len(recommendations)} AI RECOMMENDATIONS:")
@@ -743,6 +747,7 @@ async def execute_trades_node(state: PortfolioState) -> PortfolioState:
     state['positions'] = positions
     state['cash_available'] = available_cash
     state['executed_trades'] = executed_trades
+    state['trades_written_idx'] = 0
     state['total_trades'] = state.get('total_trades', 0) + trades_executed
 
     # Final execution summary
@@ -854,7 +859,7 @@ async def run_trading_session(cycles=5, interval_minutes=5, aggressive=False):
         'positions': {s: 0 for s in PORTFOLIO_STOCKS}, 'stock_pnls': {s: 0.0 for s in PORTFOLIO_STOCKS},
         'purchase_prices': {s: 0.0 for s in PORTFOLIO_STOCKS}, 'total_portfolio_value': 0.0,
         'total_unrealized_pnl': 0.0, 'total_trades': 0, 'total_fees_paid': 0.0,
-        'cash_available': 0.0, 'ai_recommendations': {}, 'executed_trades': [],
+        'cash_available': 0.0, 'ai_recommendations': {}, 'executed_trades': [], 'trades_written_idx': 0,
         'portfolio_allocation': {}, 'session_start_time': datetime.now().isoformat(),
         'session_id': generate_session_id(), 'cycle_history': [],
         'validation_attempts': 0, 'validation_history': [], 'final_decision_logic': 'N/A',
@@ -924,10 +929,23 @@ async def run_trading_session(cycles=5, interval_minutes=5, aggressive=False):
         traceback.print_exc()
     finally:
         print("\n--- SESSION FINISHED ---")
-        generate_portfolio_status_report(current_state)
-        generate_performance_summary_report(current_state)
-        await generate_enhanced_performance_and_status_report(current_state)
-        print("✅ Final reports generated.")
+        try:
+            generate_portfolio_status_report(current_state)
+            generate_performance_summary_report(current_state)
+            await generate_enhanced_performance_and_status_report(current_state)
+            print("✅ Final reports generated.")
+        finally:
+            # Shutdown steps run even when a report fails.
+            # Report uploads run on a background pool; let them land before the loop shuts down
+            pending_uploads = await drain_report_uploads(timeout=120)
+            if pending_uploads:
+                print(f"☁️ Waited for {pending_uploads} report upload(s) to finish")
+
+            # Release pooled Gemini connections while the loop is still running,
+            # then the positions database and any streaming IBKR market-data subscriptions
+            await close_http_session()
+            close_positions_connection()
+            cancel_streaming_tickers()
 
         # END SESSION TIMING AND SHOW REPORT
         trading_timer.end_session()
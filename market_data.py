@@ -10,7 +10,7 @@ import aiohttp
 # Import crypto-specific functions
 from crypto_market_data import (
     get_crypto_data_batch, get_crypto_portfolio_summary, 
-    place_crypto_order, is_crypto_market_open,
+    place_crypto_order, CRYPTO_MARKET_ALWAYS_OPEN,
     get_all_positions as get_crypto_positions,
     get_portfolio_summary as get_crypto_portfolio_summary
 )
@@ -372,7 +372,7 @@ def is_market_open():
     """
     Route to crypto market status (always open)
     """
-    return is_crypto_market_open()
+    return CRYPTO_MARKET_ALWAYS_OPEN
 
 def calculate_portfolio_profitability(current_stock_data: Dict, db_path: str = "trading_memory.db", backtest_mode: bool = False) -> Dict:
     """
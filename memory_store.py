@@ -54,6 +54,9 @@ class SimpleTradingMemoryStore:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
+            # WAL lets position reads proceed while trades are being recorded (persists in the database file)
+            cursor.execute('PRAGMA journal_mode=WAL')
+            
             # Trading memories table (main storage)
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS trading_memories (
@@ -119,6 +122,8 @@ class SimpleTradingMemoryStore:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_symbol ON trading_memories(symbol)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_action ON trading_memories(action)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON trading_memories(timestamp)')
+            # Per-symbol trade history in time order (position reconstruction)
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_symbol_timestamp ON trading_memories(symbol, timestamp)')
             
             conn.commit()
             conn.close()
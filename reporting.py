@@ -1,24 +1,128 @@
 # /trading_bot/reporting.py
 
-import json
-import pandas as pd
+import os
+import csv
+import asyncio
+import gzip
+import orjson
+import atexit
+import weakref
+import concurrent.futures
+import functools
+import importlib.util
+import bisect
+import tempfile
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Any
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 import numpy as np
-import yfinance as yf
 import base64
 import io
 
-from utils import setup_reporting_directory, upload_to_gcs,  ensure_connection, log_portfolio_activity
+from utils import setup_reporting_directory, upload_to_gcs, upload_string_to_gcs, ensure_connection, log_portfolio_activity
 from config import PORTFOLIO_STOCKS
 from market_data import calculate_portfolio_profitability
 
 # Define a type alias for state for clarity
 PortfolioState = Dict[str, Any]
 
+# Jinja2 templates for the report tables, compiled once per process on first use
+TEMPLATES_DIR = Path(__file__).resolve().parent / 'templates'
+TEMPLATE_CACHE_DIR = Path(tempfile.gettempdir()) / 'crypto_agent_j2cache'
+
+@functools.lru_cache(maxsize=None)
+def get_report_environment():
+    """Build the shared Jinja2 environment; compiled template bytecode is cached on disk across restarts."""
+    from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+    TEMPLATE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        bytecode_cache=FileSystemBytecodeCache(str(TEMPLATE_CACHE_DIR)),
+        auto_reload=False,
+        autoescape=False,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+
+@functools.lru_cache(maxsize=None)
+def get_report_template(name: str):
+    """Load and compile a report template; jinja2 is only imported when the first report is rendered."""
+    return get_report_environment().get_template(name)
+
+def write_report_file(filepath, parts, errors: str = 'strict', compress: bool = False):
+    """Encode report fragments once and write them to filepath through a raw fd, bypassing TextIOWrapper.
+
+    parts may also be an already-encoded bytes payload. With compress=True the bytes are gzipped at
+    level 1 (fast, most of the ratio on whitespace-heavy HTML).
+    """
+    data = parts if isinstance(parts, bytes) else "".join(parts).encode('utf-8', errors)
+    if compress:
+        data = gzip.compress(data, compresslevel=1)
+    data = memoryview(data)
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        # os.write may return a short count for large payloads; keep going until everything is on disk
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+# Background pool for report uploads so GCS round-trips stay off the trading loop
+_REPORT_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix='report-io')
+_PENDING_REPORT_IO = weakref.WeakSet()
+
+# Metadata for gzipped HTML reports so browsers decode them transparently when served from GCS
+GZIP_HTML_UPLOAD = {'content_type': 'text/html; charset=utf-8', 'content_encoding': 'gzip'}
+
+def _queue_report_upload(upload_fn, source, gcs_path: str, success_message: str = None, **upload_kwargs):
+    def _on_done(future):
+        try:
+            upload_result = future.result()
+        except Exception as e:
+            print(f"❌ GCS upload error: {e}")
+            return
+        if upload_result and success_message:
+            print(f"{success_message}: {upload_result}")
+
+    future = _REPORT_POOL.submit(upload_fn, source, gcs_path, **upload_kwargs)
+    future.add_done_callback(_on_done)
+    _PENDING_REPORT_IO.add(future)
+    return future
+
+def upload_report_in_background(filepath, gcs_path: str, success_message: str = None, **upload_kwargs):
+    """Queue upload_to_gcs on the report pool and return its future without waiting."""
+    return _queue_report_upload(upload_to_gcs, str(filepath), gcs_path, success_message, **upload_kwargs)
+
+def _upload_gzipped_string(data: bytes, gcs_path: str, compresslevel: int, **upload_kwargs):
+    return upload_string_to_gcs(gzip.compress(data, compresslevel=compresslevel), gcs_path, **upload_kwargs)
+
+def upload_report_data_in_background(data: bytes, gcs_path: str, success_message: str = None,
+                                     compresslevel: int = None, **upload_kwargs):
+    """Queue an in-memory upload (no local file read) on the report pool and return its future.
+
+    With compresslevel set the payload is gzipped inside the pool job, off the caller's thread.
+    """
+    upload_fn = upload_string_to_gcs
+    if compresslevel is not None:
+        upload_fn = functools.partial(_upload_gzipped_string, compresslevel=compresslevel)
+    return _queue_report_upload(upload_fn, data, gcs_path, success_message, **upload_kwargs)
+
+def wait_for_report_uploads(timeout: float = None):
+    """Block until every queued report upload has finished (or timeout elapses)."""
+    concurrent.futures.wait(list(_PENDING_REPORT_IO), timeout=timeout)
+
+async def drain_report_uploads(timeout: float = None):
+    """Await every queued report upload from the event loop without blocking it; returns how many were pending."""
+    pending = [asyncio.wrap_future(future) for future in list(_PENDING_REPORT_IO) if not future.done()]
+    if pending:
+        await asyncio.wait(pending, timeout=timeout)
+    return len(pending)
+
+@atexit.register
+def _shutdown_report_pool():
+    wait_for_report_uploads()
+    _REPORT_POOL.shutdown(wait=True)
+
 def calculate_technical_indicators(data):
     """Calculate technical indicators similar to backtest notebook"""
     df = data.copy()
@@ -44,6 +148,8 @@ def calculate_technical_indicators(data):
 
 def get_crypto_data(symbol, days=60, interval='1h'):
     """Get crypto data for technical analysis"""
+    import pandas as pd
+    import yfinance as yf
     try:
         # Convert crypto symbol format for yfinance (e.g., BTCUSD -> BTC-USD)
         if symbol.endswith('USD'):
@@ -69,6 +175,8 @@ def get_crypto_data(symbol, days=60, interval='1h'):
 
 def get_short_term_crypto_data(symbol, hours=72, interval='5m'):
     """Get short-term crypto data for intraday trading analysis"""
+    import pandas as pd
+    import yfinance as yf
     try:
         # Convert crypto symbol format for yfinance (e.g., BTCUSD -> BTC-USD)
         if symbol.endswith('USD'):
@@ -103,6 +211,8 @@ def get_short_term_crypto_data(symbol, hours=72, interval='5m'):
 
 def generate_technical_analysis_chart(symbol, state):
     """Generate technical analysis chart for a single symbol"""
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
     try:
         # Get historical data
         data = get_crypto_data(symbol, days=30)
@@ -187,6 +297,8 @@ def generate_technical_analysis_chart(symbol, state):
 
 def generate_short_term_trading_chart(symbol, state):
     """Generate short-term trading chart for 3-day trading strategy"""
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
     try:
         # Get 3-day data with 1-hour intervals for trading decisions
         data = get_crypto_data(symbol, days=3, interval='1h')
@@ -295,6 +407,9 @@ def calculate_short_term_indicators(df):
 
 def generate_precision_trading_chart(symbol, state, hours=6):
     """Generate high-precision 5-minute chart for entry/exit timing"""
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
     try:
         # Get short-term data with 5-minute intervals
         data = get_short_term_crypto_data(symbol, hours=hours, interval='5m')
@@ -1200,12 +1315,82 @@ def generate_profitability_section_html(state: PortfolioState) -> str:
     
     return html
 
+# Static stylesheets are plain constants so the report f-strings only splice them in
+_HTML_STYLE = """<style>
+            body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; margin: 20px; background-color: #f9f9f9; }
+            .header { background: #4a69bd; color: white; padding: 20px; border-radius: 8px; text-align: center; }
+            .metric-card { background: white; padding: 15px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); text-align: center; }
+            .metrics { display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 15px; margin: 20px 0; }
+            .positive { color: #2ecc71; } .negative { color: #e74c3c; } .neutral { color: #7f8c8d; }
+            table { width: 100%; border-collapse: collapse; margin-top: 20px; }
+            th, td { padding: 10px; text-align: left; border-bottom: 1px solid #ddd; }
+            th { background-color: #f2f2f2; }
+            .section { background: white; padding: 20px; border-radius: 8px; margin-top: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+            .trade-card { background: #f8f9fa; border-left: 4px solid #007bff; padding: 15px; margin: 10px 0; border-radius: 4px; }
+            .trade-buy { border-left-color: #28a745; }
+            .trade-sell { border-left-color: #dc3545; }
+            .trade-details { font-size: 0.9em; color: #666; margin-top: 8px; }
+            .priority-high { background-color: #fff3cd; }
+            .priority-medium { background-color: #d1ecf1; }
+            .priority-low { background-color: #d4edda; }
+            .validation-step { padding: 10px; margin: 5px 0; border-radius: 4px; }
+            .validation-proceed { background-color: #d4edda; border-left: 4px solid #28a745; }
+            .validation-rerun { background-color: #f8d7da; border-left: 4px solid #dc3545; }
+            .reasoning { font-style: italic; color: #495057; }
+            .order-status { font-weight: bold; }
+            .execution-time { color: #6c757d; font-size: 0.8em; }
+            
+            /* NEWS SECTION STYLES */
+            .news-section { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px; margin-top: 20px; }
+            .news-header { text-align: center; margin-bottom: 20px; }
+            .news-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; }
+            .news-card { background: rgba(255,255,255,0.1); border-radius: 8px; padding: 15px; backdrop-filter: blur(10px); }
+            .news-symbol { font-size: 1.2em; font-weight: bold; margin-bottom: 10px; }
+            .sentiment-positive { color: #2ecc71; font-weight: bold; }
+            .sentiment-negative { color: #e74c3c; font-weight: bold; }
+            .sentiment-neutral { color: #95a5a6; font-weight: bold; }
+            .news-headline { background: rgba(255,255,255,0.05); padding: 8px; margin: 5px 0; border-radius: 4px; font-size: 0.9em; }
+            .news-stats { font-size: 0.8em; color: #ecf0f1; margin-top: 10px; }
+            .no-news { text-align: center; color: #bdc3c7; font-style: italic; }
+            .news-summary { background: rgba(255,255,255,0.15); padding: 15px; border-radius: 8px; margin-bottom: 20px; }
+            .sentiment-indicator { display: inline-block; padding: 4px 8px; border-radius: 12px; font-size: 0.8em; margin-left: 8px; }
+            .sentiment-positive-bg { background-color: #2ecc71; color: white; }
+            .sentiment-negative-bg { background-color: #e74c3c; color: white; }
+            .sentiment-neutral-bg { background-color: #95a5a6; color: white; }
+            
+            /* PROFITABILITY SECTION STYLES */
+            .profitability-section { background: linear-gradient(135deg, #26a69a 0%, #4caf50 100%); color: white; padding: 20px; border-radius: 8px; margin-top: 20px; }
+            .profitability-header { text-align: center; margin-bottom: 20px; }
+            .profitability-summary { background: rgba(255,255,255,0.15); padding: 15px; border-radius: 8px; margin-bottom: 20px; text-align: center; }
+            .profitability-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); gap: 15px; margin-bottom: 20px; }
+            .profit-metric { background: rgba(255,255,255,0.1); padding: 12px; border-radius: 6px; text-align: center; }
+            .profit-metric h4 { margin: 0 0 8px 0; font-size: 0.9em; opacity: 0.8; }
+            .profit-metric p { margin: 0; font-size: 1.1em; font-weight: bold; }
+            .profitability-table { background: rgba(255,255,255,0.95); color: #333; border-radius: 8px; overflow: hidden; }
+            .profitability-table table { margin: 0; }
+            .profitability-table th { background-color: rgba(76, 175, 80, 0.1); color: #2e7d32; }
+            .profit-positive { color: #2ecc71; font-weight: bold; }
+            .profit-negative { color: #e74c3c; font-weight: bold; }
+            .profit-neutral { color: #95a5a6; font-weight: bold; }
+            .position-size { font-weight: bold; color: #34495e; }
+            .avg-cost { color: #5d6d7e; }
+            .current-price { color: #2c3e50; font-weight: bold; }
+            
+            /* TECHNICAL ANALYSIS SECTION STYLES */
+            .technical-analysis-section { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px; margin-top: 20px; }
+            .charts-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(500px, 1fr)); gap: 20px; margin-top: 20px; }
+            .chart-container { background: rgba(255,255,255,0.95); color: #333; padding: 15px; border-radius: 8px; text-align: center; }
+            .chart-container h3 { margin-top: 0; color: #2c3e50; font-weight: bold; }
+            .chart-container img { border-radius: 4px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); }
+        </style>"""
+
 def generate_html_report(state: PortfolioState):
     """Generate comprehensive HTML report with ENHANCED validation, trade, and NEWS information"""
     reports_dir = setup_reporting_directory()
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
     filename = f"portfolio_report_{timestamp}.html"
-    filepath = reports_dir / filename
+    filepath = reports_dir / f"{filename}.gz"
 
     # Basic state data
     portfolio_value = state.get('total_portfolio_value', 0)
@@ -1215,83 +1400,17 @@ def generate_html_report(state: PortfolioState):
     pnl_class = 'positive' if total_pnl > 0 else 'negative' if total_pnl < 0 else 'neutral'
 
     # Start building HTML string with enhanced styling INCLUDING NEWS STYLES
-    html = f"""
+    parts = [f"""
     <!DOCTYPE html>
     <html>
     <head>
         <title>AI Trading Report - {timestamp}</title>
-        <style>
-            body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; margin: 20px; background-color: #f9f9f9; }}
-            .header {{ background: #4a69bd; color: white; padding: 20px; border-radius: 8px; text-align: center; }}
-            .metric-card {{ background: white; padding: 15px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); text-align: center; }}
-            .metrics {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 15px; margin: 20px 0; }}
-            .positive {{ color: #2ecc71; }} .negative {{ color: #e74c3c; }} .neutral {{ color: #7f8c8d; }}
-            table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-            th, td {{ padding: 10px; text-align: left; border-bottom: 1px solid #ddd; }}
-            th {{ background-color: #f2f2f2; }}
-            .section {{ background: white; padding: 20px; border-radius: 8px; margin-top: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-            .trade-card {{ background: #f8f9fa; border-left: 4px solid #007bff; padding: 15px; margin: 10px 0; border-radius: 4px; }}
-            .trade-buy {{ border-left-color: #28a745; }}
-            .trade-sell {{ border-left-color: #dc3545; }}
-            .trade-details {{ font-size: 0.9em; color: #666; margin-top: 8px; }}
-            .priority-high {{ background-color: #fff3cd; }}
-            .priority-medium {{ background-color: #d1ecf1; }}
-            .priority-low {{ background-color: #d4edda; }}
-            .validation-step {{ padding: 10px; margin: 5px 0; border-radius: 4px; }}
-            .validation-proceed {{ background-color: #d4edda; border-left: 4px solid #28a745; }}
-            .validation-rerun {{ background-color: #f8d7da; border-left: 4px solid #dc3545; }}
-            .reasoning {{ font-style: italic; color: #495057; }}
-            .order-status {{ font-weight: bold; }}
-            .execution-time {{ color: #6c757d; font-size: 0.8em; }}
-            
-            /* NEWS SECTION STYLES */
-            .news-section {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px; margin-top: 20px; }}
-            .news-header {{ text-align: center; margin-bottom: 20px; }}
-            .news-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; }}
-            .news-card {{ background: rgba(255,255,255,0.1); border-radius: 8px; padding: 15px; backdrop-filter: blur(10px); }}
-            .news-symbol {{ font-size: 1.2em; font-weight: bold; margin-bottom: 10px; }}
-            .sentiment-positive {{ color: #2ecc71; font-weight: bold; }}
-            .sentiment-negative {{ color: #e74c3c; font-weight: bold; }}
-            .sentiment-neutral {{ color: #95a5a6; font-weight: bold; }}
-            .news-headline {{ background: rgba(255,255,255,0.05); padding: 8px; margin: 5px 0; border-radius: 4px; font-size: 0.9em; }}
-            .news-stats {{ font-size: 0.8em; color: #ecf0f1; margin-top: 10px; }}
-            .no-news {{ text-align: center; color: #bdc3c7; font-style: italic; }}
-            .news-summary {{ background: rgba(255,255,255,0.15); padding: 15px; border-radius: 8px; margin-bottom: 20px; }}
-            .sentiment-indicator {{ display: inline-block; padding: 4px 8px; border-radius: 12px; font-size: 0.8em; margin-left: 8px; }}
-            .sentiment-positive-bg {{ background-color: #2ecc71; color: white; }}
-            .sentiment-negative-bg {{ background-color: #e74c3c; color: white; }}
-            .sentiment-neutral-bg {{ background-color: #95a5a6; color: white; }}
-            
-            /* PROFITABILITY SECTION STYLES */
-            .profitability-section {{ background: linear-gradient(135deg, #26a69a 0%, #4caf50 100%); color: white; padding: 20px; border-radius: 8px; margin-top: 20px; }}
-            .profitability-header {{ text-align: center; margin-bottom: 20px; }}
-            .profitability-summary {{ background: rgba(255,255,255,0.15); padding: 15px; border-radius: 8px; margin-bottom: 20px; text-align: center; }}
-            .profitability-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); gap: 15px; margin-bottom: 20px; }}
-            .profit-metric {{ background: rgba(255,255,255,0.1); padding: 12px; border-radius: 6px; text-align: center; }}
-            .profit-metric h4 {{ margin: 0 0 8px 0; font-size: 0.9em; opacity: 0.8; }}
-            .profit-metric p {{ margin: 0; font-size: 1.1em; font-weight: bold; }}
-            .profitability-table {{ background: rgba(255,255,255,0.95); color: #333; border-radius: 8px; overflow: hidden; }}
-            .profitability-table table {{ margin: 0; }}
-            .profitability-table th {{ background-color: rgba(76, 175, 80, 0.1); color: #2e7d32; }}
-            .profit-positive {{ color: #2ecc71; font-weight: bold; }}
-            .profit-negative {{ color: #e74c3c; font-weight: bold; }}
-            .profit-neutral {{ color: #95a5a6; font-weight: bold; }}
-            .position-size {{ font-weight: bold; color: #34495e; }}
-            .avg-cost {{ color: #5d6d7e; }}
-            .current-price {{ color: #2c3e50; font-weight: bold; }}
-            
-            /* TECHNICAL ANALYSIS SECTION STYLES */
-            .technical-analysis-section {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 8px; margin-top: 20px; }}
-            .charts-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(500px, 1fr)); gap: 20px; margin-top: 20px; }}
-            .chart-container {{ background: rgba(255,255,255,0.95); color: #333; padding: 15px; border-radius: 8px; text-align: center; }}
-            .chart-container h3 {{ margin-top: 0; color: #2c3e50; font-weight: bold; }}
-            .chart-container img {{ border-radius: 4px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); }}
-        </style>
+        {_HTML_STYLE}
     </head>
     <body>
         <div class="header">
             <h1>🤖 AI Portfolio Trading Report</h1>
-            <p>Session: {state.get('session_id', 'N/A')} | Cycle: {state.get('cycle_number', 'N/A')} | Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <p>Session: {state.get('session_id', 'N/A')} | Cycle: {state.get('cycle_number', 'N/A')} | Generated: {now.strftime('%Y-%m-%d %H:%M:%S')}</p>
             <p>Strategy Mode: {"🔥 AGGRESSIVE" if state.get('aggressive_mode') else "⚖️ BALANCED"}</p>
         </div>
 
@@ -1301,7 +1420,7 @@ def generate_html_report(state: PortfolioState):
             <div class="metric-card"><h3>Total Trades</h3><p class="neutral">{state.get('total_trades', 0)}</p></div>
             <div class="metric-card"><h3>Cash Available</h3><p class="neutral">${state.get('cash_available', 0):,.2f}</p></div>
             <div class="metric-card"><h3>Validation Attempts</h3><p class="neutral">{state.get('validation_attempts', 0)}</p></div>
-            """
+            """]
     
     # Add S&P 500 metrics to the metrics div
     sp500_data = state.get('sp500_data', {})
@@ -1312,10 +1431,10 @@ def generate_html_report(state: PortfolioState):
         sp500_change = sp500_data.get('change_pct', 0)
         sp500_class = 'positive' if sp500_change > 0 else 'negative' if sp500_change < 0 else 'neutral'
         
-        html += f"""
+        parts.append(f"""
             <div class="metric-card"><h3>📈 S&P 500</h3><p class="neutral">${sp500_price:.2f}</p></div>
             <div class="metric-card"><h3>S&P Change</h3><p class="{sp500_class}">{sp500_change:+.2f}%</p></div>
-        """
+        """)
         
         if 'error' not in benchmark_data:
             alpha = benchmark_data.get('alpha', 0)
@@ -1324,33 +1443,38 @@ def generate_html_report(state: PortfolioState):
             portfolio_return_class = 'positive' if portfolio_return > 0 else 'negative' if portfolio_return < 0 else 'neutral'
             status_text = "OUTPERFORMING" if alpha > 0 else "UNDERPERFORMING" if alpha < 0 else "MATCHING"
             
-            html += f"""
+            parts.append(f"""
             <div class="metric-card"><h3>Portfolio Return</h3><p class="{portfolio_return_class}">{portfolio_return:+.2f}%</p></div>
             <div class="metric-card"><h3>⚖️ Alpha</h3><p class="{alpha_class}">{alpha:+.2f}%</p></div>
             <div class="metric-card"><h3>🏆 Status</h3><p class="{alpha_class}">{status_text}</p></div>
-            """
+            """)
     else:
-        html += """
+        parts.append("""
             <div class="metric-card"><h3>📈 S&P 500</h3><p class="neutral">Unavailable</p></div>
-        """
+        """)
     
-    html += """
+    parts.append("""
         </div>
         
         <div class="section">
             <h2>📊 Current Holdings</h2>
             <table>
                 <tr><th>Stock</th><th>Position</th><th>Price</th><th>P&L</th><th>Allocation</th><th>AI Action</th><th>Technical Score</th><th>News Sentiment</th></tr>
-    """
+    """)
 
     # Enhanced holdings table with news sentiment column
     news_sentiment = state.get('news_sentiment', {})
+    positions = state.get('positions') or {}
+    prices = state.get('stock_prices') or {}
+    pnls = state.get('stock_pnls') or {}
+    allocs = state.get('portfolio_allocation') or {}
+    recs = state.get('ai_recommendations') or {}
     for symbol in PORTFOLIO_STOCKS:
-        pos = state.get('positions', {}).get(symbol, 0)
-        price = state.get('stock_prices', {}).get(symbol, 0)
-        pnl = state.get('stock_pnls', {}).get(symbol, 0)
-        alloc = state.get('portfolio_allocation', {}).get(symbol, 0)
-        rec = state.get('ai_recommendations', {}).get(symbol, {})
+        pos = positions.get(symbol, 0)
+        price = prices.get(symbol, 0)
+        pnl = pnls.get(symbol, 0)
+        alloc = allocs.get(symbol, 0)
+        rec = recs.get(symbol, {})
         action = rec.get('action', 'N/A')
         tech_score = rec.get('technical_score', 'N/A')
         pnl_class_row = 'positive' if pnl > 0 else 'negative' if pnl < 0 else 'neutral'
@@ -1361,7 +1485,7 @@ def generate_html_report(state: PortfolioState):
         sentiment_emoji = news_data.get('sentiment_emoji', '❓')
         sentiment_class = 'sentiment-positive' if sentiment_label == 'POSITIVE' else 'sentiment-negative' if sentiment_label == 'NEGATIVE' else 'sentiment-neutral'
         
-        html += f"""<tr>
+        parts.append(f"""<tr>
             <td><strong>{symbol}</strong></td>
             <td>{pos}</td>
             <td>${price:.2f}</td>
@@ -1370,12 +1494,12 @@ def generate_html_report(state: PortfolioState):
             <td>{action}</td>
             <td>{tech_score if isinstance(tech_score, str) else f'{tech_score:.1f}/10'}</td>
             <td class='{sentiment_class}'>{sentiment_emoji} {sentiment_label}</td>
-        </tr>"""
+        </tr>""")
 
-    html += "</table></div>"
+    parts.append("</table></div>")
 
     # ENHANCED Executed Trades Section (keeping your existing code)
-    html += "<div class='section'><h2>⚡ Executed Trades in This Cycle</h2>"
+    parts.append("<div class='section'><h2>⚡ Executed Trades in This Cycle</h2>")
     executed_trades = state.get('executed_trades', [])
     if executed_trades:
         for i, trade in enumerate(executed_trades, 1):
@@ -1398,7 +1522,7 @@ def generate_html_report(state: PortfolioState):
             priority_class = f'priority-{priority.lower()}'
             action_emoji = '🟢' if action == 'BUY' else '🔴'
             
-            html += f"""
+            parts.append(f"""
             <div class="trade-card {trade_class} {priority_class}">
                 <h4>{action_emoji} Trade #{i}: {action} {quantity} {symbol}</h4>
                 <div class="trade-details">
@@ -1410,13 +1534,13 @@ def generate_html_report(state: PortfolioState):
                     <p class="execution-time">Execution Time: {execution_time:.2f}s | Timestamp: {trade.get('timestamp', 'N/A')}</p>
                 </div>
             </div>
-            """
+            """)
     else:
-        html += "<p>No trades executed in this cycle.</p>"
-    html += "</div>"
+        parts.append("<p>No trades executed in this cycle.</p>")
+    parts.append("</div>")
 
     # ENHANCED Validation Log Section (keeping your existing code)
-    html += "<div class='section'><h2>🕵️ Decision Validation Process</h2>"
+    parts.append("<div class='section'><h2>🕵️ Decision Validation Process</h2>")
     validation_history = state.get('validation_history', [])
     if validation_history:
         for attempt in validation_history:
@@ -1434,31 +1558,31 @@ def generate_html_report(state: PortfolioState):
                 status_icon = '🔄'
                 status_text = 'VALIDATION FAILED - RERUN REQUIRED'
             
-            html += f"""
+            parts.append(f"""
             <div class="validation-step {status_class}">
                 <h4>{status_icon} Attempt #{attempt_num}: {status_text}</h4>
                 <p><strong>Timestamp:</strong> {timestamp}</p>
                 <p><strong>Reason:</strong> {reason}</p>
             </div>
-            """
+            """)
         
         # Add final decision logic
         final_logic = state.get('final_decision_logic', 'N/A')
-        html += f"""
+        parts.append(f"""
         <div class="validation-step" style="background-color: #e9ecef; border-left: 4px solid #6c757d;">
             <h4>🎯 Final Decision Logic</h4>
             <p>{final_logic}</p>
         </div>
-        """
+        """)
     else:
-        html += "<p>No validation performed in this cycle.</p>"
-    html += "</div>"
+        parts.append("<p>No validation performed in this cycle.</p>")
+    parts.append("</div>")
 
     # AI Recommendations Analysis Section (keeping your existing code)
-    html += "<div class='section'><h2>🧠 AI Recommendations Analysis</h2>"
+    parts.append("<div class='section'><h2>🧠 AI Recommendations Analysis</h2>")
     ai_recommendations = state.get('ai_recommendations', {})
     if ai_recommendations:
-        html += "<table><tr><th>Symbol</th><th>Action</th><th>Priority</th><th>Technical Score</th><th>Reasoning</th><th>Confidence</th></tr>"
+        parts.append("<table><tr><th>Symbol</th><th>Action</th><th>Priority</th><th>Technical Score</th><th>Reasoning</th><th>Confidence</th></tr>")
         for symbol, rec in ai_recommendations.items():
             action = rec.get('action', 'HOLD')
             priority = rec.get('priority', 'LOW')
@@ -1468,24 +1592,24 @@ def generate_html_report(state: PortfolioState):
             
             action_color = 'positive' if action == 'BUY' else 'negative' if action == 'SELL' else 'neutral'
             
-            html += f"""<tr>
+            parts.append(f"""<tr>
                 <td><strong>{symbol}</strong></td>
                 <td class="{action_color}">{action}</td>
                 <td>{priority}</td>
                 <td>{tech_score if isinstance(tech_score, str) else f'{tech_score:.1f}/10'}</td>
                 <td class="reasoning">{reasoning}</td>
                 <td>{confidence}</td>
-            </tr>"""
-        html += "</table>"
+            </tr>""")
+        parts.append("</table>")
     else:
-        html += "<p>No AI recommendations generated in this cycle.</p>"
-    html += "</div>"
+        parts.append("<p>No AI recommendations generated in this cycle.</p>")
+    parts.append("</div>")
 
     # AI Trend Analysis Section (keeping your existing code)
-    html += "<div class='section'><h2>📈 AI Trend Analysis</h2>"
+    parts.append("<div class='section'><h2>📈 AI Trend Analysis</h2>")
     ai_trends = state.get('ai_trend_analysis', {})
     if ai_trends:
-        html += "<table><tr><th>Symbol</th><th>Trend</th><th>Confidence</th><th>Risk Level</th><th>Technical Strength</th><th>Reasoning</th></tr>"
+        parts.append("<table><tr><th>Symbol</th><th>Trend</th><th>Confidence</th><th>Risk Level</th><th>Technical Strength</th><th>Reasoning</th></tr>")
         for symbol, trend in ai_trends.items():
             trend_direction = trend.get('trend', 'NEUTRAL')
             confidence = trend.get('confidence', 'LOW')
@@ -1495,39 +1619,37 @@ def generate_html_report(state: PortfolioState):
             
             trend_color = 'positive' if trend_direction == 'BULLISH' else 'negative' if trend_direction == 'BEARISH' else 'neutral'
             
-            html += f"""<tr>
+            parts.append(f"""<tr>
                 <td><strong>{symbol}</strong></td>
                 <td class="{trend_color}">{trend_direction}</td>
                 <td>{confidence}</td>
                 <td>{risk}</td>
                 <td>{tech_strength}</td>
                 <td class="reasoning">{reasoning}</td>
-            </tr>"""
-        html += "</table>"
+            </tr>""")
+        parts.append("</table>")
     else:
-        html += "<p>No AI trend analysis available.</p>"
-    html += "</div>"
+        parts.append("<p>No AI trend analysis available.</p>")
+    parts.append("</div>")
 
     # ADD THE NEW TRADING HISTORY SECTION
-    html += generate_trading_history_section_html(state)
+    parts.append(generate_trading_history_section_html(state))
     
     # NEW: ADD PROFITABILITY SECTION BEFORE NEWS
-    html += generate_profitability_section_html(state)
+    parts.append(generate_profitability_section_html(state))
     
     # NEW: ADD TECHNICAL ANALYSIS SECTION
-    html += generate_technical_analysis_section_html(state)
+    parts.append(generate_technical_analysis_section_html(state))
     
     # NEW: ADD NEWS SECTION AT THE BOTTOM
-    html += generate_news_section_html(state)
-
-    html += "</body></html>"
+    parts.append(generate_news_section_html(state))
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(html)
+    parts.append("</body></html>")
+    write_report_file(filepath, parts, compress=True)
     
     print(f"📄 Enhanced HTML Report with News saved: {filepath}")
-    gcs_path = f"{datetime.now().strftime('%Y/%m/%d')}/{filename}"
-    upload_to_gcs(str(filepath), gcs_path)
+    gcs_path = f"{now.strftime('%Y/%m/%d')}/{filename}"
+    upload_report_in_background(filepath, gcs_path, **GZIP_HTML_UPLOAD)
     return str(filepath)
 
 # Helper function to easily add news to your trading cycle
@@ -1553,17 +1675,76 @@ async def add_news_to_current_cycle(state: PortfolioState) -> PortfolioState:
         state['news_sentiment'] = {}
         return state
 
+PNL_INDEX_FILENAME = "pnl_index.jsonl"
+STATUS_CHART_MAX_POINTS = 200
+
+def rebuild_pnl_index(reports_dir: Path) -> list:
+    """Rebuild the P&L index from every portfolio_data_*.json report in reports_dir."""
+    # Filenames embed %Y%m%d_%H%M%S, so sorting by name is chronological
+    with os.scandir(reports_dir) as it:
+        entries = [e for e in it if e.name.startswith('portfolio_data_') and e.name.endswith('.json')]
+    entries.sort(key=lambda e: e.name)
+
+    rows = []
+    for entry in entries:
+        try:
+            with open(entry.path, 'rb') as f:
+                data = orjson.loads(f.read())
+            rows.append({
+                'timestamp': data.get('report_metadata', {}).get('generated_at', ''),
+                'pnl': data.get('portfolio_summary', {}).get('total_unrealized_pnl', 0),
+                'filename': entry.name,
+            })
+        except Exception as e:
+            print(f"⚠️ Could not parse historical report {entry.path}: {e}")
+
+    index_path = reports_dir / PNL_INDEX_FILENAME
+    index_path.write_bytes(b"".join(orjson.dumps(row, default=float) + b"\n" for row in rows))
+    print(f"🗂️ Rebuilt P&L index from {len(rows)} reports: {index_path}")
+    return rows
+
+def load_pnl_index(reports_dir: Path, limit: int = None) -> list:
+    """Load the historical P&L index (one JSON object per line), rebuilding it if missing.
+
+    With limit set, only the most recent `limit` entries are decoded and returned.
+    """
+    index_path = reports_dir / PNL_INDEX_FILENAME
+    if not index_path.exists():
+        rows = rebuild_pnl_index(reports_dir)
+        return rows[-limit:] if limit else rows
+    try:
+        lines = [line for line in index_path.read_bytes().splitlines() if line]
+        if limit:
+            lines = lines[-limit:]
+        return [orjson.loads(line) for line in lines]
+    except orjson.JSONDecodeError as e:
+        print(f"⚠️ P&L index is corrupt ({e}), rebuilding")
+        rows = rebuild_pnl_index(reports_dir)
+        return rows[-limit:] if limit else rows
+
+def append_pnl_index(reports_dir: Path, generated_at: str, pnl, filename: str):
+    """Append one report's P&L to the index so status reports never re-parse full JSON reports."""
+    index_path = reports_dir / PNL_INDEX_FILENAME
+    if not index_path.exists():
+        # First indexed report: backfill from the archive (which already includes this report)
+        rebuild_pnl_index(reports_dir)
+        return
+    row = {'timestamp': generated_at, 'pnl': pnl, 'filename': filename}
+    with open(index_path, 'ab') as f:
+        f.write(orjson.dumps(row, default=float) + b"\n")
+
 def generate_json_report(state: PortfolioState):
     """Generate detailed JSON report with ENHANCED trade and validation capture"""
     reports_dir = setup_reporting_directory()
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
     filename = f"portfolio_data_{timestamp}.json"
     filepath = reports_dir / filename
 
     # Create enhanced report structure
     enhanced_report = {
         'report_metadata': {
-            'generated_at': datetime.now().isoformat(),
+            'generated_at': now.isoformat(),
             'session_id': state.get('session_id', 'N/A'),
             'cycle_number': state.get('cycle_number', 0),
             'strategy_mode': 'AGGRESSIVE' if state.get('aggressive_mode') else 'BALANCED',
@@ -1621,54 +1802,101 @@ def generate_json_report(state: PortfolioState):
                 'volatility_20': stock_data.get('volatility_20', 0)
             }
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(enhanced_report, f, indent=2, default=str)
+    filepath.write_bytes(orjson.dumps(
+        enhanced_report,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        default=str,
+    ))
+    append_pnl_index(
+        reports_dir,
+        enhanced_report['report_metadata']['generated_at'],
+        enhanced_report['portfolio_summary']['total_unrealized_pnl'],
+        filename,
+    )
         
     print(f"📊 Enhanced JSON Report saved: {filepath}")
     return str(filepath)
 
+SUMMARY_CSV_COLUMNS = (
+    'Timestamp', 'Session_ID', 'Cycle_Number', 'Symbol',
+    'Current_Price', 'Position', 'Unrealized_PnL', 'Portfolio_Allocation_Pct',
+    'AI_Action', 'AI_Priority', 'AI_Reasoning', 'Technical_Score', 'AI_Confidence',
+    'AI_Trend', 'Trend_Confidence', 'Risk_Level',
+    'RSI', 'SMA_20', 'SMA_50', 'MACD_Histogram', 'Daily_Change_Pct', 'Volume_Ratio',
+    'Strategy_Mode',
+)
+
+def write_dict_rows_csv(filepath, rows: list):
+    """Write a list of dicts as CSV; columns are the union of keys in first-seen order, like pd.DataFrame(rows)."""
+    fieldnames = list(dict.fromkeys(key for row in rows for key in row))
+    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval='', lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+
+TRADE_LOG_FIELDS = (
+    'Session_ID', 'Cycle_Number', 'Strategy_Mode',
+    'timestamp', 'symbol', 'action', 'quantity', 'usd_amount', 'priority', 'reasoning', 'risk', 'price',
+    'estimated_cost', 'estimated_proceeds', 'net_profit', 'order_id', 'status', 'filled', 'remaining',
+    'avg_fill_price', 'execution_time',
+    'Portfolio_Value_At_Trade', 'Cash_Available_At_Trade', 'Total_Trades_So_Far',
+)
+
+def append_trade_log(reports_dir: Path, session_id: str, trades: list):
+    """Append trades to the session's executed_trades_<session_id>.csv, writing the header only on creation."""
+    log_filepath = reports_dir / f"executed_trades_{session_id}.csv"
+    is_new = not log_filepath.exists()
+    with open(log_filepath, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=TRADE_LOG_FIELDS, restval='', extrasaction='ignore', lineterminator='\n')
+        if is_new:
+            writer.writeheader()
+        writer.writerows(trades)
+    return log_filepath
+
 def generate_csv_report(state: PortfolioState):
     """Generate ENHANCED CSV reports for portfolio summary and detailed trades"""
     reports_dir = setup_reporting_directory()
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
     
     # Enhanced Portfolio Summary CSV
     summary_filename = f"portfolio_summary_{timestamp}.csv"
     summary_filepath = reports_dir / summary_filename
     
-    summary_data = []
-    for symbol in PORTFOLIO_STOCKS:
-        rec = state.get('ai_recommendations', {}).get(symbol, {})
-        trend = state.get('ai_trend_analysis', {}).get(symbol, {})
-        stock_data = state.get('stock_data', {}).get(symbol, {})
-        
-        summary_data.append({
-            'Timestamp': datetime.now().isoformat(),
-            'Session_ID': state.get('session_id', 'N/A'),
-            'Cycle_Number': state.get('cycle_number', 0),
-            'Symbol': symbol,
-            'Current_Price': state.get('stock_prices', {}).get(symbol, 0),
-            'Position': state.get('positions', {}).get(symbol, 0),
-            'Unrealized_PnL': state.get('stock_pnls', {}).get(symbol, 0),
-            'Portfolio_Allocation_Pct': state.get('portfolio_allocation', {}).get(symbol, 0),
-            'AI_Action': rec.get('action', 'N/A'),
-            'AI_Priority': rec.get('priority', 'N/A'),
-            'AI_Reasoning': rec.get('reasoning', 'N/A'),
-            'Technical_Score': rec.get('technical_score', 0),
-            'AI_Confidence': rec.get('confidence', 'N/A'),
-            'AI_Trend': trend.get('trend', 'N/A'),
-            'Trend_Confidence': trend.get('confidence', 'N/A'),
-            'Risk_Level': trend.get('risk_level', 'N/A'),
-            'RSI': stock_data.get('rsi', 50),
-            'SMA_20': stock_data.get('sma_20', 0),
-            'SMA_50': stock_data.get('sma_50', 0),
-            'MACD_Histogram': stock_data.get('macd_histogram', 0),
-            'Daily_Change_Pct': stock_data.get('daily_change_pct', 0),
-            'Volume_Ratio': stock_data.get('current_volume', 0) / max(stock_data.get('volume_ma', 1), 1),
-            'Strategy_Mode': 'AGGRESSIVE' if state.get('aggressive_mode') else 'BALANCED'
-        })
-    
-    pd.DataFrame(summary_data).to_csv(summary_filepath, index=False)
+    positions = state.get('positions') or {}
+    prices = state.get('stock_prices') or {}
+    pnls = state.get('stock_pnls') or {}
+    allocs = state.get('portfolio_allocation') or {}
+    recs = state.get('ai_recommendations') or {}
+    trends = state.get('ai_trend_analysis') or {}
+    stock_datas = state.get('stock_data') or {}
+    generated_at = now.isoformat()
+    session_id = state.get('session_id', 'N/A')
+    cycle_number = state.get('cycle_number', 0)
+    strategy_mode = 'AGGRESSIVE' if state.get('aggressive_mode') else 'BALANCED'
+
+    def summary_rows():
+        for symbol in PORTFOLIO_STOCKS:
+            rec = recs.get(symbol, {})
+            trend = trends.get(symbol, {})
+            sd = stock_datas.get(symbol, {})
+            yield (
+                generated_at, session_id, cycle_number, symbol,
+                prices.get(symbol, 0), positions.get(symbol, 0), pnls.get(symbol, 0), allocs.get(symbol, 0),
+                rec.get('action', 'N/A'), rec.get('priority', 'N/A'), rec.get('reasoning', 'N/A'),
+                rec.get('technical_score', 0), rec.get('confidence', 'N/A'),
+                trend.get('trend', 'N/A'), trend.get('confidence', 'N/A'), trend.get('risk_level', 'N/A'),
+                sd.get('rsi', 50), sd.get('sma_20', 0), sd.get('sma_50', 0), sd.get('macd_histogram', 0),
+                sd.get('daily_change_pct', 0),
+                sd.get('current_volume', 0) / max(sd.get('volume_ma', 1), 1),
+                strategy_mode,
+            )
+
+    # Stream rows straight to the file; a DataFrame adds nothing for a handful of rows
+    with open(summary_filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(SUMMARY_CSV_COLUMNS)
+        writer.writerows(summary_rows())
     print(f"📋 Enhanced Summary CSV saved: {summary_filepath}")
 
     # Enhanced Detailed Trades CSV
@@ -1691,9 +1919,19 @@ def generate_csv_report(state: PortfolioState):
             }
             enhanced_trades_data.append(enhanced_trade)
         
-        pd.DataFrame(enhanced_trades_data).to_csv(trades_filepath, index=False)
+        write_dict_rows_csv(trades_filepath, enhanced_trades_data)
         print(f"📈 Enhanced Trades CSV saved: {trades_filepath}")
 
+        # Session trade log: append only the trades not yet written, never rewrite the history
+        written_idx = state.get('trades_written_idx', 0)
+        if written_idx > len(enhanced_trades_data):
+            written_idx = 0  # executed_trades was replaced by a shorter list
+        new_trades = enhanced_trades_data[written_idx:]
+        if new_trades:
+            log_filepath = append_trade_log(reports_dir, state.get('session_id', 'N/A'), new_trades)
+            print(f"🧾 Appended {len(new_trades)} trades to session log: {log_filepath}")
+        state['trades_written_idx'] = len(enhanced_trades_data)
+
     # Validation History CSV
     validation_history = state.get('validation_history', [])
     if validation_history:
@@ -1709,7 +1947,7 @@ def generate_csv_report(state: PortfolioState):
                 **validation
             })
         
-        pd.DataFrame(validation_data).to_csv(validation_filepath, index=False)
+        write_dict_rows_csv(validation_filepath, validation_data)
         print(f"🕵️ Validation History CSV saved: {validation_filepath}")
 
     return str(summary_filepath)
@@ -1718,12 +1956,103 @@ def generate_csv_report(state: PortfolioState):
 
 
 # === ENHANCED PERFORMANCE SUMMARY REPORT (REVISED) ===
+def calculate_cycle_history_metrics(cycle_history: list) -> Dict[str, Any]:
+    """Compute Sharpe, P&L range, connection and validation aggregates in a single pass over cycle_history"""
+    if not cycle_history:
+        return {'sharpe_ratio': 0.0, 'best_pnl': 0, 'worst_pnl': 0, 'connected_cycles': 0,
+                'avg_data_quality': 0, 'total_validation_attempts': 0, 'cycles_with_validation': 0}
+
+    # One walk over the cycle dicts; every key is looked up once per cycle
+    value_list = []
+    pnl_list = []
+    connected_cycles = data_quality_sum = total_validation_attempts = cycles_with_validation = 0
+    for cycle in cycle_history:
+        value_list.append(cycle.get('total_portfolio_value', 0))
+        pnl_list.append(cycle.get('total_unrealized_pnl', 0))
+        if cycle.get('connection_status', False):
+            connected_cycles += 1
+        data_quality_sum += cycle.get('data_quality', 0)
+        attempts = cycle.get('validation_attempts', 0)
+        total_validation_attempts += attempts
+        if attempts > 0:
+            cycles_with_validation += 1
+
+    # Per-cycle returns, matching Series.pct_change().dropna()
+    values = np.asarray(value_list, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(values) / values[:-1]
+        returns = returns[~np.isnan(returns)]
+        returns_std = returns.std(ddof=1) if returns.size > 1 else 0.0
+        sharpe_ratio = (returns.mean() / returns_std) * (252**0.5) if returns_std > 0 else 0.0
+
+    return {
+        'sharpe_ratio': float(sharpe_ratio),
+        'best_pnl': max(pnl_list),
+        'worst_pnl': min(pnl_list),
+        'connected_cycles': connected_cycles,
+        'avg_data_quality': data_quality_sum / len(cycle_history),
+        'total_validation_attempts': total_validation_attempts,
+        'cycles_with_validation': cycles_with_validation,
+    }
+
+def calculate_trade_win_loss_stats(executed_trades: list) -> Dict[str, Any]:
+    """Win/loss counts and totals over closed SELL trades, computed from one net_profit array"""
+    import pandas as pd
+    trades_df = pd.DataFrame(executed_trades)
+    if trades_df.empty or 'action' not in trades_df or 'net_profit' not in trades_df:
+        return {'win_count': 0, 'loss_count': 0, 'total_wins': 0, 'total_losses': 0}
+
+    sells = trades_df[(trades_df['action'] == 'SELL') & trades_df['net_profit'].notna()]
+    profits = sells['net_profit'].to_numpy(dtype=float)
+    wins_mask = profits > 0
+    win_count = int(wins_mask.sum())
+
+    return {
+        'win_count': win_count,
+        'loss_count': profits.size - win_count,
+        'total_wins': float(profits[wins_mask].sum()),
+        'total_losses': float(profits[~wins_mask].sum()),
+    }
+
+# Threshold ladders for the performance metric cards. bisect_right puts a value equal to a cut in the
+# higher bucket (">= cut"); bisect_left keeps it in the lower one ("> cut").
+_SIGN_CLASSES = ('neutral', 'positive', 'negative')  # indexed by sign: 0, 1, -1
+_TWO_CLASSES = ('negative', 'positive')
+_THREE_CLASSES = ('negative', 'neutral', 'positive')
+_SHARPE_CLASS_CUTS = (0.0, 1.0)
+_WIN_LOSS_CLASS_CUTS = (1.0,)
+_PROFIT_FACTOR_CLASS_CUTS = (1.0, 1.5)
+_SHARPE_LABELS = ('poor', 'moderate', 'good', 'excellent')
+_SHARPE_LABEL_CUTS = (0.0, 1.0, 2.0)
+
+_PERF_STYLE = """<style>
+            body { font-family: Arial, sans-serif; margin: 40px; background-color: #f5f5f5; }
+            .header { background: linear-gradient(135deg, #4854c7 0%, #3a3897 100%); color: white; padding: 30px; border-radius: 10px; text-align: center; }
+            .metrics { display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin: 20px 0; }
+            .metric-card { background: white; padding: 25px; border-radius: 10px; text-align: center; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+            .metric-value { font-size: 2.5em; font-weight: bold; color: #333; }
+            .metric-label { color: #666; margin-top: 10px; font-size: 1.1em; }
+            .positive { color: #28a745; }
+            .negative { color: #dc3545; }
+            .neutral { color: #6c757d; }
+            .performance-chart { background: white; padding: 25px; margin: 20px 0; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+            .cycle-table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+            .cycle-table th, .cycle-table td { padding: 12px; text-align: center; border-bottom: 1px solid #ddd; }
+            .cycle-table th { background-color: #f8f9fa; font-weight: bold; }
+            .insights, .validation-insights, .diagnostic { padding: 25px; margin: 20px 0; border-radius: 10px; }
+            .insights { background-color: #e8f4fd; border-left: 5px solid #007bff; }
+            .validation-insights { background-color: #e9f5e9; border-left: 5px solid #28a745; }
+            .diagnostic { background-color: #fff3cd; border-left: 5px solid #ffc107; }
+            .footer { text-align: center; color: #666; margin-top: 40px; }
+        </style>"""
+
 def generate_performance_summary_report(state: PortfolioState):
     """Generate performance summary report with advanced metrics"""
     reports_dir = setup_reporting_directory()
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
     filename = f"performance_summary_{timestamp}.html"
-    filepath = reports_dir / filename
+    filepath = reports_dir / f"{filename}.gz"
 
     cycle_history = state.get('cycle_history', [])
     if len(cycle_history) < 2:
@@ -1741,73 +2070,53 @@ def generate_performance_summary_report(state: PortfolioState):
 
     # Trade Analysis
     executed_trades = state.get('executed_trades', [])
-    sell_trades = [t for t in executed_trades if t.get('action') == 'SELL' and 'net_profit' in t]
-    win_count = len([t for t in sell_trades if t['net_profit'] > 0])
-    loss_count = len([t for t in sell_trades if t['net_profit'] <= 0])
+    trade_stats = calculate_trade_win_loss_stats(executed_trades)
+    win_count = trade_stats['win_count']
+    loss_count = trade_stats['loss_count']
     total_win_loss_trades = win_count + loss_count
     win_rate_pct = (win_count / total_win_loss_trades * 100) if total_win_loss_trades > 0 else 0
     win_loss_ratio = win_count / loss_count if loss_count > 0 else float(win_count > 0)
 
-    total_wins = sum(t['net_profit'] for t in sell_trades if t['net_profit'] > 0)
-    total_losses = sum(t['net_profit'] for t in sell_trades if t['net_profit'] <= 0)
+    total_wins = trade_stats['total_wins']
+    total_losses = trade_stats['total_losses']
     profit_factor = total_wins / abs(total_losses) if total_losses < 0 else float('inf') if total_wins > 0 else 0
 
     # Advanced Metrics
-    portfolio_returns = pd.Series([c.get('total_portfolio_value', 0) for c in cycle_history]).pct_change().dropna()
-    sharpe_ratio = (portfolio_returns.mean() / portfolio_returns.std()) * (252**0.5) if portfolio_returns.std() > 0 else 0.0
-    pnl_by_cycle = [cycle.get('total_unrealized_pnl', 0) for cycle in cycle_history]
-    best_pnl = max(pnl_by_cycle) if pnl_by_cycle else 0
-    worst_pnl = min(pnl_by_cycle) if pnl_by_cycle else 0
+    cycle_metrics = calculate_cycle_history_metrics(cycle_history)
+    sharpe_ratio = cycle_metrics['sharpe_ratio']
+    best_pnl = cycle_metrics['best_pnl']
+    worst_pnl = cycle_metrics['worst_pnl']
 
     # System Diagnostics
-    connected_cycles = sum(1 for c in cycle_history if c.get('connection_status', False))
+    connected_cycles = cycle_metrics['connected_cycles']
     connection_rate = (connected_cycles / len(cycle_history) * 100)
-    avg_data_quality = sum(c.get('data_quality', 0) for c in cycle_history) / len(cycle_history)
+    avg_data_quality = cycle_metrics['avg_data_quality']
 
     # Validation System
-    total_validation_attempts = sum(c.get('validation_attempts', 0) for c in cycle_history)
-    cycles_with_validation = sum(1 for c in cycle_history if c.get('validation_attempts', 0) > 0)
+    total_validation_attempts = cycle_metrics['total_validation_attempts']
+    cycles_with_validation = cycle_metrics['cycles_with_validation']
     avg_validation_per_cycle = total_validation_attempts / len(cycle_history)
 
     # --- 2. DYNAMIC CONTENT PRE-CALCULATION ---
     # CSS Classes for Metric Cards
-    return_pct_class = 'positive' if return_pct > 0 else 'negative' if return_pct < 0 else 'neutral'
-    total_return_class = 'positive' if total_return > 0 else 'negative' if total_return < 0 else 'neutral'
-    sharpe_ratio_class = 'positive' if sharpe_ratio >= 1 else 'negative' if sharpe_ratio < 0 else 'neutral'
-    win_loss_ratio_class = 'positive' if win_loss_ratio >= 1 else 'negative'
-    profit_factor_class = 'positive' if profit_factor >= 1.5 else 'negative' if profit_factor < 1 else 'neutral'
+    return_pct_class = _SIGN_CLASSES[(return_pct > 0) - (return_pct < 0)]
+    total_return_class = _SIGN_CLASSES[(total_return > 0) - (total_return < 0)]
+    sharpe_ratio_class = _THREE_CLASSES[bisect.bisect_right(_SHARPE_CLASS_CUTS, sharpe_ratio)]
+    win_loss_ratio_class = _TWO_CLASSES[bisect.bisect_right(_WIN_LOSS_CLASS_CUTS, win_loss_ratio)]
+    profit_factor_class = _THREE_CLASSES[bisect.bisect_right(_PROFIT_FACTOR_CLASS_CUTS, profit_factor)]
 
     # Descriptive Text for Insights
-    sharpe_interpretation = 'excellent' if sharpe_ratio > 2 else 'good' if sharpe_ratio > 1 else 'moderate' if sharpe_ratio > 0 else 'poor'
+    sharpe_interpretation = _SHARPE_LABELS[bisect.bisect_left(_SHARPE_LABEL_CUTS, sharpe_ratio)]
     validation_engagement = 'Actively engaged' if cycles_with_validation > len(cycle_history) * 0.1 else 'Minimal engagement'
 
     # --- 3. HTML STRING CONSTRUCTION ---
-    html_content = f"""
+    parts = [f"""
     <!DOCTYPE html>
     <html lang="en">
     <head>
         <meta charset="UTF-8">
         <title>Enhanced Performance Summary Report - {timestamp}</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 40px; background-color: #f5f5f5; }}
-            .header {{ background: linear-gradient(135deg, #4854c7 0%, #3a3897 100%); color: white; padding: 30px; border-radius: 10px; text-align: center; }}
-            .metrics {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin: 20px 0; }}
-            .metric-card {{ background: white; padding: 25px; border-radius: 10px; text-align: center; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-            .metric-value {{ font-size: 2.5em; font-weight: bold; color: #333; }}
-            .metric-label {{ color: #666; margin-top: 10px; font-size: 1.1em; }}
-            .positive {{ color: #28a745; }}
-            .negative {{ color: #dc3545; }}
-            .neutral {{ color: #6c757d; }}
-            .performance-chart {{ background: white; padding: 25px; margin: 20px 0; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-            .cycle-table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-            .cycle-table th, .cycle-table td {{ padding: 12px; text-align: center; border-bottom: 1px solid #ddd; }}
-            .cycle-table th {{ background-color: #f8f9fa; font-weight: bold; }}
-            .insights, .validation-insights, .diagnostic {{ padding: 25px; margin: 20px 0; border-radius: 10px; }}
-            .insights {{ background-color: #e8f4fd; border-left: 5px solid #007bff; }}
-            .validation-insights {{ background-color: #e9f5e9; border-left: 5px solid #28a745; }}
-            .diagnostic {{ background-color: #fff3cd; border-left: 5px solid #ffc107; }}
-            .footer {{ text-align: center; color: #666; margin-top: 40px; }}
-        </style>
+        {_PERF_STYLE}
     </head>
     <body>
         <div class="header">
@@ -1879,95 +2188,119 @@ def generate_performance_summary_report(state: PortfolioState):
                     </tr>
                 </thead>
                 <tbody>
-    """
+    """]
 
-    for cycle in cycle_history[-10:]:
-        pnl = cycle.get('total_unrealized_pnl', 0)
-        pnl_class = 'positive' if pnl > 0 else 'negative' if pnl < 0 else 'neutral'
-        connection_status = "✅" if cycle.get('connection_status', False) else "❌"
-        validations = cycle.get('validation_attempts', 0)
-        
-        html_content += f"""
-                    <tr>
-                        <td>{cycle.get('cycle_number', 'N/A')}</td>
-                        <td>${cycle.get('total_portfolio_value', 0):,.2f}</td>
-                        <td class="{pnl_class}">${pnl:+.2f}</td>
-                        <td>{cycle.get('executed_trades_count', 0)}</td>
-                        <td>{cycle.get('total_shares', 0)}</td>
-                        <td>{connection_status}</td>
-                        <td>{validations}</td>
-                    </tr>
-        """
+    parts.append(get_report_template('perf_cycle_rows.html').render(cycles=cycle_history[-10:]))
 
-    html_content += f"""
+    parts.append(f"""
                 </tbody>
             </table>
         </div>
         
         <div class="footer">
-            <p>Generated by Enhanced AI Portfolio Trading Agent | {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <p>Generated by Enhanced AI Portfolio Trading Agent | {now.strftime('%Y-%m-%d %H:%M:%S')}</p>
         </div>
     </body>
     </html>
-    """
-
-    with open(filepath, 'w', encoding='utf-8', errors='replace') as f:
-        f.write(html_content)
+    """)
+    write_report_file(filepath, parts, errors='replace', compress=True)
     
     print(f"📈 Enhanced Performance Summary saved: {filepath}")
 
     # Upload to GCS
     try:
         gcs_bucket_name = "portfolio_reports_algo"
-        now = datetime.now()
         gcs_destination_path = f"{now.strftime('%Y/%m/%d')}/{filename}"
 
         # gcs_path = f"{datetime.now().strftime('%Y/%m/%d')}/{filename}"
         # upload_to_gcs(str(filepath), gcs_path)
     
-        upload_result = upload_to_gcs(str(filepath), gcs_destination_path)
-        if upload_result:
-            print(f"✅ Performance summary uploaded to GCS: {upload_result}")
+        upload_report_in_background(filepath, gcs_destination_path, "✅ Performance summary uploaded to GCS", **GZIP_HTML_UPLOAD)
     except Exception as e:
         print(f"❌ GCS upload error: {e}")
 
     return str(filepath)
 
+_STATUS_STYLE = """<style>
+            body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, 'Open Sans', 'Helvetica Neue', sans-serif; margin: 20px; background-color: #f7f9fc; color: #333; }
+            .header { background: #2c3e50; color: white; padding: 25px; border-radius: 12px; text-align: center; margin-bottom: 20px; }
+            .metrics { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 20px; margin-bottom: 20px; }
+            .metric-card { background: white; padding: 20px; border-radius: 12px; box-shadow: 0 4px 12px rgba(0,0,0,0.08); text-align: center; }
+            .metric-value { font-size: 2.2em; font-weight: 600; }
+            .metric-label { color: #555; margin-top: 8px; font-size: 1em; }
+            .positive { color: #27ae60; } .negative { color: #c0392b; } .neutral { color: #7f8c8d; }
+            .section { background: white; padding: 25px; border-radius: 12px; margin-top: 20px; box-shadow: 0 4px 12px rgba(0,0,0,0.08); }
+            table { width: 100%; border-collapse: collapse; margin-top: 15px; }
+            th, td { padding: 12px 15px; text-align: left; border-bottom: 1px solid #eef; }
+            th { background-color: #f7f9fc; font-weight: 600; }
+            h1, h2 { margin: 0; } h2 { margin-bottom: 15px; border-bottom: 2px solid #eee; padding-bottom: 10px; }
+        </style>"""
+
+# Only the series vary between status reports; the Chart.js setup is bound once as a format method
+_STATUS_CHART_SCRIPT = """<script>
+            const ctx = document.getElementById('pnlChart').getContext('2d');
+            new Chart(ctx, {{
+                type: 'line',
+                data: {{
+                    labels: {labels},
+                    datasets: [{{
+                        label: 'Unrealized P&L ($)',
+                        data: {data},
+                        borderColor: 'rgba(54, 162, 235, 1)',
+                        backgroundColor: 'rgba(54, 162, 235, 0.2)',
+                        borderWidth: 2,
+                        fill: true,
+                        tension: 0.1
+                    }}]
+                }},
+                options: {{
+                    responsive: true,
+                    scales: {{
+                        y: {{
+                            beginAtZero: false,
+                            ticks: {{
+                                callback: function(value, index, values) {{
+                                    return '$' + value.toLocaleString();
+                                }}
+                            }}
+                        }}
+                    }}
+                }}
+            }});
+        </script>""".format
+
 def generate_portfolio_status_report(state: PortfolioState):
     """
     Generates a portfolio status report with current metrics and a historical P&L trend chart.
     """
     reports_dir = setup_reporting_directory()
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
     filename = f"status_report_{timestamp}.html"
-    filepath = reports_dir / filename
+    filepath = reports_dir / f"{filename}.gz"
 
     # --- 1. Read Historical Data ---
     historical_pnl = []
-    report_files = sorted(reports_dir.glob("portfolio_data_*.json"))
-
-    for report_file in report_files:
+    for row in load_pnl_index(reports_dir, limit=STATUS_CHART_MAX_POINTS):
         try:
-            with open(report_file, 'r') as f:
-                data = json.load(f)
-                # Extract timestamp and P&L from the JSON structure
-                ts = data.get('report_metadata', {}).get('generated_at', '')
-                pnl = data.get('portfolio_summary', {}).get('total_unrealized_pnl', 0)
-                if ts and pnl is not None:
-                    # Format timestamp for chart labels
-                    chart_ts = datetime.fromisoformat(ts).strftime('%H:%M:%S')
-                    historical_pnl.append({'timestamp': chart_ts, 'pnl': pnl})
+            ts, pnl = row['timestamp'], row['pnl']
+            if ts and pnl is not None:
+                # Format timestamp for chart labels
+                chart_ts = datetime.fromisoformat(ts).strftime('%H:%M:%S')
+                historical_pnl.append({'timestamp': chart_ts, 'pnl': pnl})
         except Exception as e:
-            print(f"⚠️ Could not parse historical report {report_file}: {e}")
+            print(f"⚠️ Could not read P&L index entry for {row.get('filename')}: {e}")
 
     # Add the current state's P&L to the trend
-    current_ts = datetime.now().strftime('%H:%M:%S')
+    current_ts = now.strftime('%H:%M:%S')
     current_pnl = state.get('total_unrealized_pnl', 0)
     historical_pnl.append({'timestamp': current_ts, 'pnl': current_pnl})
 
     # Prepare data for Chart.js
-    chart_labels = json.dumps([item['timestamp'] for item in historical_pnl])
-    chart_data = json.dumps([item['pnl'] for item in historical_pnl])
+    chart_labels = orjson.dumps([item['timestamp'] for item in historical_pnl]).decode()
+    # Chart.js draws at pixel resolution, so cents are all the precision the page needs
+    pnl_arr = np.fromiter((item['pnl'] for item in historical_pnl), dtype=np.float64, count=len(historical_pnl))
+    chart_data = orjson.dumps(np.round(pnl_arr, 2), option=orjson.OPT_SERIALIZE_NUMPY).decode()
 
     # --- 2. Extract Current Data ---
     total_equity = state.get('total_portfolio_value', 0)
@@ -1976,32 +2309,19 @@ def generate_portfolio_status_report(state: PortfolioState):
     pnl_class = 'positive' if unrealized_pnl > 0 else 'negative' if unrealized_pnl < 0 else 'neutral'
     
     # --- 3. Build HTML Content ---
-    html_content = f"""
+    parts = [f"""
     <!DOCTYPE html>
     <html lang="en">
     <head>
         <meta charset="UTF-8">
         <title>Portfolio Status Report - {timestamp}</title>
         <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-        <style>
-            body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, 'Open Sans', 'Helvetica Neue', sans-serif; margin: 20px; background-color: #f7f9fc; color: #333; }}
-            .header {{ background: #2c3e50; color: white; padding: 25px; border-radius: 12px; text-align: center; margin-bottom: 20px; }}
-            .metrics {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 20px; margin-bottom: 20px; }}
-            .metric-card {{ background: white; padding: 20px; border-radius: 12px; box-shadow: 0 4px 12px rgba(0,0,0,0.08); text-align: center; }}
-            .metric-value {{ font-size: 2.2em; font-weight: 600; }}
-            .metric-label {{ color: #555; margin-top: 8px; font-size: 1em; }}
-            .positive {{ color: #27ae60; }} .negative {{ color: #c0392b; }} .neutral {{ color: #7f8c8d; }}
-            .section {{ background: white; padding: 25px; border-radius: 12px; margin-top: 20px; box-shadow: 0 4px 12px rgba(0,0,0,0.08); }}
-            table {{ width: 100%; border-collapse: collapse; margin-top: 15px; }}
-            th, td {{ padding: 12px 15px; text-align: left; border-bottom: 1px solid #eef; }}
-            th {{ background-color: #f7f9fc; font-weight: 600; }}
-            h1, h2 {{ margin: 0; }} h2 {{ margin-bottom: 15px; border-bottom: 2px solid #eee; padding-bottom: 10px; }}
-        </style>
+        {_STATUS_STYLE}
     </head>
     <body>
         <div class="header">
             <h1>Portfolio Status Report</h1>
-            <p>Session: {state.get('session_id', 'N/A')} | Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <p>Session: {state.get('session_id', 'N/A')} | Generated: {now.strftime('%Y-%m-%d %H:%M:%S')}</p>
         </div>
 
         <div class="metrics">
@@ -2029,71 +2349,33 @@ def generate_portfolio_status_report(state: PortfolioState):
             <table>
                 <thead><tr><th>Symbol</th><th>Position (Shares)</th><th>Current Price</th><th>Market Value</th><th>Unrealized P&L</th></tr></thead>
                 <tbody>
-    """
+    """]
     
-    positions = state.get('positions', {})
-    for symbol in sorted(positions.keys()):
-        if positions[symbol] != 0:
-            price = state.get('stock_prices', {}).get(symbol, 0)
-            market_value = positions[symbol] * price
-            pnl = state.get('stock_pnls', {}).get(symbol, 0)
-            pnl_class_row = 'positive' if pnl > 0 else 'negative' if pnl < 0 else 'neutral'
-            html_content += f"""
-                <tr>
-                    <td><strong>{symbol}</strong></td>
-                    <td>{positions[symbol]}</td>
-                    <td>${price:,.2f}</td>
-                    <td>${market_value:,.2f}</td>
-                    <td class="{pnl_class_row}">${pnl:+,.2f}</td>
-                </tr>
-            """
+    # Drop flat symbols before sorting so only held positions pay for the sort
+    holdings = [(symbol, qty) for symbol, qty in state.get('positions', {}).items() if qty]
+    holdings.sort(key=lambda item: item[0])
+    parts.append(get_report_template('status_holdings_rows.html').render(
+        holdings=holdings,
+        prices=state.get('stock_prices') or {},
+        pnls=state.get('stock_pnls') or {},
+    ))
     
-    html_content += """
+    parts.append("""
                 </tbody>
             </table>
         </div>
 
-        <script>
-            const ctx = document.getElementById('pnlChart').getContext('2d');
-            new Chart(ctx, {
-                type: 'line',
-                data: {
-                    labels: """ + chart_labels + """,
-                    datasets: [{
-                        label: 'Unrealized P&L ($)',
-                        data: """ + chart_data + """,
-                        borderColor: 'rgba(54, 162, 235, 1)',
-                        backgroundColor: 'rgba(54, 162, 235, 0.2)',
-                        borderWidth: 2,
-                        fill: true,
-                        tension: 0.1
-                    }]
-                },
-                options: {
-                    responsive: true,
-                    scales: {
-                        y: {
-                            beginAtZero: false,
-                            ticks: {
-                                callback: function(value, index, values) {
-                                    return '$' + value.toLocaleString();
-                                }
-                            }
-                        }
-                    }
-                }
-            });
-        </script>
+        """)
+    parts.append(_STATUS_CHART_SCRIPT(labels=chart_labels, data=chart_data))
+    parts.append("""
     </body>
     </html>
-    """
-
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    """)
+    write_report_file(filepath, parts, compress=True)
     
     print(f"📈 Portfolio Status Report saved: {filepath}")
-    gcs_path = f"{datetime.now().strftime('%Y/%m/%d')}/{filename}"
-    upload_to_gcs(str(filepath), gcs_path)
+    gcs_path = f"{now.strftime('%Y/%m/%d')}/{filename}"
+    upload_report_in_background(filepath, gcs_path, **GZIP_HTML_UPLOAD)
     return str(filepath)
 
 
@@ -2103,48 +2385,103 @@ def generate_portfolio_status_report(state: PortfolioState):
 ### ------------->>>>> <<<<<------------------------
 from utils import ensure_connection, setup_reporting_directory, upload_to_gcs
 from config import PORTFOLIO_STOCKS
-# Legacy import - make optional for crypto trading
-try:
-    from ib_async import Stock
-    IBKR_AVAILABLE = True
-except ImportError:
+# Legacy import - make optional for crypto trading; ib_async itself is only imported for IBKR status reports
+IBKR_AVAILABLE = importlib.util.find_spec('ib_async') is not None
+if not IBKR_AVAILABLE:
     print("⚠️ IBKR not available, using crypto-only reporting")
-    IBKR_AVAILABLE = False
-    # Create dummy Stock class for compatibility
-    class Stock:
-        def __init__(self, *args, **kwargs):
-            pass
 
 # === ENHANCED COMBINED PERFORMANCE AND PORTFOLIO STATUS REPORT ===
 # === ENHANCED COMBINED PERFORMANCE AND PORTFOLIO STATUS REPORT ===
 # Import required utilities at the top of your file
 from utils import ensure_connection, setup_reporting_directory, upload_to_gcs
-# Legacy import - make optional for crypto trading
-try:
-    from ib_async import Stock
-    IBKR_AVAILABLE = True
-except ImportError:
-    print("⚠️ IBKR not available, using crypto-only reporting")
-    IBKR_AVAILABLE = False
-    # Create dummy Stock class for compatibility
-    class Stock:
-        def __init__(self, *args, **kwargs):
-            pass
-import pandas as pd
 from datetime import datetime
 from pathlib import Path
 from config import PORTFOLIO_STOCKS  # Import portfolio stocks configuration
 
+_COMPLETE_STYLE = """<style>
+            body { font-family: Arial, sans-serif; margin: 40px; background-color: #f5f5f5; }
+            .header { background: linear-gradient(135deg, #4854c7 0%, #3a3897 100%); color: white; padding: 30px; border-radius: 10px; text-align: center; }
+            .metrics { display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin: 20px 0; }
+            .metric-card { background: white; padding: 25px; border-radius: 10px; text-align: center; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+            .metric-value { font-size: 2.5em; font-weight: bold; color: #333; }
+            .metric-label { color: #666; margin-top: 10px; font-size: 1.1em; }
+            .positive { color: #28a745; }
+            .negative { color: #dc3545; }
+            .neutral { color: #6c757d; }
+            .performance-chart { background: white; padding: 25px; margin: 20px 0; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+            .cycle-table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+            .cycle-table th, .cycle-table td { padding: 12px; text-align: center; border-bottom: 1px solid #ddd; }
+            .cycle-table th { background-color: #f8f9fa; font-weight: bold; }
+            .insights, .validation-insights, .diagnostic { padding: 25px; margin: 20px 0; border-radius: 10px; }
+            .insights { background-color: #e8f4fd; border-left: 5px solid #007bff; }
+            .validation-insights { background-color: #e9f5e9; border-left: 5px solid #28a745; }
+            .diagnostic { background-color: #fff3cd; border-left: 5px solid #ffc107; }
+            .footer { text-align: center; color: #666; margin-top: 40px; }
+            .section-divider { border-top: 3px solid #4854c7; margin: 40px 0; padding-top: 20px; }
+            .portfolio-status-section { margin-top: 40px; }
+            .summary { background: white; padding: 25px; margin: 20px 0; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+            table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+            th, td { padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }
+            th { background-color: #f8f9fa; font-weight: bold; }
+        </style>"""
+
+def format_holdings_columns(holdings, allocations):
+    """Pre-format the holdings table column by column.
+
+    holdings is the sorted [(market_value, symbol, data)] list; each numeric column goes through one
+    map() over a bound str.format instead of a format call per cell inside the template loop.
+    Returns (symbol, shares, avg_cost, price, market_value, pnl, pnl_pct, allocation, pnl_class) rows.
+    """
+    symbols = [symbol for _, symbol, _ in holdings]
+    datas = [data for _, _, data in holdings]
+    pnls = [data['unrealized_pnl'] for data in datas]
+    pnl_classes = [_SIGN_CLASSES[(pnl > 0) - (pnl < 0)] for pnl in pnls]
+    return list(zip(
+        symbols,
+        [data['shares'] for data in datas],
+        map('{:.2f}'.format, [data['average_cost'] for data in datas]),
+        map('{:.2f}'.format, [data['current_price'] for data in datas]),
+        map('{:,.2f}'.format, [market_value for market_value, _, _ in holdings]),
+        map('{:+,.2f}'.format, pnls),
+        map('{:+.2f}'.format, [data['unrealized_pnl_pct'] for data in datas]),
+        map('{:.1f}'.format, [allocations.get(symbol, 0) for symbol in symbols]),
+        pnl_classes,
+    ))
+
+# Bound format method for the "Recent Cycle Performance" rows; the template is parsed once, not per row
+_CYCLE_ROW_FMT = (
+    '\n                        <tr><td>{cn}</td><td>${pv:,.2f}</td>'
+    '<td class="{pc}">${pnl:+.2f}</td><td>{et}</td>'
+    '<td>{ts}</td><td>{cs}</td><td>{va}</td></tr>'
+).format
+
+def format_cycle_row(cycle):
+    """Render one "Recent Cycle Performance" row of the complete report."""
+    pnl = cycle.get('total_unrealized_pnl', 0)
+    return _CYCLE_ROW_FMT(
+        cn=cycle.get('cycle_number', 'N/A'),
+        pv=cycle.get('total_portfolio_value', 0),
+        pc=_SIGN_CLASSES[(pnl > 0) - (pnl < 0)],
+        pnl=pnl,
+        et=cycle.get('executed_trades_count', 0),
+        ts=cycle.get('total_shares', 0),
+        cs="✅" if cycle.get('connection_status', False) else "❌",
+        va=cycle.get('validation_attempts', 0),
+    )
+
 async def generate_enhanced_performance_and_status_report(state: PortfolioState):
     """Generate comprehensive performance summary with portfolio status report"""
     reports_dir = setup_reporting_directory()
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    generated_at = now.strftime('%Y-%m-%d %H:%M:%S')  # header and footer show the same instant
     filename = f"performance_summary_{timestamp}.html"    
     filepath = reports_dir / filename
 
-    # Get current portfolio status from IBKR
+    # Get current portfolio status from IBKR in the background while the metrics below are computed
     print("📊 Fetching current portfolio status from IBKR...")
-    portfolio_status = await get_current_portfolio_status()
+    portfolio_task = asyncio.create_task(get_current_portfolio_status())
+    await asyncio.sleep(0)  # let the task send its first request before the CPU-only work starts
     
     cycle_history = state.get('cycle_history', [])
     if len(cycle_history) < 2:
@@ -2154,6 +2491,9 @@ async def generate_enhanced_performance_and_status_report(state: PortfolioState)
     # --- 1. METRIC CALCULATIONS (Existing) ---
     # Basic Performance
     initial_value = cycle_history[0].get('total_portfolio_value', 0) if cycle_history else 0
+    if not cycle_history:
+        # Without history the current value has to come from the live portfolio
+        portfolio_status = await portfolio_task
     # current_value = cycle_history[-1].get('total_portfolio_value', 0) if cycle_history else portfolio_status.get('net_liquidation', 0)
     current_value = cycle_history[-1].get('total_portfolio_value', 0) if cycle_history else (portfolio_status.get('net_liquidation', 0) if portfolio_status else 0)
 
@@ -2164,85 +2504,59 @@ async def generate_enhanced_performance_and_status_report(state: PortfolioState)
 
     # Trade Analysis
     executed_trades = state.get('executed_trades', [])
-    sell_trades = [t for t in executed_trades if t.get('action') == 'SELL' and 'net_profit' in t]
-    win_count = len([t for t in sell_trades if t['net_profit'] > 0])
-    loss_count = len([t for t in sell_trades if t['net_profit'] <= 0])
+    trade_stats = calculate_trade_win_loss_stats(executed_trades)
+    win_count = trade_stats['win_count']
+    loss_count = trade_stats['loss_count']
     total_win_loss_trades = win_count + loss_count
     win_rate_pct = (win_count / total_win_loss_trades * 100) if total_win_loss_trades > 0 else 0
     win_loss_ratio = win_count / loss_count if loss_count > 0 else float(win_count > 0)
 
-    total_wins = sum(t['net_profit'] for t in sell_trades if t['net_profit'] > 0)
-    total_losses = sum(t['net_profit'] for t in sell_trades if t['net_profit'] <= 0)
+    total_wins = trade_stats['total_wins']
+    total_losses = trade_stats['total_losses']
     profit_factor = total_wins / abs(total_losses) if total_losses < 0 else float('inf') if total_wins > 0 else 0
 
     # Advanced Metrics
-    portfolio_returns = pd.Series([c.get('total_portfolio_value', 0) for c in cycle_history]).pct_change().dropna() if cycle_history else pd.Series()
-    sharpe_ratio = (portfolio_returns.mean() / portfolio_returns.std()) * (252**0.5) if len(portfolio_returns) > 0 and portfolio_returns.std() > 0 else 0.0
-    pnl_by_cycle = [cycle.get('total_unrealized_pnl', 0) for cycle in cycle_history]
-    best_pnl = max(pnl_by_cycle) if pnl_by_cycle else 0
-    worst_pnl = min(pnl_by_cycle) if pnl_by_cycle else 0
+    cycle_metrics = calculate_cycle_history_metrics(cycle_history)
+    sharpe_ratio = cycle_metrics['sharpe_ratio']
+    best_pnl = cycle_metrics['best_pnl']
+    worst_pnl = cycle_metrics['worst_pnl']
 
     # System Diagnostics
-    connected_cycles = sum(1 for c in cycle_history if c.get('connection_status', False))
+    connected_cycles = cycle_metrics['connected_cycles']
     connection_rate = (connected_cycles / len(cycle_history) * 100) if cycle_history else 100
-    avg_data_quality = sum(c.get('data_quality', 0) for c in cycle_history) / len(cycle_history) if cycle_history else 0
+    avg_data_quality = cycle_metrics['avg_data_quality']
 
     # Validation System
-    total_validation_attempts = sum(c.get('validation_attempts', 0) for c in cycle_history)
-    cycles_with_validation = sum(1 for c in cycle_history if c.get('validation_attempts', 0) > 0)
+    total_validation_attempts = cycle_metrics['total_validation_attempts']
+    cycles_with_validation = cycle_metrics['cycles_with_validation']
     avg_validation_per_cycle = total_validation_attempts / len(cycle_history) if cycle_history else 0
 
     # --- 2. DYNAMIC CONTENT PRE-CALCULATION ---
     # CSS Classes for Metric Cards
-    return_pct_class = 'positive' if return_pct > 0 else 'negative' if return_pct < 0 else 'neutral'
-    total_return_class = 'positive' if total_return > 0 else 'negative' if total_return < 0 else 'neutral'
-    sharpe_ratio_class = 'positive' if sharpe_ratio >= 1 else 'negative' if sharpe_ratio < 0 else 'neutral'
-    win_loss_ratio_class = 'positive' if win_loss_ratio >= 1 else 'negative'
-    profit_factor_class = 'positive' if profit_factor >= 1.5 else 'negative' if profit_factor < 1 else 'neutral'
+    return_pct_class = _SIGN_CLASSES[(return_pct > 0) - (return_pct < 0)]
+    total_return_class = _SIGN_CLASSES[(total_return > 0) - (total_return < 0)]
+    sharpe_ratio_class = _THREE_CLASSES[bisect.bisect_right(_SHARPE_CLASS_CUTS, sharpe_ratio)]
+    win_loss_ratio_class = _TWO_CLASSES[bisect.bisect_right(_WIN_LOSS_CLASS_CUTS, win_loss_ratio)]
+    profit_factor_class = _THREE_CLASSES[bisect.bisect_right(_PROFIT_FACTOR_CLASS_CUTS, profit_factor)]
 
     # Descriptive Text for Insights
-    sharpe_interpretation = 'excellent' if sharpe_ratio > 2 else 'good' if sharpe_ratio > 1 else 'moderate' if sharpe_ratio > 0 else 'poor'
+    sharpe_interpretation = _SHARPE_LABELS[bisect.bisect_left(_SHARPE_LABEL_CUTS, sharpe_ratio)]
     validation_engagement = 'Actively engaged' if cycles_with_validation > len(cycle_history) * 0.1 else 'Minimal engagement'
 
     # --- 3. HTML STRING CONSTRUCTION ---
-    html_content = f"""
+    parts = [f"""
     <!DOCTYPE html>
     <html lang="en">
     <head>
         <meta charset="UTF-8">
         <title>Complete Portfolio Report - {timestamp}</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 40px; background-color: #f5f5f5; }}
-            .header {{ background: linear-gradient(135deg, #4854c7 0%, #3a3897 100%); color: white; padding: 30px; border-radius: 10px; text-align: center; }}
-            .metrics {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin: 20px 0; }}
-            .metric-card {{ background: white; padding: 25px; border-radius: 10px; text-align: center; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-            .metric-value {{ font-size: 2.5em; font-weight: bold; color: #333; }}
-            .metric-label {{ color: #666; margin-top: 10px; font-size: 1.1em; }}
-            .positive {{ color: #28a745; }}
-            .negative {{ color: #dc3545; }}
-            .neutral {{ color: #6c757d; }}
-            .performance-chart {{ background: white; padding: 25px; margin: 20px 0; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-            .cycle-table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-            .cycle-table th, .cycle-table td {{ padding: 12px; text-align: center; border-bottom: 1px solid #ddd; }}
-            .cycle-table th {{ background-color: #f8f9fa; font-weight: bold; }}
-            .insights, .validation-insights, .diagnostic {{ padding: 25px; margin: 20px 0; border-radius: 10px; }}
-            .insights {{ background-color: #e8f4fd; border-left: 5px solid #007bff; }}
-            .validation-insights {{ background-color: #e9f5e9; border-left: 5px solid #28a745; }}
-            .diagnostic {{ background-color: #fff3cd; border-left: 5px solid #ffc107; }}
-            .footer {{ text-align: center; color: #666; margin-top: 40px; }}
-            .section-divider {{ border-top: 3px solid #4854c7; margin: 40px 0; padding-top: 20px; }}
-            .portfolio-status-section {{ margin-top: 40px; }}
-            .summary {{ background: white; padding: 25px; margin: 20px 0; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-            table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-            th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-            th {{ background-color: #f8f9fa; font-weight: bold; }}
-        </style>
+        {_COMPLETE_STYLE}
     </head>
     <body>
         <div class="header">
             <h1>📊 Complete Portfolio Performance & Status Report</h1>
             <h2>Session: {state.get('session_id', 'N/A')}</h2>
-            <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <p>Generated: {generated_at}</p>
             <p>Cycles Analyzed: {len(cycle_history)} | Trading Period: {cycle_history[0].get('timestamp', 'N/A') if cycle_history else 'N/A'} - {cycle_history[-1].get('timestamp', 'N/A') if cycle_history else 'N/A'}</p>
         </div>
 
@@ -2293,11 +2607,11 @@ async def generate_enhanced_performance_and_status_report(state: PortfolioState)
             <h3>🕵️ Validation System</h3>
             <p><strong>Engagement:</strong> {validation_engagement}, with an average of {avg_validation_per_cycle:.2f} checks per cycle.</p>
         </div>
-    """
+    """]
 
     # Add cycle history table if available
     if cycle_history:
-        html_content += """
+        parts.append("""
         <div class="performance-chart">
             <h2>📊 Recent Cycle Performance (Last 10)</h2>
             <table class="cycle-table">
@@ -2313,183 +2627,52 @@ async def generate_enhanced_performance_and_status_report(state: PortfolioState)
                     </tr>
                 </thead>
                 <tbody>
-        """
+        """)
 
-        for cycle in cycle_history[-10:]:
-            pnl = cycle.get('total_unrealized_pnl', 0)
-            pnl_class = 'positive' if pnl > 0 else 'negative' if pnl < 0 else 'neutral'
-            connection_status = "✅" if cycle.get('connection_status', False) else "❌"
-            validations = cycle.get('validation_attempts', 0)
-            
-            html_content += f"""
-                        <tr>
-                            <td>{cycle.get('cycle_number', 'N/A')}</td>
-                            <td>${cycle.get('total_portfolio_value', 0):,.2f}</td>
-                            <td class="{pnl_class}">${pnl:+.2f}</td>
-                            <td>{cycle.get('executed_trades_count', 0)}</td>
-                            <td>{cycle.get('total_shares', 0)}</td>
-                            <td>{connection_status}</td>
-                            <td>{validations}</td>
-                        </tr>
-            """
+        # All ten rows go in as one joined fragment rather than one list entry per row
+        parts.append("".join(map(format_cycle_row, cycle_history[-10:])))
 
-        html_content += """
+        parts.append("""
                 </tbody>
             </table>
         </div>
-        """
+        """)
 
     # === ADD PORTFOLIO STATUS SECTION ===
-    html_content += """
+    parts.append("""
         <div class="section-divider"></div>
         
         <div class="portfolio-status-section">
             <h1 style="text-align: center; color: #4854c7;">📈 Current Portfolio Status from Interactive Brokers</h1>
-    """
+    """)
 
     # Portfolio Status Metrics
+    portfolio_status = await portfolio_task
     if portfolio_status:
         net_liq = portfolio_status.get('net_liquidation', 0)
         total_cash = portfolio_status.get('total_cash', 0)
         total_market_value = portfolio_status.get('total_market_value', 0)
         total_unrealized_pnl = portfolio_status.get('total_unrealized_pnl', 0)
-        pnl_pct = (total_unrealized_pnl / (total_market_value - total_unrealized_pnl) * 100) if (total_market_value - total_unrealized_pnl) > 0 else 0
+        cost_basis = total_market_value - total_unrealized_pnl
+        pnl_pct = (total_unrealized_pnl / cost_basis * 100) if cost_basis > 0 else 0
         
-        html_content += f"""
-            <div class="metrics">
-                <div class="metric-card">
-                    <div class="metric-value">${net_liq:,.2f}</div>
-                    <div class="metric-label">Net Liquidation Value</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-value">${total_cash:,.2f}</div>
-                    <div class="metric-label">Cash Balance (USD)</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-value">${total_market_value:,.2f}</div>
-                    <div class="metric-label">Total Market Value</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-value {'positive' if total_unrealized_pnl > 0 else 'negative'}">${total_unrealized_pnl:+,.2f}</div>
-                    <div class="metric-label">Unrealized P&L</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-value {'positive' if pnl_pct > 0 else 'negative'}">{pnl_pct:+.2f}%</div>
-                    <div class="metric-label">P&L Percentage</div>
-                </div>
-                <div class="metric-card">
-                    <div class="metric-value">{len(portfolio_status.get('positions', {}))}</div>
-                    <div class="metric-label">Active Positions</div>
-                </div>
-            </div>
-            
-            <div class="summary">
-                <h2>📊 Current Portfolio Holdings</h2>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Symbol</th>
-                            <th>Shares</th>
-                            <th>Avg Cost</th>
-                            <th>Current Price</th>
-                            <th>Market Value</th>
-                            <th>Unrealized P&L</th>
-                            <th>P&L %</th>
-                            <th>Allocation %</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-        """
-        
-        # Add positions
         positions = portfolio_status.get('positions', {})
-        allocations = portfolio_status.get('allocations', {})
-        
-        for symbol, data in sorted(positions.items(), key=lambda x: x[1]['market_value'], reverse=True):
-            pnl = data['unrealized_pnl']
-            pnl_pct = data['unrealized_pnl_pct']
-            pnl_class = 'positive' if pnl > 0 else 'negative' if pnl < 0 else 'neutral'
-            allocation = allocations.get(symbol, 0)
-            
-            html_content += f"""
-                        <tr>
-                            <td><strong>{symbol}</strong></td>
-                            <td>{data['shares']}</td>
-                            <td>${data['average_cost']:.2f}</td>
-                            <td>${data['current_price']:.2f}</td>
-                            <td>${data['market_value']:,.2f}</td>
-                            <td class="{pnl_class}">${pnl:+,.2f}</td>
-                            <td class="{pnl_class}">{pnl_pct:+.2f}%</td>
-                            <td>{allocation:.1f}%</td>
-                        </tr>
-            """
-        
-        html_content += """
-                    </tbody>
-                </table>
-            </div>
-            
-            <div class="summary">
-                <h2>💼 Account Information</h2>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Metric</th>
-                            <th>Value</th>
-                            <th>Currency</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-        """
-        
-        # Add account info
-        account_info = portfolio_status.get('account_info', {})
-        for key, info in account_info.items():
-            html_content += f"""
-                        <tr>
-                            <td>{key}</td>
-                            <td>${info['value']:,.2f}</td>
-                            <td>{info['currency']}</td>
-                        </tr>
-            """
-        
-        html_content += """
-                    </tbody>
-                </table>
-            </div>
-        """
-        
-        # Add cash balances if multiple currencies
-        cash_balances = portfolio_status.get('cash_balances', {})
-        if len(cash_balances) > 1:
-            html_content += """
-            <div class="summary">
-                <h2>💵 Cash Balances by Currency</h2>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Currency</th>
-                            <th>Balance</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-            """
-            
-            for currency, balance in cash_balances.items():
-                html_content += f"""
-                        <tr>
-                            <td>{currency}</td>
-                            <td>{balance:,.2f}</td>
-                        </tr>
-                """
-            
-            html_content += """
-                    </tbody>
-                </table>
-            </div>
-            """
+        # Sort plain (market_value, symbol, data) tuples largest first; no per-comparison key callback
+        holdings = [(data['market_value'], symbol, data) for symbol, data in positions.items()]
+        holdings.sort(reverse=True)
+        
+        parts.append(get_report_template('portfolio_status_section.html').render(
+            net_liq=net_liq,
+            total_cash=total_cash,
+            total_market_value=total_market_value,
+            total_unrealized_pnl=total_unrealized_pnl,
+            pnl_pct=pnl_pct,
+            holdings=format_holdings_columns(holdings, portfolio_status.get('allocations', {})),
+            account_info=portfolio_status.get('account_info', {}),
+            cash_balances=portfolio_status.get('cash_balances', {}),
+        ))
     
-    html_content += """
+    parts.append("""
         </div>
         
         <div class="footer">
@@ -2499,30 +2682,129 @@ async def generate_enhanced_performance_and_status_report(state: PortfolioState)
         </div>
     </body>
     </html>
-    """.format(datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    """.format(generated_at))
 
-    # Save the report
-    with open(filepath, 'w', encoding='utf-8', errors='replace') as f:
-        f.write(html_content)
-    
-    print(f"📈 Complete Portfolio Report saved: {filepath}")
+    html_bytes = "".join(parts).encode('utf-8', 'replace')
 
-    # Upload to GCS
+    # Upload to GCS straight from memory, overlapping with the local copy instead of re-reading it from disk
     try:
         gcs_bucket_name = "portfolio_reports_algo"
-        now = datetime.now()
         gcs_destination_path = f"{now.strftime('%Y/%m/%d')}/{filename}"
         
-        # upload_to_gcs takes (source_file_path, destination_blob_name)
-        upload_result = upload_to_gcs(str(filepath), gcs_destination_path)
-        if upload_result:
-            print(f"✅ Report uploaded to GCS: {upload_result}")
+        # Only the GCS object is gzipped (browsers decode it via Content-Encoding); the local copy below stays
+        # plain HTML. Level 6 is affordable because compression runs in the pool job, not on the event loop.
+        upload_report_data_in_background(html_bytes, gcs_destination_path, "✅ Report uploaded to GCS",
+                                         compresslevel=6, **GZIP_HTML_UPLOAD)
     except Exception as e:
         print(f"❌ GCS upload error: {e}")
 
+    # Save the local copy on the report I/O pool so the event loop keeps servicing IBKR callbacks
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_REPORT_POOL, write_report_file, filepath, html_bytes)
+    
+    print(f"📈 Complete Portfolio Report saved: {filepath}")
+
     return str(filepath)
 
 
+# IBKR account tags copied into the status 'account_info' section
+ACCOUNT_INFO_TAGS = frozenset({
+    'NetLiquidation', 'TotalCashValue', 'GrossPositionValue',
+    'UnrealizedPnL', 'RealizedPnL', 'AvailableFunds',
+    'BuyingPower', 'MaintMarginReq', 'InitMarginReq',
+})
+
+# Qualified IBKR contracts by symbol; a conId never changes within a connection, so qualify each symbol once
+_QUALIFIED_CONTRACTS = {}
+_QUALIFIED_CONTRACTS_IB = None
+# Streaming market-data tickers by symbol on the same connection; ib_async keeps them updated in place
+_MARKET_DATA_TICKERS = {}
+
+async def get_qualified_contracts(ib, symbols):
+    """Return {symbol: qualified Stock contract}, qualifying only symbols not seen on this IB connection."""
+    global _QUALIFIED_CONTRACTS_IB
+    from ib_async import Stock
+    
+    # A new IB client means a reconnect; drop contracts qualified on the old one
+    if ib is not _QUALIFIED_CONTRACTS_IB:
+        _QUALIFIED_CONTRACTS.clear()
+        _MARKET_DATA_TICKERS.clear()
+        _QUALIFIED_CONTRACTS_IB = ib
+    
+    missing = [symbol for symbol in dict.fromkeys(symbols) if symbol not in _QUALIFIED_CONTRACTS]
+    if missing:
+        qualified = await ib.qualifyContractsAsync(*(Stock(symbol, 'SMART', 'USD') for symbol in missing))
+        for contract in qualified:
+            if contract:
+                _QUALIFIED_CONTRACTS[contract.symbol] = contract
+    
+    return {symbol: _QUALIFIED_CONTRACTS[symbol] for symbol in symbols if symbol in _QUALIFIED_CONTRACTS}
+
+async def get_streaming_tickers(ib, contracts):
+    """Return {symbol: Ticker} backed by long-lived reqMktData subscriptions.
+
+    Symbols subscribed for the first time get one batched snapshot so this cycle still has prices;
+    after that, prices are read straight from the streaming Ticker objects with no network round trip.
+    """
+    new_contracts = [contract for symbol, contract in contracts.items() if symbol not in _MARKET_DATA_TICKERS]
+    for contract in new_contracts:
+        _MARKET_DATA_TICKERS[contract.symbol] = ib.reqMktData(contract, '', False, False)
+    
+    tickers = {symbol: _MARKET_DATA_TICKERS[symbol] for symbol in contracts}
+    if new_contracts:
+        for snapshot in await ib.reqTickersAsync(*new_contracts):
+            tickers[snapshot.contract.symbol] = snapshot
+    return tickers
+
+def cancel_streaming_tickers(ib=None):
+    """Cancel every streaming market-data subscription opened by get_streaming_tickers.
+
+    ib defaults to the connection the subscriptions were opened on.
+    """
+    ib = ib or _QUALIFIED_CONTRACTS_IB
+    if ib is None:
+        _MARKET_DATA_TICKERS.clear()
+        return
+    for ticker in _MARKET_DATA_TICKERS.values():
+        try:
+            ib.cancelMktData(ticker.contract)
+        except Exception as e:
+            print(f"⚠️ Could not cancel market data for {ticker.contract.symbol}: {e}")
+    _MARKET_DATA_TICKERS.clear()
+
+def calculate_position_metrics(priced_positions):
+    """Market value and unrealized P&L for every priced position in one NumPy pass.
+
+    priced_positions is a list of (symbol, shares, avg_cost, current_price); returns [(symbol, metrics)].
+    """
+    if not priced_positions:
+        return []
+    symbols, shares, avg_costs, prices = zip(*priced_positions)
+    shares_arr = np.array(shares, dtype=np.float64)
+    cost_arr = np.array(avg_costs, dtype=np.float64)
+    price_arr = np.array(prices, dtype=np.float64)
+    
+    market_value = shares_arr * price_arr
+    unrealized_pnl = market_value - shares_arr * cost_arr
+    # Positions without a cost basis report 0%; where= keeps them out of the division entirely
+    unrealized_pnl_pct = np.zeros_like(cost_arr)
+    np.divide(price_arr - cost_arr, cost_arr, out=unrealized_pnl_pct, where=cost_arr > 0)
+    unrealized_pnl_pct *= 100
+    
+    return [
+        (symbol, {
+            'shares': share,
+            'average_cost': avg_cost,
+            'current_price': price,
+            'market_value': mv,
+            'unrealized_pnl': pnl,
+            'unrealized_pnl_pct': pnl_pct
+        })
+        for symbol, share, avg_cost, price, mv, pnl, pnl_pct in zip(
+            symbols, shares, avg_costs, prices,
+            market_value.tolist(), unrealized_pnl.tolist(), unrealized_pnl_pct.tolist())
+    ]
+
 # Helper function to get current portfolio status from IBKR
 async def get_current_portfolio_status():
     """Get current portfolio status - adapted for crypto trading"""
@@ -2568,85 +2850,81 @@ async def get_current_portfolio_status():
         }
         
         # Process account values
+        cash_balances = status['cash_balances']
+        account_info = status['account_info']
         for value in account_values:
-            if value.tag == 'NetLiquidation':
-                status['net_liquidation'] = float(value.value)
-            elif value.tag == 'TotalCashValue' and value.currency == 'USD':
-                status['total_cash'] = float(value.value)
-            elif value.tag == 'CashBalance':
-                status['cash_balances'][value.currency] = float(value.value)
+            tag = value.tag
+            currency = value.currency
+            if tag == 'CashBalance':
+                cash_balances[currency] = float(value.value)
+                continue
+            # Most account tags are neither tracked nor summarized; one hash lookup skips them
+            if tag not in ACCOUNT_INFO_TAGS:
+                continue
+            
+            amount = float(value.value)
+            if tag == 'NetLiquidation':
+                status['net_liquidation'] = amount
+            elif tag == 'TotalCashValue' and currency == 'USD':
+                status['total_cash'] = amount
             
             # Store important account info
-            if value.tag in ['NetLiquidation', 'TotalCashValue', 'GrossPositionValue', 
-                           'UnrealizedPnL', 'RealizedPnL', 'AvailableFunds', 
-                           'BuyingPower', 'MaintMarginReq', 'InitMarginReq']:
-                status['account_info'][value.tag] = {
-                    'value': float(value.value),
-                    'currency': value.currency
-                }
-        
-        # Process positions
-        total_market_value = 0
-        total_unrealized_pnl = 0
-        
-        for pos in positions:
+            account_info[tag] = {
+                'value': amount,
+                'currency': currency
+            }
+        
+        # Process positions: qualify and price every portfolio position in one batched round trip each
+        # config.py keeps PORTFOLIO_STOCKS as an ordered list; a frozenset makes the membership test a hash lookup
+        portfolio_symbols = frozenset(PORTFOLIO_STOCKS)
+        held_positions = [pos for pos in positions if pos.contract.symbol in portfolio_symbols]
+        qualified_contracts = await get_qualified_contracts(ib, [pos.contract.symbol for pos in held_positions])
+        tickers_by_symbol = await get_streaming_tickers(ib, qualified_contracts)
+        
+        def price_position(pos):
             symbol = pos.contract.symbol
-            if symbol in PORTFOLIO_STOCKS:
-                try:
-                    # Create and qualify the contract
-                    contract = Stock(symbol, 'SMART', 'USD')
-                    qualified_contracts = await ib.qualifyContractsAsync(contract)
-                    
-                    if not qualified_contracts:
-                        print(f"⚠️ Could not qualify contract for {symbol}")
-                        continue
-                    
-                    qualified_contract = qualified_contracts[0]
-                    
-                    # Get current price using the qualified contract
-                    [ticker] = await ib.reqTickersAsync(qualified_contract)
-                    current_price = ticker.marketPrice()
-                    
-                    # If marketPrice is not available, try other price fields
-                    if pd.isna(current_price) or current_price <= 0:
-                        if ticker.last is not None and ticker.last > 0:
-                            current_price = ticker.last
-                        elif ticker.close is not None and ticker.close > 0:
-                            current_price = ticker.close
-                        else:
-                            print(f"⚠️ No valid price for {symbol}")
-                            continue
-                    
-                    market_value = pos.position * current_price
-                    unrealized_pnl = market_value - (pos.position * pos.avgCost)
-                    unrealized_pnl_pct = ((current_price - pos.avgCost) / pos.avgCost * 100) if pos.avgCost > 0 else 0
-                    
-                    status['positions'][symbol] = {
-                        'shares': pos.position,
-                        'average_cost': pos.avgCost,
-                        'current_price': current_price,
-                        'market_value': market_value,
-                        'unrealized_pnl': unrealized_pnl,
-                        'unrealized_pnl_pct': unrealized_pnl_pct
-                    }
-                    
-                    total_market_value += market_value
-                    total_unrealized_pnl += unrealized_pnl
-                    
-                except Exception as e:
-                    print(f"⚠️ Error processing {symbol}: {e}")
-                    continue
+            try:
+                ticker = tickers_by_symbol.get(symbol)
+                if ticker is None:
+                    print(f"⚠️ Could not qualify contract for {symbol}")
+                    return None
+                
+                current_price = ticker.marketPrice()
+                
+                # If marketPrice is not available, try other price fields
+                # NaN is the only value not equal to itself; avoids pandas in the per-position path
+                if current_price is None or current_price != current_price or current_price <= 0:
+                    if ticker.last is not None and ticker.last > 0:
+                        current_price = ticker.last
+                    elif ticker.close is not None and ticker.close > 0:
+                        current_price = ticker.close
+                    else:
+                        print(f"⚠️ No valid price for {symbol}")
+                        return None
+                
+                return symbol, pos.position, pos.avgCost, current_price
+                
+            except Exception as e:
+                print(f"⚠️ Error processing {symbol}: {e}")
+                return None
+
+        priced_positions = [priced for priced in map(price_position, held_positions) if priced is not None]
+        position_metrics = calculate_position_metrics(priced_positions)
+        status['positions'].update(position_metrics)
         
-        status['total_market_value'] = total_market_value
-        status['total_unrealized_pnl'] = total_unrealized_pnl
+        status['total_market_value'] = sum(data['market_value'] for _, data in position_metrics)
+        status['total_unrealized_pnl'] = sum(data['unrealized_pnl'] for _, data in position_metrics)
         
         # Calculate allocations
         net_liq = status['net_liquidation']
         if net_liq > 0:
-            for symbol, pos_data in status['positions'].items():
-                status['allocations'][symbol] = (pos_data['market_value'] / net_liq) * 100
+            allocations = status['allocations']
+            if status['positions']:
+                market_values = np.fromiter((data['market_value'] for data in status['positions'].values()),
+                                            dtype=np.float64, count=len(status['positions']))
+                allocations.update(zip(status['positions'], ((market_values / net_liq) * 100).tolist()))
             # Add cash allocation
-            status['allocations']['Cash'] = (status['total_cash'] / net_liq) * 100
+            allocations['Cash'] = (status['total_cash'] / net_liq) * 100
         
         print("✅ Portfolio status retrieved successfully")
         return status
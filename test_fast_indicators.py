@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Parity test for the compiled indicator kernels in fast_indicators.py
+Checks every compute_indicators output against the pandas helpers in technical_analysis.py
+around each minimum-history threshold, so a kernel change cannot silently move trading signals
+"""
+
+import numpy as np
+import pandas as pd
+
+import technical_analysis as ta
+from fast_indicators import NUMBA_AVAILABLE, compute_indicators, ema_last, last_sma, last_std, obv_last
+
+# Lengths on both sides of every threshold get_crypto_data uses (14, 15, 20, 35) plus realistic sizes
+LENGTHS = (10, 13, 14, 15, 16, 19, 20, 21, 34, 35, 36, 50, 60, 300)
+
+def make_candles(n, seed, flat_tail=False):
+    """Random-walk OHLCV columns; flat_tail ends on unchanged prices (zero gains/losses, zero ranges)"""
+    rng = np.random.default_rng(seed)
+    closes = np.round(100 + np.cumsum(rng.normal(size=n)), 1)
+    if flat_tail:
+        closes[-min(16, n):] = closes[-min(16, n)]
+        highs, lows = closes.copy(), closes.copy()
+    else:
+        highs = closes + rng.random(n)
+        lows = closes - rng.random(n)
+    volumes = rng.random(n) * 10
+    return highs, lows, closes, volumes
+
+def reference_indicators(highs, lows, closes, volumes):
+    """The same 18 fields from technical_analysis / pandas; None where the helper has too little history"""
+    n = len(closes)
+    s = pd.Series(closes)
+    macd, macd_signal, macd_hist = ta.calculate_macd(closes)
+    bb_upper, bb_middle, bb_lower = ta.calculate_bollinger_bands(closes)
+    stoch_k, stoch_d = ta.calculate_stochastic(highs, lows, closes)
+    volume_ma, obv = ta.calculate_volume_indicators(volumes, closes)
+    return {
+        'sma_20': s.rolling(20).mean().iloc[-1] if n >= 20 else None,
+        'sma_50': s.rolling(min(50, n)).mean().iloc[-1],
+        'ema_12': s.ewm(span=12).mean().iloc[-1],
+        'ema_26': s.ewm(span=26).mean().iloc[-1],
+        'volatility_20': s.rolling(min(20, n)).std().iloc[-1],
+        'rsi': ta.calculate_rsi(closes),
+        'williams_r': ta.calculate_williams_r(highs, lows, closes),
+        'atr': ta.calculate_atr(highs, lows, closes),
+        'macd': macd,
+        'macd_signal': macd_signal,
+        'macd_histogram': macd_hist,
+        'bb_upper': bb_upper,
+        'bb_middle': bb_middle,
+        'bb_lower': bb_lower,
+        'stoch_k': stoch_k,
+        'stoch_d': stoch_d,
+        'volume_ma': volume_ma,
+        'obv': obv,
+    }
+
+KERNEL_FIELDS = ('sma_20', 'sma_50', 'ema_12', 'ema_26', 'volatility_20', 'rsi', 'williams_r', 'atr',
+                 'macd', 'macd_signal', 'macd_histogram', 'bb_upper', 'bb_middle', 'bb_lower',
+                 'stoch_k', 'stoch_d', 'volume_ma', 'obv')
+
+def same(a, b):
+    return bool(np.isclose(a, b, rtol=1e-9, atol=1e-9, equal_nan=True))
+
+def test_compute_indicators_matches_technical_analysis():
+    """Every field the helpers produce is reproduced by the kernel, including NaN results"""
+    mismatches = []
+    for n in LENGTHS:
+        for flat_tail in (False, True):
+            candles = make_candles(n, seed=n, flat_tail=flat_tail)
+            kernel = dict(zip(KERNEL_FIELDS, compute_indicators(*candles)))
+            for field, expected in reference_indicators(*candles).items():
+                # None means the helper needs more history; get_crypto_data substitutes a default there
+                if expected is not None and not same(kernel[field], expected):
+                    mismatches.append((n, flat_tail, field, kernel[field], expected))
+    assert not mismatches, mismatches
+
+def test_helper_minimum_lengths():
+    """The length gates in get_crypto_data line up with where the helpers start returning values"""
+    for n in LENGTHS:
+        highs, lows, closes, volumes = make_candles(n, seed=n)
+        assert (ta.calculate_rsi(closes) is not None) == (n >= 15)
+        assert (ta.calculate_williams_r(highs, lows, closes) is not None) == (n >= 14)
+        assert (ta.calculate_atr(highs, lows, closes) is not None) == (n >= 15)
+        assert (ta.calculate_macd(closes)[0] is not None) == (n >= 35)
+        assert (ta.calculate_bollinger_bands(closes)[0] is not None) == (n >= 20)
+        assert (ta.calculate_stochastic(highs, lows, closes)[0] is not None) == (n >= 14)
+        assert (ta.calculate_volume_indicators(volumes, closes)[0] is not None) == (n >= 20)
+
+def test_flat_prices_edge_cases():
+    """Zero gains and losses hit the RSI 0.0001 substitute; zero ranges give NaN Williams %R / stochastic"""
+    highs, lows, closes, volumes = make_candles(60, seed=7, flat_tail=True)
+    kernel = dict(zip(KERNEL_FIELDS, compute_indicators(highs, lows, closes, volumes)))
+    assert same(kernel['rsi'], 50.0)
+    assert np.isnan(kernel['williams_r']) and np.isnan(kernel['stoch_k']) and np.isnan(kernel['stoch_d'])
+
+def test_scalar_kernels():
+    """The single-value kernels agree with pandas rolling/ewm and the OBV seed of -volumes[0]"""
+    _, _, closes, volumes = make_candles(80, seed=3)
+    s = pd.Series(closes)
+    assert same(last_sma(closes, 20), s.rolling(20).mean().iloc[-1])
+    assert same(last_std(closes, 20), s.rolling(20).std().iloc[-1])
+    assert np.isnan(last_std(closes, 1))
+    assert same(ema_last(closes, 12), s.ewm(span=12).mean().iloc[-1])
+    assert same(obv_last(closes, volumes), ta.calculate_volume_indicators(volumes, closes)[1])
+
+def test_strided_column_views():
+    """Both data paths pass column views of the (n, 6) candle matrix rather than contiguous copies"""
+    highs, lows, closes, volumes = make_candles(120, seed=11)
+    matrix = np.column_stack([np.arange(120.0), closes, highs, lows, closes, volumes])
+    views = compute_indicators(matrix[:, 2], matrix[:, 3], matrix[:, 4], matrix[:, 5])
+    copies = compute_indicators(highs, lows, closes, volumes)
+    assert all(same(a, b) for a, b in zip(views, copies))
+
+if __name__ == "__main__":
+    print(f"🧪 Testing indicator kernels ({'numba' if NUMBA_AVAILABLE else 'plain Python'})")
+    print("="*50)
+    for test in (test_compute_indicators_matches_technical_analysis, test_helper_minimum_lengths,
+                 test_flat_prices_edge_cases, test_scalar_kernels, test_strided_column_views):
+        test()
+        print(f"✅ {test.__name__}")
+    print("🎉 All indicator kernel checks passed")
@@ -44,9 +44,10 @@ async def ensure_connection():
         print(f"❌ Error testing Gemini connection: {e}")
         return None
 
-def upload_to_gcs(source_file_path, destination_blob_name):
+def upload_to_gcs(source_file_path, destination_blob_name, content_type=None, content_encoding=None):
     """
     Uploads a local file to a specified Google Cloud Storage bucket.
+    Pass content_encoding='gzip' for pre-compressed files so GCS serves them decoded to browsers.
     """
     try:
         if not os.path.exists(source_file_path):
@@ -55,7 +56,9 @@ def upload_to_gcs(source_file_path, destination_blob_name):
 
         bucket = storage_client.bucket(GCS_BUCKET_NAME)
         blob = bucket.blob(destination_blob_name)
-        blob.upload_from_filename(source_file_path)
+        if content_encoding:
+            blob.content_encoding = content_encoding
+        blob.upload_from_filename(source_file_path, content_type=content_type)
 
         gcs_uri = f"gs://{GCS_BUCKET_NAME}/{destination_blob_name}"
         print(f"📄 File uploaded to GCS: {gcs_uri}")
@@ -64,6 +67,24 @@ def upload_to_gcs(source_file_path, destination_blob_name):
         print(f"❌ GCS Upload Failed: {e}")
         return None
 
+def upload_string_to_gcs(data, destination_blob_name, content_type=None, content_encoding=None):
+    """
+    Uploads in-memory report data (str or bytes) straight to Google Cloud Storage, without a local file.
+    """
+    try:
+        bucket = storage_client.bucket(GCS_BUCKET_NAME)
+        blob = bucket.blob(destination_blob_name)
+        if content_encoding:
+            blob.content_encoding = content_encoding
+        blob.upload_from_string(data, content_type=content_type or 'text/plain')
+
+        gcs_uri = f"gs://{GCS_BUCKET_NAME}/{destination_blob_name}"
+        print(f"📄 Data uploaded to GCS: {gcs_uri}")
+        return gcs_uri
+    except Exception as e:
+        print(f"❌ GCS Upload Failed: {e}")
+        return None
+
 def log_portfolio_activity(action, details=None):
     """
     Logs a JSON line entry for a given portfolio activity to Google Cloud Storage.